@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0002_alter_category_options'),
+        ('companies', '0002_alter_company_options'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['company', 'name'], name='categories_company_name_idx'),
+        ),
+    ]
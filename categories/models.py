@@ -1,5 +1,6 @@
 from django.db import models
 
+from companies.managers import TenantManager
 from companies.models import Company
 
 
@@ -11,9 +12,14 @@ class Category(models.Model):
         Company, on_delete=models.CASCADE, verbose_name="Empresa"
     )
 
+    objects = TenantManager()
+
     class Meta:
         verbose_name = "Categoría"
         verbose_name_plural = "Categorías"
+        indexes = [
+            models.Index(fields=["company", "name"], name="categories_company_name_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -0,0 +1,242 @@
+import json
+from functools import partial
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+from customers.models import Customer
+from employees.models import Employee
+from foodies.benchmark import find_regressions, measure_requests, production_settings
+from foodies.endpoints import (
+    SKIPPED_ROUTES,
+    WRITE_ROUTES,
+    build_scenarios,
+    named_routes,
+)
+from foodies.seed import DataSeeder
+from orders.models import Order
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure latency, query count and response size of every named route "
+        "at several dataset sizes and compare them with a stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1000, 10000],
+            help="Orders per company of each seeded dataset.",
+        )
+        parser.add_argument(
+            "--companies", type=int, default=2, help="Companies per dataset."
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--current-data",
+            action="store_true",
+            help=(
+                "Measure the current database instead of seeded ones. Routes "
+                "that write are skipped and anything else the run writes "
+                "(sessions, last login) is rolled back."
+            ),
+        )
+        parser.add_argument(
+            "--username",
+            help="Employee to log in as with --current-data. Defaults to the first.",
+        )
+        parser.add_argument(
+            "--routes", nargs="+", help="Only measure these route names."
+        )
+        parser.add_argument(
+            "--runs", type=int, default=20, help="Measured requests per route."
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=2, help="Unmeasured requests per route."
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            default=Path("endpoint-benchmark.json"),
+            help="Where to write the results.",
+        )
+        parser.add_argument(
+            "--baseline", type=Path, help="Results to compare against."
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed p95 and size growth over the baseline (0.25 = 25%%).",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Write the results to --baseline instead of comparing.",
+        )
+
+    def _measure(self, options, employee, writes: bool = True) -> dict:
+        company = employee.company
+        missing = [
+            name
+            for name, model in (
+                ("product", Product),
+                ("customer", Customer),
+                ("order", Order),
+            )
+            if not model.objects.for_company(company).exists()
+        ]
+
+        if missing:
+            raise CommandError(
+                f"Company {company} needs at least one {', '.join(missing)}."
+            )
+
+        client = Client(raise_request_exception=False)
+        client.force_login(employee.user)
+        scenarios = build_scenarios(employee, writes=writes)
+
+        if options["routes"]:
+            scenarios = {name: scenarios[name] for name in options["routes"]}
+
+        routes = {}
+
+        for name, send in scenarios.items():
+            result = routes[name] = measure_requests(
+                partial(send, client), options["runs"], options["warmup"]
+            )
+            self.stdout.write(
+                f"  {name:<24} p50 {result['p50_ms']:>8.2f} ms  "
+                f"p95 {result['p95_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  "
+                f"{result['queries']:>3} consultas  {result['bytes']:>9} bytes  "
+                f"HTTP {result['status']}"
+            )
+
+        return routes
+
+    def _employee(self, username=None):
+        employees = Employee.objects.select_related("user", "company")
+
+        if username:
+            employees = employees.filter(user__username=username)
+
+        employee = employees.order_by("id").first()
+
+        if employee is None:
+            raise CommandError("No employee to log in as.")
+
+        return employee
+
+    def _run_current(self, options) -> dict:
+        self.stdout.write("Base de datos actual (sin rutas de escritura):")
+
+        with transaction.atomic():
+            employee = self._employee(options["username"])
+            routes = self._measure(options, employee, writes=False)
+            transaction.set_rollback(True)
+
+        return {"routes": routes}
+
+    def _run_seeded(self, options, size: int) -> dict:
+        self.stdout.write(f"{size} pedidos por empresa:")
+        # Each size gets a fresh test database, so the seeded rows and the
+        # writes of the benchmark never touch the configured one.
+        old_config = setup_databases(
+            verbosity=0, interactive=False, serialized_aliases=set()
+        )
+
+        try:
+            cache.clear()
+            dataset = DataSeeder(
+                companies=options["companies"],
+                products=max(30, min(2000, size // 50)),
+                customers=max(50, size // 5),
+                orders=size,
+                seed=options["seed"],
+            ).run()
+
+            return {
+                "dataset": dataset,
+                "routes": self._measure(options, self._employee()),
+            }
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def handle(self, *args, **options):
+        if options["runs"] < 1 or options["warmup"] < 0:
+            raise CommandError("--runs must be positive and --warmup not negative.")
+
+        if min(options["sizes"]) < 1 or options["companies"] < 1:
+            raise CommandError("--sizes and --companies must be positive.")
+
+        if options["update_baseline"] and options["baseline"] is None:
+            raise CommandError("--update-baseline needs --baseline.")
+
+        routes = named_routes() - SKIPPED_ROUTES.keys()
+        unknown = set(options["routes"] or []) - routes
+
+        if unknown:
+            raise CommandError(f"Unknown routes: {', '.join(sorted(unknown))}.")
+
+        writes = set(options["routes"] or []) & WRITE_ROUTES
+
+        if options["current_data"] and writes:
+            raise CommandError(
+                "--current-data does not measure write routes: "
+                f"{', '.join(sorted(writes))}."
+            )
+
+        production = production_settings()
+        production.enable()
+
+        try:
+            if options["current_data"]:
+                sizes = {"current": self._run_current(options)}
+            else:
+                sizes = {
+                    str(size): self._run_seeded(options, size)
+                    for size in options["sizes"]
+                }
+        finally:
+            production.disable()
+
+        results = {
+            "created_at": timezone.now().isoformat(),
+            "runs": options["runs"],
+            "sizes": sizes,
+        }
+        options["output"].write_text(json.dumps(results, indent=2))
+        self.stdout.write(f"Resultados guardados en {options['output']}.")
+
+        failures = [
+            f"{name} ({size}): {result['errors']} error responses"
+            for size, measured in sizes.items()
+            for name, result in measured["routes"].items()
+            if result["errors"]
+        ]
+
+        if options["update_baseline"]:
+            options["baseline"].write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Línea base actualizada en {options['baseline']}.")
+        elif options["baseline"] is not None:
+            if not options["baseline"].exists():
+                raise CommandError(f"{options['baseline']} does not exist.")
+
+            baseline = json.loads(options["baseline"].read_text())
+            failures += find_regressions(
+                sizes, baseline["sizes"], options["tolerance"]
+            )
+
+        if failures:
+            raise CommandError("Benchmark regressions:\n" + "\n".join(failures))
+
+        self.stdout.write(self.style.SUCCESS("Sin regresiones."))
@@ -0,0 +1,95 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases
+
+from companies.models import Company
+from foodies.plans import HOT_QUERIES, analyze_tables, check_plans
+from foodies.seed import DataSeeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Explain the hot queries on a seeded dataset and fail when one of them "
+        "scans a whole table or sorts outside an index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--orders", type=int, default=20000, help="Orders per seeded company."
+        )
+        parser.add_argument(
+            "--companies", type=int, default=2, help="Seeded companies."
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--current-data",
+            action="store_true",
+            help="Explain against the current database instead of a seeded one.",
+        )
+        parser.add_argument(
+            "--queries", nargs="+", help="Only explain these hot queries."
+        )
+
+    def _check(self, options) -> list[str]:
+        company = Company.objects.order_by("id").first()
+
+        if company is None:
+            raise CommandError("No company to explain the queries for.")
+
+        failures = []
+
+        for name, result in check_plans(company, options["queries"]).items():
+            problems = result["problems"]
+            self.stdout.write(f"  {name:<22} {', '.join(problems) or 'ok'}")
+
+            if options["verbosity"] > 1 or problems:
+                for line in result["plan"].splitlines():
+                    self.stdout.write(f"      {line}")
+
+            failures += [f"{name}: {problem}" for problem in problems]
+
+        return failures
+
+    def _check_seeded(self, options) -> list[str]:
+        # Like benchmark_endpoints, a fresh test database keeps the seeded
+        # rows away from the configured one.
+        old_config = setup_databases(
+            verbosity=0, interactive=False, serialized_aliases=set()
+        )
+
+        try:
+            cache.clear()
+            size = options["orders"]
+            DataSeeder(
+                companies=options["companies"],
+                products=max(30, min(2000, size // 50)),
+                customers=max(50, size // 5),
+                orders=size,
+                seed=options["seed"],
+            ).run()
+            analyze_tables()
+            self.stdout.write(f"{size} pedidos por empresa:")
+
+            return self._check(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def handle(self, *args, **options):
+        unknown = set(options["queries"] or []) - HOT_QUERIES.keys()
+
+        if unknown:
+            raise CommandError(f"Unknown queries: {', '.join(sorted(unknown))}.")
+
+        if options["orders"] < 1 or options["companies"] < 1:
+            raise CommandError("--orders and --companies must be positive.")
+
+        if options["current_data"]:
+            self.stdout.write("Base de datos actual:")
+            failures = self._check(options)
+        else:
+            failures = self._check_seeded(options)
+
+        if failures:
+            raise CommandError("Query plan regressions:\n" + "\n".join(failures))
+
+        self.stdout.write(self.style.SUCCESS("Sin regresiones en los planes."))
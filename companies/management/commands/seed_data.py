@@ -0,0 +1,105 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from foodies.seed import BATCH_SIZE, DataSeeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic companies, catalogs, customers, "
+        "employees and order history for load and query-plan testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--companies", type=int, default=1)
+        parser.add_argument(
+            "--categories", type=int, default=8, help="Categories per company."
+        )
+        parser.add_argument(
+            "--products", type=int, default=200, help="Products per company."
+        )
+        parser.add_argument(
+            "--customers", type=int, default=2000, help="Customers per company."
+        )
+        parser.add_argument(
+            "--employees", type=int, default=5, help="Employees per company."
+        )
+        parser.add_argument(
+            "--orders", type=int, default=10000, help="Orders per company."
+        )
+        parser.add_argument(
+            "--days", type=int, default=90, help="Days of order history."
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Last day of history (YYYY-MM-DD). Defaults to today.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Same seed, same data."
+        )
+        parser.add_argument(
+            "--password",
+            default="foodies",
+            help="Password of every seeded employee.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Rows inserted per query.",
+        )
+        parser.add_argument(
+            "--skip-rollups",
+            action="store_true",
+            help="Do not rebuild the sales rollups for the seeded days.",
+        )
+
+    def handle(self, *args, **options):
+        if min(options["companies"], options["categories"], options["days"]) < 1:
+            raise CommandError(
+                "--companies, --categories and --days must be positive."
+            )
+
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        if min(options["products"], options["customers"], options["employees"]) < 0:
+            raise CommandError(
+                "--products, --customers and --employees must not be negative."
+            )
+
+        if options["orders"] < 0:
+            raise CommandError("--orders must not be negative.")
+
+        seeder = DataSeeder(
+            companies=options["companies"],
+            categories=options["categories"],
+            products=options["products"],
+            customers=options["customers"],
+            employees=options["employees"],
+            orders=options["orders"],
+            days=options["days"],
+            end=options["end"],
+            seed=options["seed"],
+            password=options["password"],
+            batch_size=options["batch_size"],
+            rollups=not options["skip_rollups"],
+            log=self.stdout.write if options["verbosity"] > 1 else None,
+        )
+        started = time.perf_counter()
+        counts = seeder.run()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{counts.get('companies', 0)} empresas, "
+                f"{counts.get('products', 0)} productos, "
+                f"{counts.get('customers', 0)} clientes, "
+                f"{counts.get('employees', 0)} empleados, "
+                f"{counts.get('orders', 0)} pedidos y "
+                f"{counts.get('order_lines', 0)} líneas creados en {elapsed:.1f} s."
+            )
+        )
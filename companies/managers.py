@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class TenantQuerySet(models.QuerySet):
+    """Queryset of a model that belongs to one or more companies."""
+
+    company_lookup = "company"
+
+    def for_company(self, company) -> "TenantQuerySet":
+        return self.filter(**{self.company_lookup: company})
+
+
+class TenantManager(models.Manager.from_queryset(TenantQuerySet)):
+    pass
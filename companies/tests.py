@@ -1,10 +1,36 @@
+import json
+import tempfile
+from datetime import date
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Count
 from django.db.utils import IntegrityError
 from django.test import TestCase
+from django.utils import timezone
 
 from faker import Faker
 from random import randint
 
+from customers.models import Customer
 from document_types.models import DocumentType
+from employees.models import Employee
+from foodies.benchmark import find_regressions
+from foodies.endpoints import (
+    SKIPPED_ROUTES,
+    WRITE_ROUTES,
+    build_scenarios,
+    named_routes,
+)
+from foodies.plans import analyze_tables, check_plans
+from foodies.queries import explain_sql, plan_problems
+from foodies.seed import DataSeeder
+from orders.models import Order, OrderDetail, OrderSubmission
+from products.models import Product
+from reports.models import DailySales
 from .models import Company
 
 
@@ -73,3 +99,243 @@ class CompaniesTest(TestCase):
             )
 
             self.document_type.delete()
+
+
+class SeedDataTest(TestCase):
+    def seed(self, *args):
+        out = StringIO()
+        call_command(
+            "seed_data",
+            "--products",
+            "30",
+            "--customers",
+            "50",
+            "--employees",
+            "2",
+            "--orders",
+            "300",
+            "--days",
+            "14",
+            "--end",
+            "2026-03-15",
+            *args,
+            stdout=out,
+        )
+
+        return out.getvalue()
+
+    def history(self, company) -> list:
+        orders = (
+            Order.objects.filter(company=company)
+            .select_related("customer")
+            .prefetch_related("orderdetail_set__product")
+            .order_by("id")
+        )
+
+        return [
+            (
+                order.created_at,
+                order.total,
+                order.item_count,
+                order.customer.phone_number[-7:],
+                [
+                    (line.product.name, line.quantity)
+                    for line in order.orderdetail_set.all()
+                ],
+            )
+            for order in orders
+        ]
+
+    def test_seed_data_creates_the_requested_rows(self):
+        """El comando crea las filas pedidas y pedidos consistentes."""
+        out = self.seed("--companies", "2")
+
+        self.assertEqual(Company.objects.count(), 2)
+        self.assertEqual(Product.objects.count(), 60)
+        self.assertEqual(Customer.objects.count(), 100)
+        self.assertEqual(Employee.objects.count(), 4)
+        self.assertEqual(Order.objects.count(), 600)
+        self.assertIn("600 pedidos", out)
+
+        for company in Company.objects.all():
+            self.assertEqual(Customer.objects.for_company(company).count(), 50)
+
+        order = Order.objects.annotate(lines=Count("orderdetail")).first()
+        details = OrderDetail.objects.filter(order=order)
+        self.assertEqual(order.lines, details.count())
+        self.assertEqual(
+            order.total, sum(line.unit_price * line.quantity for line in details)
+        )
+        self.assertEqual(order.item_count, sum(line.quantity for line in details))
+        self.assertEqual(
+            Order.objects.filter(
+                company=order.company, attended_by__employee__company=order.company
+            ).count(),
+            300,
+        )
+
+    def test_seed_data_keeps_the_history_dates(self):
+        """Los pedidos quedan en los días pedidos y se reconstruyen los acumulados."""
+        self.seed()
+
+        days = {
+            timezone.localdate(created_at)
+            for created_at in Order.objects.values_list("created_at", flat=True)
+        }
+        self.assertGreaterEqual(min(days), date(2026, 3, 2))
+        self.assertLessEqual(max(days), date(2026, 3, 15))
+        self.assertEqual(
+            sum(DailySales.objects.values_list("order_count", flat=True)), 300
+        )
+
+    def test_seed_data_is_deterministic(self):
+        """La misma semilla genera los mismos datos."""
+        self.seed()
+        self.seed()
+        first, second = Company.objects.order_by("id")
+
+        self.assertEqual(first.name, second.name)
+        self.assertEqual(self.history(first), self.history(second))
+
+        self.seed("--seed", "1")
+        third = Company.objects.order_by("id").last()
+        self.assertNotEqual(self.history(first), self.history(third))
+
+    def test_seed_data_rejects_invalid_sizes(self):
+        """Tamaños no válidos se rechazan."""
+        with self.assertRaises(CommandError):
+            self.seed("--companies", "0")
+
+
+class BenchmarkEndpointsTest(TestCase):
+    def setUp(self) -> None:
+        DataSeeder(products=10, customers=10, employees=1, orders=20, days=3).run()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output = Path(directory.name) / "resultados.json"
+
+    def benchmark(self, *args):
+        out = StringIO()
+        call_command(
+            "benchmark_endpoints",
+            "--current-data",
+            "--runs",
+            "2",
+            "--warmup",
+            "0",
+            "--output",
+            str(self.output),
+            *args,
+            stdout=out,
+        )
+
+        return out.getvalue()
+
+    def test_every_named_route_is_benchmarked_or_skipped(self):
+        """Cada ruta con nombre tiene un escenario o un motivo para omitirla."""
+        scenarios = build_scenarios(Employee.objects.select_related("company").get())
+
+        self.assertEqual(set(scenarios) | set(SKIPPED_ROUTES), named_routes())
+        self.assertFalse(set(scenarios) & set(SKIPPED_ROUTES))
+
+    def test_benchmark_writes_results_without_errors(self):
+        """El benchmark guarda latencias, consultas y tamaño de cada ruta."""
+        stock = dict(Product.objects.values_list("id", "stock"))
+        out = self.benchmark()
+        routes = json.loads(self.output.read_text())["sizes"]["current"]["routes"]
+
+        self.assertEqual(
+            set(routes), named_routes() - set(SKIPPED_ROUTES) - WRITE_ROUTES
+        )
+        self.assertTrue(all(route["errors"] == 0 for route in routes.values()))
+        self.assertEqual(routes["api_order_detail"]["queries"], 5)
+        self.assertGreater(routes["orders"]["bytes"], 0)
+        self.assertIn("Sin regresiones.", out)
+        self.assertEqual(Order.objects.count(), 20)
+        self.assertFalse(OrderSubmission.objects.exists())
+        self.assertEqual(dict(Product.objects.values_list("id", "stock")), stock)
+
+    def test_current_data_rejects_write_routes_and_empty_companies(self):
+        """Con la base actual no se miden escrituras ni empresas sin datos."""
+        with self.assertRaisesMessage(CommandError, "create_order_api"):
+            self.benchmark("--routes", "create_order_api")
+
+        Order.objects.all().delete()
+
+        with self.assertRaisesMessage(CommandError, "needs at least one order."):
+            self.benchmark()
+
+    def test_benchmark_fails_on_regression_against_baseline(self):
+        """Una ruta con más consultas que la línea base hace fallar el benchmark."""
+        baseline = self.output.with_name("base.json")
+        self.benchmark(
+            "--routes", "orders", "--baseline", str(baseline), "--update-baseline"
+        )
+        results = json.loads(baseline.read_text())
+        results["sizes"]["current"]["routes"]["orders"]["queries"] -= 1
+        baseline.write_text(json.dumps(results))
+
+        with self.assertRaisesMessage(CommandError, "orders (current)"):
+            self.benchmark("--routes", "orders", "--baseline", str(baseline))
+
+    def test_find_regressions_ignores_noise(self):
+        """Cambios pequeños de latencia no cuentan como regresión."""
+        def results(queries, p95_ms, size):
+            return {
+                "1000": {
+                    "routes": {
+                        "orders": {"queries": queries, "p95_ms": p95_ms, "bytes": size}
+                    }
+                }
+            }
+
+        baseline = results(6, 4.0, 100)
+
+        self.assertEqual(find_regressions(results(6, 5.5, 110), baseline, 0.25), [])
+        self.assertEqual(
+            len(find_regressions(results(7, 20.0, 200), baseline, 0.25)), 3
+        )
+
+
+class QueryPlanTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        DataSeeder(companies=2, products=100, customers=500, orders=3000).run()
+        analyze_tables()
+
+    def test_hot_queries_use_indexes(self):
+        """Las consultas frecuentes no recorren tablas completas ni ordenan aparte."""
+        for company in Company.objects.all():
+            for name, result in check_plans(company).items():
+                with self.subTest(company=company.id, query=name):
+                    self.assertEqual(result["problems"], [], result["plan"])
+
+    def test_plan_problems_finds_scans_and_sorts(self):
+        """Un recorrido completo y un ordenamiento temporal cuentan como problemas."""
+        products = Product.objects.filter(description__icontains="x").order_by("price")
+        plan = explain_sql(connection, *products.query.sql_with_params())
+
+        self.assertEqual(
+            plan_problems(plan, "sqlite"),
+            ["full scan of products_product", "temporary B-tree for ORDER BY"],
+        )
+        self.assertEqual(
+            plan_problems(
+                "Sort  (cost=10.1..10.2 rows=5 width=8)\n"
+                "  Sort Key: price\n"
+                "  ->  Seq Scan on products_product  (cost=0.0..9.9 rows=5 width=8)",
+                "postgresql",
+            ),
+            ["Sort step", "full scan of products_product"],
+        )
+
+    def test_check_query_plans_command(self):
+        """El comando revisa los planes y rechaza consultas desconocidas."""
+        out = StringIO()
+        call_command("check_query_plans", "--current-data", stdout=out)
+
+        self.assertIn("stock_update", out.getvalue())
+        self.assertIn("Sin regresiones en los planes.", out.getvalue())
+
+        with self.assertRaisesMessage(CommandError, "Unknown queries: nope."):
+            call_command("check_query_plans", "--queries", "nope")
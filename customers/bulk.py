@@ -0,0 +1,140 @@
+import csv
+from itertools import islice
+from typing import Iterable, Iterator
+
+from django.db.transaction import atomic
+
+from foodies.tabular import Echo, RowValidator, read_rows
+
+from .forms import CustomerForm
+from .models import Customer
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+HEADER_ALIASES = {
+    "nombre": "name",
+    "telefono": "phone_number",
+    "teléfono": "phone_number",
+    "phone": "phone_number",
+    "direccion": "address",
+    "dirección": "address",
+    "barrio": "neighborhood",
+}
+CSV_HEADER = ["id", "name", "phone_number", "address", "neighborhood"]
+
+
+def read_customer_rows(file, delimiter: str = ","):
+    return read_rows(file, delimiter, HEADER_ALIASES)
+
+
+class CustomerImporter:
+    """
+    Create a company's customers from tabular rows.
+
+    Each batch is validated with the ``CustomerForm`` rules and written with
+    two bulk inserts, one for the customers and one for their company
+    memberships. Rows whose normalized phone already belongs to a customer
+    of the company, or to an earlier row of the file, are skipped.
+
+    Customers are kept per company: a phone number identifies a customer
+    within one company only, so a phone another company already has creates
+    a new customer instead of linking that company's record, whose name and
+    address are not ours to show or edit. ``merge_duplicate_customers``
+    follows the same rule.
+    """
+
+    def __init__(self, company, batch_size: int = BATCH_SIZE) -> None:
+        self.company = company
+        self.batch_size = batch_size
+        self.validator = RowValidator(CustomerForm)
+        self.created = 0
+        self.duplicates = 0
+        self.error_count = 0
+        self.errors = []
+
+    def _add_error(self, line: int, errors: dict) -> None:
+        self.error_count += 1
+
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": line, "errors": errors})
+
+    def _import_batch(self, rows: list) -> None:
+        customers = []
+
+        for line, row in rows:
+            cleaned, errors = self.validator.clean(row)
+
+            if errors:
+                self._add_error(line, errors)
+                continue
+
+            customer = Customer(**cleaned)
+            customer.update_search_keys()
+            customers.append(customer)
+
+        if not customers:
+            return
+
+        with atomic():
+            existing = set(
+                Customer.objects.for_company(self.company)
+                .filter(phone_key__in={customer.phone_key for customer in customers})
+                .exclude(phone_key="")
+                .values_list("phone_key", flat=True)
+            )
+            new = []
+
+            for customer in customers:
+                if customer.phone_key in existing:
+                    self.duplicates += 1
+                    continue
+
+                if customer.phone_key:
+                    # Later rows with the same phone are duplicates of this one.
+                    existing.add(customer.phone_key)
+
+                new.append(customer)
+
+            new = Customer.objects.bulk_create(new)
+            Membership = Customer.companies.through
+            Membership.objects.bulk_create(
+                Membership(customer_id=customer.pk, company_id=self.company.id)
+                for customer in new
+            )
+
+        self.created += len(new)
+
+    def run(self, rows) -> dict:
+        rows = iter(rows)
+
+        while batch := list(islice(rows, self.batch_size)):
+            self._import_batch(batch)
+
+        return {
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+def iter_customers(company_id: int, batch_size: int = BATCH_SIZE) -> Iterator[dict]:
+    """Yield a company's customers in ``id`` ranges of ``batch_size``."""
+    customers = (
+        Customer.objects.for_company(company_id).order_by("id").values(*CSV_HEADER)
+    )
+    last_id = 0
+
+    while batch := list(customers.filter(id__gt=last_id)[:batch_size]):
+        yield from batch
+
+        last_id = batch[-1]["id"]
+
+
+def to_csv(customers: Iterable[dict]) -> Iterator[str]:
+    writer = csv.writer(Echo())
+
+    yield writer.writerow(CSV_HEADER)
+
+    for customer in customers:
+        yield writer.writerow([customer[field] for field in CSV_HEADER])
@@ -0,0 +1,106 @@
+from collections import defaultdict
+
+from django.db.models import Case, Count, Value, When
+from django.db.transaction import atomic
+
+from orders.models import Order
+
+from .models import Customer
+
+BATCH_SIZE = 100
+
+Membership = Customer.companies.through
+
+
+def find_duplicate_phone_keys(company_id: int | None = None) -> list[tuple[int, str]]:
+    """
+    The ``(company_id, phone_key)`` pairs shared by more than one customer of
+    the same company. Customers of different companies never count as
+    duplicates of each other.
+    """
+    memberships = Membership.objects.exclude(customer__phone_key="")
+
+    if company_id is not None:
+        memberships = memberships.filter(company_id=company_id)
+
+    return list(
+        memberships.values("company_id", "customer__phone_key")
+        .annotate(customers=Count("customer_id", distinct=True))
+        .filter(customers__gt=1)
+        .order_by("company_id", "customer__phone_key")
+        .values_list("company_id", "customer__phone_key")
+    )
+
+
+def _merge_batch(groups: list[tuple[int, str]]) -> int:
+    phone_keys = defaultdict(list)
+
+    for company_id, phone_key in groups:
+        phone_keys[company_id].append(phone_key)
+
+    merged = set()
+
+    for company_id, keys in phone_keys.items():
+        survivors = {}
+        duplicates = {}
+
+        for customer_id, phone_key in (
+            Membership.objects.filter(
+                company_id=company_id, customer__phone_key__in=keys
+            )
+            .order_by("customer_id")
+            .values_list("customer_id", "customer__phone_key")
+        ):
+            survivor = survivors.setdefault(phone_key, customer_id)
+
+            if customer_id != survivor:
+                duplicates[customer_id] = survivor
+
+        if not duplicates:
+            continue
+
+        # Only this company's orders and membership move; the duplicate stays
+        # as it is for the other companies it belongs to.
+        Order.objects.filter(company_id=company_id, customer_id__in=duplicates).update(
+            customer_id=Case(
+                *(
+                    When(customer_id=old, then=Value(new))
+                    for old, new in duplicates.items()
+                )
+            )
+        )
+        Membership.objects.filter(
+            company_id=company_id, customer_id__in=duplicates
+        ).delete()
+        merged.update(duplicates)
+
+    Customer.objects.filter(id__in=merged, companies__isnull=True).exclude(
+        id__in=Order.objects.filter(customer_id__in=merged).values("customer_id")
+    ).delete()
+
+    return len(merged)
+
+
+def merge_duplicate_customers(
+    company_id: int | None = None, batch_size: int = BATCH_SIZE
+) -> tuple[int, int]:
+    """
+    Merge the customers of each company that share a normalized phone number
+    into the company's oldest one, moving the company's orders over to it.
+
+    A phone number identifies a customer within one company only (see
+    ``CustomerImporter``), so customers are never merged across companies. A
+    duplicate is deleted once no company and no order references it.
+
+    Each batch of phone numbers is merged in its own transaction, so a long
+    run never holds locks on the whole table. Returns the number of duplicated
+    phone numbers processed and of customers merged.
+    """
+    groups = find_duplicate_phone_keys(company_id)
+    merged = 0
+
+    for start in range(0, len(groups), batch_size):
+        with atomic():
+            merged += _merge_batch(groups[start : start + batch_size])
+
+    return len(groups), merged
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.transaction import atomic, set_rollback
+
+from companies.models import Company
+from customers.bulk import BATCH_SIZE, CustomerImporter, iter_customers, to_csv
+
+
+def _synthetic_rows(count: int):
+    for i in range(count):
+        yield i + 2, {
+            "name": f"Cliente {i}",
+            "phone_number": f"+57 3{i:09d}",
+            "address": f"Calle {i % 200} # {i % 90}-{i % 70}",
+            "neighborhood": f"Barrio {i % 300}",
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure customer import and export throughput on synthetic rows. "
+        "Everything runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company", type=int, required=True, help="Company to import into."
+        )
+        parser.add_argument(
+            "--rows", type=int, default=50000, help="Synthetic rows to import."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Rows validated and written per transaction.",
+        )
+
+    def _report(self, label: str, rows: int, elapsed: float) -> None:
+        self.stdout.write(
+            f"{label}: {rows} filas en {elapsed:.2f} s "
+            f"({rows / max(elapsed, 1e-9):,.0f} filas/s)"
+        )
+
+    def handle(self, *args, **options):
+        if options["rows"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--rows and --batch-size must be positive.")
+
+        try:
+            company = Company.objects.get(id=options["company"])
+        except Company.DoesNotExist:
+            raise CommandError(f"Company {options['company']} does not exist.")
+
+        with atomic():
+            importer = CustomerImporter(company, options["batch_size"])
+
+            started = time.perf_counter()
+            result = importer.run(_synthetic_rows(options["rows"]))
+            self._report("Importación", options["rows"], time.perf_counter() - started)
+
+            started = time.perf_counter()
+            exported = sum(1 for _ in to_csv(iter_customers(company.id))) - 1
+            self._report("Exportación", exported, time.perf_counter() - started)
+
+            set_rollback(True)
+
+        self.stdout.write(
+            f"{result['created']} creados, {result['duplicates']} duplicados, "
+            f"{result['error_count']} con errores (revertido)."
+        )
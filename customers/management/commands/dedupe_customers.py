@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from customers.dedupe import (
+    BATCH_SIZE,
+    find_duplicate_phone_keys,
+    merge_duplicate_customers,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge the customers of each company that share the same normalized "
+        "phone number. Customers are never merged across companies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, help="Only merge this company.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Phone numbers merged per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many phone numbers are duplicated.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        if options["dry_run"]:
+            duplicated = len(find_duplicate_phone_keys(options["company"]))
+            self.stdout.write(f"{duplicated} teléfonos duplicados.")
+            return
+
+        groups, removed = merge_duplicate_customers(
+            company_id=options["company"], batch_size=options["batch_size"]
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{removed} clientes fusionados en {groups} teléfonos duplicados."
+            )
+        )
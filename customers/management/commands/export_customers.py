@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from customers.bulk import BATCH_SIZE, iter_customers, to_csv
+
+
+class Command(BaseCommand):
+    help = "Stream a company's customers as CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company", type=int, required=True, help="Company to export."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Customers read per query.",
+        )
+        parser.add_argument(
+            "--output", help="File to write to. Defaults to standard output."
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        chunks = to_csv(iter_customers(options["company"], options["batch_size"]))
+
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from companies.models import Company
+from customers.bulk import BATCH_SIZE, CustomerImporter, read_customer_rows
+from foodies.tabular import ImportFormatError, get_delimiter
+
+
+class Command(BaseCommand):
+    help = "Create a company's customers from a CSV or TSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File with one customer per row.")
+        parser.add_argument(
+            "--company", type=int, required=True, help="Company to import into."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Rows validated and written per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        try:
+            company = Company.objects.get(id=options["company"])
+            delimiter = get_delimiter(options["path"])
+
+            with open(options["path"], "rb") as file:
+                result = CustomerImporter(company, options["batch_size"]).run(
+                    read_customer_rows(file, delimiter)
+                )
+        except Company.DoesNotExist:
+            raise CommandError(f"Company {options['company']} does not exist.")
+        except (ImportFormatError, OSError, UnicodeDecodeError) as e:
+            raise CommandError(str(e))
+
+        for error in result["errors"]:
+            self.stderr.write(f"Fila {error['row']}: {error['errors']}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result['created']} clientes creados, {result['duplicates']} "
+                f"duplicados, {result['error_count']} filas con errores."
+            )
+        )
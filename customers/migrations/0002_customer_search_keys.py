@@ -0,0 +1,81 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:33
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Frozen copies of customers.search.normalize_text and reverse_digits, so
+# later changes there do not change this backfill.
+def normalize_text(value):
+    value = unicodedata.normalize("NFKD", value or "")
+    value = value.encode("ascii", "ignore").decode().lower()
+
+    return " ".join(re.findall(r"[a-z0-9]+", value))
+
+
+def reverse_digits(value):
+    return re.sub(r"\D", "", value or "")[::-1]
+
+
+def fill_search_keys(apps, schema_editor):
+    Customer = apps.get_model("customers", "Customer")
+    customers = []
+
+    for customer in Customer.objects.only(
+        "id", "name", "neighborhood", "phone_number"
+    ).iterator(chunk_size=1000):
+        customer.name_key = normalize_text(customer.name)
+        customer.neighborhood_key = normalize_text(customer.neighborhood)
+        customer.phone_suffix_key = reverse_digits(customer.phone_number)
+        customers.append(customer)
+
+        if len(customers) == 1000:
+            Customer.objects.bulk_update(
+                customers, ["name_key", "neighborhood_key", "phone_suffix_key"]
+            )
+            customers = []
+
+    Customer.objects.bulk_update(
+        customers, ["name_key", "neighborhood_key", "phone_suffix_key"]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0002_alter_company_options'),
+        ('customers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='name_key',
+            field=models.CharField(default='', editable=False, max_length=255, verbose_name='Nombre normalizado'),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='neighborhood_key',
+            field=models.CharField(default='', editable=False, max_length=255, verbose_name='Barrio normalizado'),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='phone_suffix_key',
+            field=models.CharField(default='', editable=False, max_length=30, verbose_name='Teléfono invertido'),
+        ),
+        migrations.RunPython(fill_search_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['name_key'], name='customers_name_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['neighborhood_key'], name='customers_neighborhood_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['phone_suffix_key'], name='customers_phone_suffix_key_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:36
+
+import re
+
+from django.conf import settings
+from django.db import migrations, models
+
+COUNTRY_CODES = {"es-co": ("57", 10)}
+
+
+# A frozen copy of customers.phones.normalize_phone, so later changes there
+# do not change this backfill.
+def normalize_phone(value):
+    digits = re.sub(r"\D", "", value or "")
+    country = COUNTRY_CODES.get(settings.LANGUAGE_CODE.lower())
+
+    if digits.startswith("00"):
+        digits = digits[2:]
+
+    if country is not None:
+        code, length = country
+
+        if len(digits) == len(code) + length and digits.startswith(code):
+            digits = digits[len(code) :]
+
+    return digits
+
+
+def fill_phone_key(apps, schema_editor):
+    Customer = apps.get_model("customers", "Customer")
+    customers = []
+
+    for customer in Customer.objects.only("id", "phone_number").iterator(
+        chunk_size=1000
+    ):
+        customer.phone_key = normalize_phone(customer.phone_number)
+        customers.append(customer)
+
+        if len(customers) == 1000:
+            Customer.objects.bulk_update(customers, ["phone_key"])
+            customers = []
+
+    Customer.objects.bulk_update(customers, ["phone_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0002_alter_company_options'),
+        ('customers', '0002_customer_search_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='phone_key',
+            field=models.CharField(default='', editable=False, max_length=30, verbose_name='Teléfono normalizado'),
+        ),
+        migrations.RunPython(fill_phone_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['phone_key'], name='customers_phone_key_idx'),
+        ),
+    ]
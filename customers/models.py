@@ -1,7 +1,20 @@
 from django.db import models
 
+from companies.managers import TenantQuerySet
 from companies.models import Company
 
+from .phones import normalize_phone
+from .search import normalize_text, reverse_digits
+
+
+class CustomerQuerySet(TenantQuerySet):
+    company_lookup = "companies"
+
+    def by_phone(self, phone_number: str) -> "CustomerQuerySet":
+        phone_key = normalize_phone(phone_number)
+
+        return self.filter(phone_key=phone_key) if phone_key else self.none()
+
 
 class Customer(models.Model):
     name: models.CharField = models.CharField(max_length=255, verbose_name="Nombre")
@@ -15,10 +28,56 @@ class Customer(models.Model):
         max_length=255, verbose_name="Barrio"
     )
     companies: models.ManyToManyField = models.ManyToManyField(Company)
+    name_key: models.CharField = models.CharField(
+        max_length=255, editable=False, default="", verbose_name="Nombre normalizado"
+    )
+    neighborhood_key: models.CharField = models.CharField(
+        max_length=255, editable=False, default="", verbose_name="Barrio normalizado"
+    )
+    phone_key: models.CharField = models.CharField(
+        max_length=30, editable=False, default="", verbose_name="Teléfono normalizado"
+    )
+    phone_suffix_key: models.CharField = models.CharField(
+        max_length=30, editable=False, default="", verbose_name="Teléfono invertido"
+    )
+
+    objects = CustomerQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Cliente"
         verbose_name_plural = "Clientes"
+        indexes = [
+            models.Index(fields=["name_key"], name="customers_name_key_idx"),
+            models.Index(
+                fields=["neighborhood_key"], name="customers_neighborhood_key_idx"
+            ),
+            models.Index(
+                fields=["phone_suffix_key"], name="customers_phone_suffix_key_idx"
+            ),
+            models.Index(fields=["phone_key"], name="customers_phone_key_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
+
+    def update_search_keys(self) -> None:
+        self.name_key = normalize_text(self.name)
+        self.neighborhood_key = normalize_text(self.neighborhood)
+        self.phone_key = normalize_phone(self.phone_number)
+        self.phone_suffix_key = reverse_digits(self.phone_number)
+
+    def save(self, *args, **kwargs) -> None:
+        self.update_search_keys()
+
+        update_fields = kwargs.get("update_fields")
+
+        if update_fields is not None:
+            kwargs["update_fields"] = {
+                *update_fields,
+                "name_key",
+                "neighborhood_key",
+                "phone_key",
+                "phone_suffix_key",
+            }
+
+        super().save(*args, **kwargs)
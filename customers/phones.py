@@ -0,0 +1,26 @@
+import re
+
+from django.conf import settings
+
+# Calling code of each supported locale and the length of its national numbers.
+COUNTRY_CODES = {"es-co": ("57", 10)}
+
+
+def normalize_phone(value: str, locale: str | None = None) -> str:
+    """
+    Reduce ``value`` to the digits of the national number, so that
+    "+57 310 555 1234", "0057 3105551234" and "(310) 555-1234" share a key.
+    """
+    digits = re.sub(r"\D", "", value or "")
+    country = COUNTRY_CODES.get((locale or settings.LANGUAGE_CODE).lower())
+
+    if digits.startswith("00"):
+        digits = digits[2:]
+
+    if country is not None:
+        code, length = country
+
+        if len(digits) == len(code) + length and digits.startswith(code):
+            digits = digits[len(code) :]
+
+    return digits
@@ -0,0 +1,73 @@
+import re
+import unicodedata
+
+from django.db.models.query import QuerySet
+
+SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 25
+MIN_PHONE_DIGITS = 3
+
+
+def normalize_text(value: str) -> str:
+    """Lowercase ``value`` and reduce it to unaccented ASCII letters and digits."""
+    value = unicodedata.normalize("NFKD", value or "")
+    value = value.encode("ascii", "ignore").decode().lower()
+
+    return " ".join(re.findall(r"[a-z0-9]+", value))
+
+
+def reverse_digits(value: str) -> str:
+    return re.sub(r"\D", "", value or "")[::-1]
+
+
+def _prefix_range(field: str, prefix: str) -> dict:
+    # A half-open range instead of LIKE so the B-tree index on ``field`` is used.
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+    return {f"{field}__gte": prefix, f"{field}__lt": upper}
+
+
+def get_search_limit(value: str | None) -> int:
+    try:
+        return max(1, min(int(value), MAX_SEARCH_LIMIT))
+    except (TypeError, ValueError):
+        return SEARCH_LIMIT
+
+
+def search_customers(
+    queryset: QuerySet, query: str, limit: int = SEARCH_LIMIT
+) -> list:
+    """
+    Return up to ``limit`` customers of ``queryset`` for a type-ahead query.
+
+    Queries made only of digits match the end of the phone number, which is
+    what callers read out; anything else matches the start of the name and,
+    to fill the remaining slots, the start of the neighborhood.
+    """
+    digits = re.sub(r"[\s()+.-]", "", query)
+
+    if digits.isdigit():
+        if len(digits) < MIN_PHONE_DIGITS:
+            return []
+
+        by_phone = queryset.filter(**_prefix_range("phone_suffix_key", digits[::-1]))
+
+        return list(by_phone.order_by("name_key", "id")[:limit])
+
+    key = normalize_text(query)
+
+    if not key:
+        return []
+
+    by_name = queryset.filter(**_prefix_range("name_key", key))
+    customers = list(by_name.order_by("name_key", "id")[:limit])
+
+    if len(customers) < limit:
+        by_neighborhood = queryset.filter(
+            **_prefix_range("neighborhood_key", key)
+        ).exclude(id__in=[customer.id for customer in customers])
+        customers += by_neighborhood.order_by("neighborhood_key", "id")[
+            : limit - len(customers)
+        ]
+
+    return customers
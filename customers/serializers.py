@@ -7,3 +7,9 @@ class CustomersSerializer(ModelSerializer):
     class Meta:
         model = Customer
         fields = ["id", "name"]
+
+
+class CustomerSearchSerializer(ModelSerializer):
+    class Meta:
+        model = Customer
+        fields = ["id", "name", "phone_number", "neighborhood"]
@@ -1,4 +1,9 @@
+import csv, io
 from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
 from django.urls import reverse
 from django.test import TestCase
 from faker import Faker
@@ -9,8 +14,13 @@ from rest_framework import status
 from companies.models import Company
 from document_types.models import DocumentType
 from employees.models import Employee
+from foodies.queries import query_budget
+from orders.models import Order
 
+from .bulk import CustomerImporter, iter_customers, read_customer_rows, to_csv
 from .models import Customer
+from .phones import normalize_phone
+from .search import normalize_text, reverse_digits
 from .serializers import CustomersSerializer
 
 
@@ -268,6 +278,19 @@ class CustomersListViewTest(TestCase):
         self.assertIn(self.customer2, customers)
         self.assertNotIn(self.customer1, customers)
 
+    def test_view_stays_within_query_budget(self):
+        """La lista no hace consultas adicionales por cada cliente"""
+        customers = Customer.objects.bulk_create(
+            Customer(name=f"Cliente {number}") for number in range(10)
+        )
+        self.company1.customer_set.add(*customers)
+        self.client.login(username="user1", password="password")
+
+        with query_budget(6):
+            response = self.client.get(reverse("customers"))
+
+        self.assertEqual(response.status_code, 200)
+
 
 class CustomerDetailViewTest(TestCase):
     def setUp(self):
@@ -336,6 +359,30 @@ class CustomerDetailViewTest(TestCase):
         response = self.client.get(invalid_url)
         self.assertEqual(response.status_code, 404)
 
+    def test_view_returns_404_for_other_company_customer(self):
+        """Prueba que la vista devuelva 404 si el cliente es de otra compañía"""
+        other_company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=self.company.document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        Employee.objects.filter(id=self.employee.id).update(company=other_company)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_view_stays_within_query_budget(self):
+        """El detalle se carga con un número fijo de consultas"""
+        with query_budget(6):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+
 
 class CustomerDeleteViewTest(TestCase):
     def setUp(self):
@@ -624,3 +671,515 @@ class CustomersAPITest(TestCase):
         # Verificar que el cliente de la compañía 1 no esté en la lista
         customer_ids = [customer["id"] for customer in response.data]
         self.assertNotIn(customer1.id, customer_ids)
+
+    def test_async_endpoint_matches_sync(self):
+        """Verificar que la versión asíncrona devuelve los mismos clientes"""
+        customer1 = Customer.objects.create(name="Customer 1")
+        customer2 = Customer.objects.create(name="Customer 2")
+        customer1.companies.add(self.company1)
+        customer2.companies.add(self.company2)
+        self.client.login(username="testuser1", password="password")
+
+        response = self.client.get(reverse("api_customers_async"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), self.client.get(self.url).json())
+        self.assertEqual(response.json(), [{"id": customer1.id, "name": "Customer 1"}])
+
+    def test_async_endpoint_requires_authentication(self):
+        """Verificar que la versión asíncrona también exige autenticación"""
+        response = self.client.get(reverse("api_customers_async"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_get_customers_stays_within_query_budget(self):
+        """La lista de clientes no hace consultas adicionales por cliente"""
+        customers = Customer.objects.bulk_create(
+            Customer(name=f"Cliente {number}") for number in range(10)
+        )
+        self.company1.customer_set.add(*customers)
+        self.client.login(username="testuser1", password="password")
+
+        with query_budget(4):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data), 10)
+
+
+class CustomerSearchAPITest(TestCase):
+    def setUp(self):
+        self.faker = Faker("es_CO")
+        self.faker.seed_instance(randint(0, 9999))
+        document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.company1 = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.company2 = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.user = User.objects.create_user(username="testuser1", password="password")
+        Employee.objects.create(user=self.user, company=self.company1)
+
+        self.ana = self.create_customer("Ána María", "+57 310 555 1234", "Laureles")
+        self.andres = self.create_customer("Andrés López", "3205559876", "Belén")
+        self.beatriz = self.create_customer(
+            "Beatriz Gómez", "604 444 1234", "Anapoima"
+        )
+        self.create_customer("Ana Ruiz", "3001112233", "Centro", self.company2)
+
+        self.client = APIClient()
+        self.client.login(username="testuser1", password="password")
+        self.url = reverse("api_customers_search")
+
+    def create_customer(self, name, phone_number, neighborhood, company=None):
+        customer = Customer.objects.create(
+            name=name,
+            phone_number=phone_number,
+            address=self.faker.address(),
+            neighborhood=neighborhood,
+        )
+        customer.companies.add(company or self.company1)
+
+        return customer
+
+    def search(self, query, **params):
+        response = self.client.get(self.url, {"q": query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return [customer["id"] for customer in response.data]
+
+    def test_search_keys_are_kept_in_sync(self):
+        """Las llaves de búsqueda se calculan al guardar"""
+        self.assertEqual(self.ana.name_key, "ana maria")
+        self.assertEqual(self.ana.phone_suffix_key, "432155501375")
+
+        self.ana.name = "Anita"
+        self.ana.save(update_fields=["name"])
+        self.ana.refresh_from_db()
+
+        self.assertEqual(self.ana.name_key, "anita")
+
+    def test_normalization_helpers(self):
+        """Se eliminan tildes, mayúsculas y símbolos"""
+        self.assertEqual(normalize_text("  Peñalosa-GÓMEZ "), "penalosa gomez")
+        self.assertEqual(reverse_digits("(604) 444-12"), "21444406")
+
+    def test_authentication_required(self):
+        """Verificar que se requiere autenticación"""
+        response = APIClient().get(self.url, {"q": "ana"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_name_prefix_ignores_accents_and_case(self):
+        """El prefijo del nombre no distingue tildes ni mayúsculas"""
+        self.assertEqual(
+            self.search("AN"), [self.ana.id, self.andres.id, self.beatriz.id]
+        )
+        self.assertEqual(self.search("andres"), [self.andres.id])
+
+    def test_name_matches_come_before_neighborhood_matches(self):
+        """Las coincidencias de barrio completan los resultados"""
+        self.assertEqual(self.search("ana"), [self.ana.id, self.beatriz.id])
+        self.assertEqual(self.search("bel"), [self.andres.id])
+
+    def test_phone_digits_match_the_end_of_the_number(self):
+        """Los dígitos buscan por el final del teléfono"""
+        self.assertEqual(self.search("1234"), [self.ana.id, self.beatriz.id])
+        self.assertEqual(self.search("555 9876"), [self.andres.id])
+        self.assertEqual(self.search("12"), [])
+
+    def test_results_are_limited_and_scoped_to_the_company(self):
+        """Se devuelven como máximo N clientes de la compañía"""
+        self.assertEqual(self.search("a", limit=1), [self.ana.id])
+        self.assertEqual(self.search("ruiz"), [])
+        self.assertEqual(self.search(""), [])
+
+    def test_search_uses_the_prefix_indexes(self):
+        """Las búsquedas usan los índices en lugar de recorrer la tabla"""
+        queryset = Customer.objects.filter(
+            name_key__gte="an", name_key__lt="ao"
+        ).order_by("name_key")
+
+        self.assertIn("customers_name_key_idx", queryset.explain())
+
+
+class CustomerPhoneTest(TestCase):
+    def setUp(self):
+        self.faker = Faker("es_CO")
+        self.faker.seed_instance(randint(0, 9999))
+        document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.company1 = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.company2 = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.user = User.objects.create_user(username="testuser1", password="password")
+        Employee.objects.create(user=self.user, company=self.company1)
+
+        self.client = APIClient()
+        self.client.login(username="testuser1", password="password")
+        self.url = reverse("api_customers_phone")
+
+    def create_customer(self, phone_number, *companies):
+        customer = Customer.objects.create(
+            name=self.faker.name(),
+            phone_number=phone_number,
+            address=self.faker.address(),
+            neighborhood=self.faker.city(),
+        )
+        customer.companies.add(*(companies or [self.company1]))
+
+        return customer
+
+    def test_normalize_phone_handles_the_colombian_country_code(self):
+        """El indicativo del país se elimina de los números nacionales"""
+        for phone_number in (
+            "3105551234",
+            "+57 310 555 1234",
+            "0057 310-555-1234",
+            "(57) 310.555.1234",
+        ):
+            self.assertEqual(normalize_phone(phone_number), "3105551234")
+
+        self.assertEqual(normalize_phone("571234"), "571234")
+        self.assertEqual(normalize_phone("+1 310 555 1234"), "13105551234")
+        self.assertEqual(normalize_phone("sin teléfono"), "")
+
+    def test_phone_key_is_stored_on_save(self):
+        """La llave normalizada se guarda junto al valor original"""
+        customer = self.create_customer("+57 310 555 1234")
+
+        self.assertEqual(customer.phone_number, "+57 310 555 1234")
+        self.assertEqual(customer.phone_key, "3105551234")
+
+    def test_lookup_by_phone_uses_the_index(self):
+        """La búsqueda exacta por teléfono usa el índice"""
+        queryset = Customer.objects.by_phone("3105551234")
+
+        self.assertIn("customers_phone_key_idx", queryset.explain())
+
+    def test_api_finds_the_caller_of_the_company(self):
+        """La API encuentra al cliente que llama, solo en su compañía"""
+        customer = self.create_customer("310 555 1234")
+        self.create_customer("3105551234", self.company2)
+
+        response = self.client.get(self.url, {"phone": "+573105551234"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in response.data], [customer.id])
+
+    def test_api_returns_nothing_without_digits(self):
+        """Sin dígitos no se devuelve ningún cliente"""
+        self.create_customer("")
+
+        response = self.client.get(self.url, {"phone": "abc"})
+
+        self.assertEqual(response.data, [])
+
+    def test_dedupe_merges_customers_and_rewrites_orders(self):
+        """El comando fusiona duplicados de cada compañía y mueve sus pedidos"""
+        original = self.create_customer("3105551234")
+        duplicate = self.create_customer("+57 310 555 1234")
+        other = self.create_customer("3209998877", self.company2)
+        other_duplicate = self.create_customer("320 999 8877", self.company2)
+        order = Order.objects.create(
+            attended_by=self.user, customer=duplicate, company=self.company1
+        )
+        other_order = Order.objects.create(
+            attended_by=self.user, customer=other_duplicate, company=self.company2
+        )
+
+        call_command("dedupe_customers", "--batch-size", "1", stdout=io.StringIO())
+
+        self.assertFalse(
+            Customer.objects.filter(id__in=[duplicate.id, other_duplicate.id]).exists()
+        )
+        order.refresh_from_db()
+        other_order.refresh_from_db()
+        self.assertEqual(order.customer_id, original.id)
+        self.assertEqual(other_order.customer_id, other.id)
+
+    def test_dedupe_never_merges_across_companies(self):
+        """Clientes de compañías distintas con el mismo teléfono no se fusionan"""
+        first = self.create_customer("3105551234")
+        second = self.create_customer("+57 310 555 1234", self.company2)
+        order = Order.objects.create(
+            attended_by=self.user, customer=second, company=self.company2
+        )
+
+        call_command("dedupe_customers", stdout=io.StringIO())
+
+        self.assertEqual(Customer.objects.filter(phone_key="3105551234").count(), 2)
+        order.refresh_from_db()
+        self.assertEqual(order.customer_id, second.id)
+        self.assertEqual(list(first.companies.all()), [self.company1])
+        self.assertEqual(list(second.companies.all()), [self.company2])
+
+    def test_dedupe_keeps_duplicates_other_companies_still_use(self):
+        """Un duplicado compartido solo sale de la compañía que se fusiona"""
+        original = self.create_customer("3105551234")
+        shared = self.create_customer("3105551234", self.company1, self.company2)
+        order = Order.objects.create(
+            attended_by=self.user, customer=shared, company=self.company1
+        )
+        other_order = Order.objects.create(
+            attended_by=self.user, customer=shared, company=self.company2
+        )
+
+        call_command(
+            "dedupe_customers", "--company", str(self.company1.id), stdout=io.StringIO()
+        )
+
+        order.refresh_from_db()
+        other_order.refresh_from_db()
+        self.assertEqual(order.customer_id, original.id)
+        self.assertEqual(other_order.customer_id, shared.id)
+        self.assertEqual(list(shared.companies.all()), [self.company2])
+
+    def test_dedupe_can_be_limited_to_a_company(self):
+        """El comando puede limitarse a una compañía"""
+        self.create_customer("3105551234", self.company2)
+        self.create_customer("3105551234", self.company2)
+        self.create_customer("3209998877")
+        self.create_customer("3209998877")
+
+        call_command(
+            "dedupe_customers", "--company", str(self.company1.id), stdout=io.StringIO()
+        )
+
+        self.assertEqual(Customer.objects.filter(phone_key="3209998877").count(), 1)
+        self.assertEqual(Customer.objects.filter(phone_key="3105551234").count(), 2)
+
+    def test_dedupe_dry_run_does_not_change_anything(self):
+        """La simulación no modifica los clientes"""
+        self.create_customer("3105551234")
+        self.create_customer("3105551234")
+        output = io.StringIO()
+
+        call_command("dedupe_customers", "--dry-run", stdout=output)
+
+        self.assertIn("1 teléfonos duplicados", output.getvalue())
+        self.assertEqual(Customer.objects.count(), 2)
+
+
+class CustomerBulkTest(TestCase):
+    def setUp(self):
+        self.faker = Faker("es_CO")
+        self.faker.seed_instance(randint(0, 9999))
+        document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.company1 = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.company2 = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.user = User.objects.create_user(username="testuser1", password="password")
+        Employee.objects.create(user=self.user, company=self.company1)
+
+        self.client = APIClient()
+        self.client.login(username="testuser1", password="password")
+
+    def make_file(self, rows, header=("nombre", "telefono", "direccion", "barrio")):
+        content = io.StringIO()
+        writer = csv.writer(content)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+        return io.BytesIO(content.getvalue().encode())
+
+    def run_import(self, rows, company=None, batch_size=1000):
+        return CustomerImporter(company or self.company1, batch_size).run(
+            read_customer_rows(self.make_file(rows))
+        )
+
+    def test_import_creates_customers_with_their_company(self):
+        """Se crean los clientes y su relación con la compañía"""
+        result = self.run_import(
+            [
+                ("Ana Gómez", "3105551234", "Calle 1", "Laureles"),
+                ("Luis Pérez", "3205559876", "Calle 2", "Belén"),
+            ]
+        )
+
+        self.assertEqual(result["created"], 2)
+        customer = Customer.objects.get(name="Ana Gómez")
+        self.assertEqual(list(customer.companies.all()), [self.company1])
+        self.assertEqual(customer.phone_key, "3105551234")
+        self.assertEqual(customer.name_key, "ana gomez")
+
+    def test_import_skips_known_phones(self):
+        """Los teléfonos ya registrados o repetidos no se duplican"""
+        self.run_import([("Ana Gómez", "3105551234", "Calle 1", "Laureles")])
+
+        result = self.run_import(
+            [
+                ("Ana G.", "+57 310 555 1234", "Calle 1", "Laureles"),
+                ("Luis Pérez", "3205559876", "Calle 2", "Belén"),
+                ("Luis P.", "320 555 9876", "Calle 2", "Belén"),
+            ]
+        )
+
+        self.assertEqual((result["created"], result["duplicates"]), (1, 2))
+        self.assertEqual(Customer.objects.for_company(self.company1).count(), 2)
+
+    def test_phones_of_other_companies_are_not_duplicates(self):
+        """Los clientes de otras compañías no cuentan como duplicados"""
+        self.run_import([("Ana Gómez", "3105551234", "Calle 1", "Laureles")])
+
+        result = self.run_import(
+            [("Ana G.", "3105551234", "Carrera 9", "Belén")], self.company2
+        )
+
+        self.assertEqual(result["created"], 1)
+
+        # Cada compañía conserva su propio registro, también tras deduplicar
+        call_command("dedupe_customers", stdout=io.StringIO())
+        customers = Customer.objects.filter(phone_key="3105551234").order_by("id")
+
+        self.assertEqual(
+            [list(customer.companies.all()) for customer in customers],
+            [[self.company1], [self.company2]],
+        )
+        self.assertEqual(customers[1].address, "Carrera 9")
+
+    def test_import_reports_invalid_rows(self):
+        """Las filas inválidas se reportan sin detener la importación"""
+        result = self.run_import(
+            [
+                ("", "3105551234", "Calle 1", "Laureles"),
+                ("Luis Pérez", "3205559876", "Calle 2", "Belén"),
+            ]
+        )
+
+        self.assertEqual(result["created"], 1)
+        self.assertEqual(result["error_count"], 1)
+        self.assertEqual(result["errors"][0]["row"], 2)
+        self.assertIn("name", result["errors"][0]["errors"])
+
+    def test_import_queries_do_not_grow_with_the_rows(self):
+        """Cada lote usa el mismo número de consultas"""
+        counts = []
+
+        for size in (10, 100):
+            rows = [
+                (f"Cliente {i}", f"3{size}{i:07d}", "Calle", "Centro")
+                for i in range(size)
+            ]
+
+            with CaptureQueriesContext(connection) as queries:
+                self.run_import(rows)
+
+            counts.append(len(queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_export_round_trips_through_import(self):
+        """La exportación se puede volver a importar"""
+        self.run_import(
+            [
+                ("Ana Gómez", "3105551234", "Calle 1, apto 2", "Laureles"),
+                ("Luis Pérez", "3205559876", "Calle 2", "Belén"),
+            ]
+        )
+
+        exported = "".join(to_csv(iter_customers(self.company1.id, batch_size=1)))
+        rows = list(csv.DictReader(io.StringIO(exported)))
+
+        self.assertEqual([row["name"] for row in rows], ["Ana Gómez", "Luis Pérez"])
+        self.assertEqual(rows[0]["address"], "Calle 1, apto 2")
+
+        result = CustomerImporter(self.company2).run(
+            read_customer_rows(io.BytesIO(exported.encode()))
+        )
+        self.assertEqual(result["created"], 2)
+
+    def test_export_view_streams_only_the_company_customers(self):
+        """La descarga incluye solo los clientes de la compañía"""
+        self.run_import([("Ana Gómez", "3105551234", "Calle 1", "Laureles")])
+        self.run_import(
+            [("Luis Pérez", "3205559876", "Calle 2", "Belén")], self.company2
+        )
+
+        response = self.client.get(reverse("export_customers"))
+        content = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("Ana Gómez", content)
+        self.assertNotIn("Luis Pérez", content)
+
+    def test_import_api(self):
+        """La API importa un archivo para la compañía del usuario"""
+        rows = [("Ana Gómez", "3105551234", "Calle 1", "Laureles")]
+        upload = SimpleUploadedFile("clientes.csv", self.make_file(rows).read())
+
+        response = self.client.post(
+            reverse("api_customers_import"), {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 1)
+        self.assertTrue(Customer.objects.for_company(self.company1).exists())
+
+    def test_benchmark_command_rolls_back(self):
+        """El benchmark reporta el rendimiento sin dejar datos"""
+        output = io.StringIO()
+
+        call_command(
+            "benchmark_customer_import",
+            "--company",
+            str(self.company1.id),
+            "--rows",
+            "50",
+            stdout=output,
+        )
+
+        self.assertIn("filas/s", output.getvalue())
+        self.assertFalse(Customer.objects.exists())
+
@@ -7,12 +7,22 @@ from .views import (
     CustomerUpdateView,
     CustomerCreateView,
     CustomersAPIView,
+    CustomersAsyncAPIView,
+    CustomerExportView,
+    CustomerImportAPIView,
+    CustomerPhoneAPIView,
+    CustomerSearchAPIView,
 )
 
 urlpatterns = [
     path("", CustomersListView.as_view(), name="customers"),
     path("<int:id>", CustomerDetailView.as_view(), name="detail_customer"),
     path("api/", CustomersAPIView.as_view(), name="api_customers"),
+    path("api/async/", CustomersAsyncAPIView.as_view(), name="api_customers_async"),
+    path("api/search/", CustomerSearchAPIView.as_view(), name="api_customers_search"),
+    path("api/phone/", CustomerPhoneAPIView.as_view(), name="api_customers_phone"),
+    path("api/import/", CustomerImportAPIView.as_view(), name="api_customers_import"),
+    path("export/", CustomerExportView.as_view(), name="export_customers"),
     path("create-customer/", CustomerCreateView.as_view(), name="add_customer"),
     path(
         "delete-customer/<int:id>", CustomerDeleteView.as_view(), name="delete_customer"
@@ -2,18 +2,27 @@ from typing import Any
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models.base import Model as Model
 from django.db.models.query import QuerySet
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
+from django.views import View
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
 from django.views.generic.detail import DetailView
 from django.views.generic.list import ListView
+from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from employees.mixins import AsyncTenantAPIView, TenantQuerysetMixin
+from employees.tenancy import get_company
+from foodies.tabular import ImportFormatError, get_delimiter
+
+from .bulk import CustomerImporter, iter_customers, read_customer_rows, to_csv
 from .forms import CustomerForm
 from .models import Customer
-from .serializers import CustomersSerializer
+from .search import get_search_limit, search_customers
+from .serializers import CustomerSearchSerializer, CustomersSerializer
 
 
 class CustomerCreateView(LoginRequiredMixin, CreateView):
@@ -25,51 +34,48 @@ class CustomerCreateView(LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         new_customer = form.save(commit=False)
         new_customer.save()
-        new_customer.companies.add(self.request.user.employee.company)
+        new_customer.companies.add(get_company(self.request))
 
         return super().form_valid(form)
 
 
-class CustomersListView(LoginRequiredMixin, ListView):
+class CustomersListView(LoginRequiredMixin, TenantQuerysetMixin, ListView):
     model = Customer
     template_name = "customers.html"
     context_object_name = "customers"
 
-    def get_queryset(self) -> QuerySet[Any]:
-        return Customer.objects.filter(companies=self.request.user.employee.company)
-
 
-class CustomerDetailView(LoginRequiredMixin, DetailView):
+class CustomerDetailView(LoginRequiredMixin, TenantQuerysetMixin, DetailView):
     model = Customer
     template_name = "detail_customer.html"
     context_object_name = "customer"
 
     def get_object(self, queryset: QuerySet[Any] | None = ...) -> Model:
-        customer = get_object_or_404(Customer, id=self.kwargs["id"])
+        customer = get_object_or_404(self.get_queryset(), id=self.kwargs["id"])
 
         return customer
 
 
-class CustomerDeleteView(LoginRequiredMixin, DeleteView):
+class CustomerDeleteView(LoginRequiredMixin, TenantQuerysetMixin, DeleteView):
     model = Customer
     template_name = "delete_customer.html"
     success_url = reverse_lazy("customers")
     context_object_name = "customer"
 
     def get_object(self, queryset: QuerySet[Any] | None = ...) -> Model:
-        customer = get_object_or_404(Customer, id=self.kwargs["id"])
+        customer = get_object_or_404(self.get_queryset(), id=self.kwargs["id"])
 
         return customer
 
 
-class CustomerUpdateView(LoginRequiredMixin, UpdateView):
+class CustomerUpdateView(LoginRequiredMixin, TenantQuerysetMixin, UpdateView):
     model = Customer
     form_class = CustomerForm
     template_name = "update_customer.html"
     context_object_name = "customer"
 
     def get_object(self, queryset: QuerySet[Any] | None = ...) -> Model:
-        customer = get_object_or_404(Customer, id=self.kwargs["id"])
+        customer = get_object_or_404(self.get_queryset(), id=self.kwargs["id"])
 
         return customer
 
@@ -81,7 +87,80 @@ class CustomersAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, format=None):
-        customers = Customer.objects.filter(companies=request.user.employee.company)
+        customers = Customer.objects.for_company(get_company(request))
+        serializer = CustomersSerializer(customers, many=True)
+
+        return Response(serializer.data)
+
+
+class CustomersAsyncAPIView(AsyncTenantAPIView):
+    async def get(self, request, *args, **kwargs):
+        customers = [
+            customer
+            async for customer in Customer.objects.for_company(self.company)
+        ]
         serializer = CustomersSerializer(customers, many=True)
 
+        return JsonResponse(serializer.data, safe=False)
+
+
+class CustomerSearchAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        customers = search_customers(
+            Customer.objects.for_company(get_company(request)),
+            request.query_params.get("q", "").strip(),
+            get_search_limit(request.query_params.get("limit")),
+        )
+        serializer = CustomerSearchSerializer(customers, many=True)
+
         return Response(serializer.data)
+
+
+class CustomerPhoneAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        customers = Customer.objects.for_company(get_company(request)).by_phone(
+            request.query_params.get("phone", "")
+        )
+        serializer = CustomerSearchSerializer(customers.order_by("id"), many=True)
+
+        return Response(serializer.data)
+
+
+class CustomerExportView(LoginRequiredMixin, View):
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(
+            to_csv(iter_customers(get_company(request).id)), content_type="text/csv"
+        )
+        response["Content-Disposition"] = 'attachment; filename="clientes.csv"'
+
+        return response
+
+
+class CustomerImportAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, format=None):
+        upload = request.FILES.get("file")
+
+        if upload is None:
+            return Response(
+                {"status": "error", "message": "A file is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            delimiter = get_delimiter(upload.name)
+            result = CustomerImporter(get_company(request)).run(
+                read_customer_rows(upload.file, delimiter)
+            )
+        except (ImportFormatError, UnicodeDecodeError) as e:
+            return Response(
+                {"status": "error", "message": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response({"status": "success", **result})
@@ -0,0 +1,121 @@
+import asyncio
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from customers.models import Customer
+from employees.models import Employee
+from foodies.benchmark import production_settings, run_asgi_load, run_http_load
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec and latency of the sync and async read endpoints "
+        "served through foodies.asgi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--username", help="Employee to log in as. Defaults to the first one."
+        )
+        parser.add_argument(
+            "--requests", type=int, default=2000, help="Requests per endpoint."
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=50, help="Requests in flight."
+        )
+        parser.add_argument(
+            "--base-url",
+            help=(
+                "Benchmark a running ASGI server (e.g. uvicorn foodies.asgi:application) "
+                "instead of calling the application in this process."
+            ),
+        )
+
+    def _endpoints(self, company) -> list[tuple[str, str, str]]:
+        endpoints = [
+            ("catálogo", reverse("api_products"), reverse("api_products_async")),
+        ]
+        product = Product.objects.for_company(company).order_by("id").first()
+
+        if product is not None:
+            endpoints.append(
+                (
+                    "producto",
+                    reverse("api_get_product", args=[product.id]),
+                    reverse("api_get_product_async", args=[product.id]),
+                )
+            )
+
+        endpoints.append(
+            ("clientes", reverse("api_customers"), reverse("api_customers_async"))
+        )
+
+        return endpoints
+
+    def _report(self, label: str, mode: str, result: dict) -> None:
+        self.stdout.write(
+            f"{label:<10} {mode:<6} {result['rps']:>9,.0f} req/s  "
+            f"p50 {result['p50_ms']:>7.2f} ms  p99 {result['p99_ms']:>7.2f} ms  "
+            f"{result['errors']} errores"
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        employees = Employee.objects.select_related("user", "company")
+
+        if options["username"]:
+            employees = employees.filter(user__username=options["username"])
+
+        employee = employees.order_by("id").first()
+
+        if employee is None:
+            raise CommandError("No employee to log in as.")
+
+        client = Client()
+        client.force_login(employee.user)
+        cookie = f"{settings.SESSION_COOKIE_NAME}={client.session.session_key}"
+
+        self.stdout.write(
+            f"{employee.user.username} ({employee.company}): "
+            f"{Product.objects.for_company(employee.company).count()} productos, "
+            f"{Customer.objects.for_company(employee.company).count()} clientes, "
+            f"{options['requests']} peticiones con concurrencia {options['concurrency']}."
+        )
+
+        if options["base_url"]:
+
+            def load(path, requests):
+                return run_http_load(
+                    options["base_url"], path, cookie, requests, options["concurrency"]
+                )
+
+        else:
+            production = production_settings()
+            production.enable()
+            application = get_asgi_application()
+
+            def load(path, requests):
+                return asyncio.run(
+                    run_asgi_load(
+                        application, path, cookie, requests, options["concurrency"]
+                    )
+                )
+
+        try:
+            for label, sync_path, async_path in self._endpoints(employee.company):
+                for mode, path in (("sync", sync_path), ("async", async_path)):
+                    # A short warm-up fills the caches both paths share.
+                    load(path, min(options["requests"], options["concurrency"] * 2))
+                    self._report(label, mode, load(path, options["requests"]))
+        finally:
+            if not options["base_url"]:
+                production.disable()
+
+            client.logout()
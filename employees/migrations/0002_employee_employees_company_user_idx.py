@@ -0,0 +1,20 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0002_alter_company_options'),
+        ('employees', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['company', 'user'], name='employees_company_user_idx'),
+        ),
+    ]
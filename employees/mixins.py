@@ -0,0 +1,46 @@
+from typing import Any
+
+from django.db.models.query import QuerySet
+from django.http import JsonResponse
+from django.views import View
+
+from .tenancy import aget_company, get_company
+
+
+class TenantQuerysetMixin:
+    """Restrict a generic view's queryset to the current employee's company."""
+
+    def get_queryset(self) -> QuerySet[Any]:
+        return super().get_queryset().for_company(get_company(self.request))
+
+
+class AsyncTenantAPIView(View):
+    """
+    Base of the async JSON read endpoints, the counterpart of a DRF
+    ``APIView`` with ``IsAuthenticated`` that runs on the event loop under
+    ASGI instead of in a worker thread.
+
+    The employee's company is resolved before the handler runs and is
+    available as ``self.company``.
+    """
+
+    http_method_names = ["get", "head", "options"]
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+
+        if not user.is_authenticated:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided."},
+                status=403,
+            )
+
+        self.company = await aget_company(request)
+
+        if self.company is None:
+            return JsonResponse(
+                {"detail": "You do not have permission to perform this action."},
+                status=403,
+            )
+
+        return await super().dispatch(request, *args, **kwargs)
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import User
 from django.db import models
 
+from companies.managers import TenantManager
 from companies.models import Company
 
 
@@ -8,9 +9,14 @@ class Employee(models.Model):
     user: models.OneToOneField = models.OneToOneField(User, on_delete=models.CASCADE)
     company: models.ForeignKey = models.ForeignKey(Company, on_delete=models.CASCADE)
 
+    objects = TenantManager()
+
     class Meta:
         verbose_name = "Empleado"
         verbose_name_plural = "Empleados"
+        indexes = [
+            models.Index(fields=["company", "user"], name="employees_company_user_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.user.username
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Employee
+from .tenancy import clear_tenant_cache
+
+
+@receiver([post_save, post_delete], sender=Employee)
+def invalidate_tenant_cache(sender, instance, **kwargs):
+    clear_tenant_cache(instance.user_id)
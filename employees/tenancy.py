@@ -0,0 +1,129 @@
+import time
+from threading import Lock
+
+from django.conf import settings
+
+from companies.models import Company
+
+from .models import Employee
+
+_UNRESOLVED = object()
+
+_employees: dict[int, tuple[float, Employee | None]] = {}
+_employees_lock = Lock()
+
+
+def _cached_employee(user_id: int):
+    if getattr(settings, "TENANT_CACHE_TTL", 0):
+        with _employees_lock:
+            expires_at, employee = _employees.get(user_id, (0, None))
+
+        if expires_at > time.monotonic():
+            return employee
+
+    return _UNRESOLVED
+
+
+def _cache_employee(user_id: int, employee: Employee | None) -> None:
+    ttl = getattr(settings, "TENANT_CACHE_TTL", 0)
+
+    if ttl:
+        with _employees_lock:
+            _employees[user_id] = (time.monotonic() + ttl, employee)
+
+
+def _employee_query(user_id: int):
+    return Employee.objects.select_related("company").filter(user_id=user_id)
+
+
+def _load_employee(user_id: int) -> Employee | None:
+    employee = _cached_employee(user_id)
+
+    if employee is _UNRESOLVED:
+        employee = _employee_query(user_id).first()
+        _cache_employee(user_id, employee)
+
+    return employee
+
+
+async def _aload_employee(user_id: int) -> Employee | None:
+    employee = _cached_employee(user_id)
+
+    if employee is _UNRESOLVED:
+        employee = await _employee_query(user_id).afirst()
+        _cache_employee(user_id, employee)
+
+    return employee
+
+
+def clear_tenant_cache(user_id: int | None = None) -> None:
+    with _employees_lock:
+        if user_id is None:
+            _employees.clear()
+        else:
+            _employees.pop(user_id, None)
+
+
+def get_employee(request) -> Employee | None:
+    """
+    Return the employee (with its company) of the user behind ``request``.
+
+    Accepts Django and DRF requests. The lookup runs once per request and,
+    when ``TENANT_CACHE_TTL`` is set, is shared between requests of the same
+    user in this process for that many seconds.
+    """
+    user = request.user
+
+    if not user.is_authenticated:
+        return None
+
+    http_request = getattr(request, "_request", request)
+    user_id, employee = getattr(http_request, "_tenant", (None, _UNRESOLVED))
+
+    if employee is _UNRESOLVED or user_id != user.id:
+        employee = _load_employee(user.id)
+        http_request._tenant = (user.id, employee)
+
+    return employee
+
+
+def get_company(request) -> Company | None:
+    employee = get_employee(request)
+
+    return employee.company if employee is not None else None
+
+
+def resolved_company(request) -> Company | None:
+    """
+    The company already resolved for ``request``, if any, without looking it
+    up. For code that only reports on the request, like logging.
+    """
+    _, employee = getattr(request, "_tenant", (None, None))
+
+    if employee is None or employee is _UNRESOLVED:
+        return None
+
+    return employee.company
+
+
+async def aget_employee(request) -> Employee | None:
+    """Async version of ``get_employee`` for Django requests in async views."""
+    user = await request.auser()
+
+    if not user.is_authenticated:
+        return None
+
+    user_id, employee = getattr(request, "_tenant", (None, _UNRESOLVED))
+
+    if employee is _UNRESOLVED or user_id != user.id:
+        employee = await _aload_employee(user.id)
+        request._tenant = (user.id, employee)
+
+    return employee
+
+
+async def aget_company(request) -> Company | None:
+    employee = await aget_employee(request)
+
+    return employee.company if employee is not None else None
+
@@ -1,4 +1,7 @@
-from django.test import TestCase
+import io
+
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
@@ -9,8 +12,10 @@ from random import randint
 
 from companies.models import Company
 from document_types.models import DocumentType
+from foodies.queries import query_budget
 from .forms import EmployeeUpdateForm
 from .models import Employee
+from .tenancy import aget_company, clear_tenant_cache, get_company, get_employee
 
 User = get_user_model()
 
@@ -147,6 +152,21 @@ class EmployeeListViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("employees", response.context)
 
+    def test_view_stays_within_query_budget(self):
+        """La lista no hace consultas adicionales por cada empleado"""
+        for number in range(10):
+            Employee.objects.create(
+                user=User.objects.create_user(username=f"extra{number}"),
+                company=self.company,
+            )
+
+        self.client.force_login(self.user)
+
+        with query_budget(6):
+            response = self.client.get(reverse("employees"))
+
+        self.assertEqual(response.status_code, 200)
+
 
 class EmployeeUpdateViewTest(TestCase):
 
@@ -317,6 +337,36 @@ class EmployeeDetailViewTest(TestCase):
         )  # ID no existente
         self.assertEqual(response.status_code, 404)
 
+    def test_view_returns_404_for_other_company_employee(self):
+        # Verifica que no se puede ver un empleado de otra compañía
+        other_company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=self.company.document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        Employee.objects.filter(id=self.other_employee.id).update(
+            company=other_company
+        )
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(
+            reverse("detail_employee", kwargs={"id": self.other_user.id})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_view_stays_within_query_budget(self):
+        """El detalle se carga con un número fijo de consultas"""
+        self.client.force_login(self.user)
+
+        with query_budget(6):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+
 
 class EmployeeLoginViewTest(TestCase):
     def setUp(self):
@@ -375,3 +425,139 @@ class EmployeeLoginViewTest(TestCase):
         self.client.login(username="testuser", password="password")
         response = self.client.get(reverse("login"))
         self.assertRedirects(response, reverse("orders"))
+
+
+class TenantTest(TestCase):
+
+    def setUp(self):
+        clear_tenant_cache()
+        self.faker = Faker("es_CO")
+        self.faker.seed_instance(randint(0, 9999))
+        self.document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=self.document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.employee = Employee.objects.create(user=self.user, company=self.company)
+
+    def tearDown(self):
+        clear_tenant_cache()
+
+    def test_get_company_resolves_once_per_request(self):
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(id=self.user.id)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_company(request), self.company)
+            self.assertEqual(get_employee(request), self.employee)
+            self.assertEqual(get_company(request), self.company)
+
+    def test_get_company_anonymous_user_returns_none(self):
+        request = RequestFactory().get("/")
+        request.user = type("Anonymous", (), {"is_authenticated": False})()
+
+        self.assertIsNone(get_company(request))
+
+    async def test_aget_company_resolves_once_per_request(self):
+        request = RequestFactory().get("/")
+        user = await User.objects.aget(id=self.user.id)
+
+        async def auser():
+            return user
+
+        request.auser = auser
+
+        self.assertEqual(await aget_company(request), self.company)
+        await Employee.objects.filter(id=self.employee.id).adelete()
+        self.assertEqual(await aget_company(request), self.company)
+
+    def test_async_request_query_budget(self):
+        """Sesión, usuario, empleado con su compañía y la consulta de la vista"""
+        self.client.login(username="testuser", password="password")
+
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("api_customers_async"))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_request_query_budget(self):
+        """Sesión, usuario, empleado con su compañía y la consulta de la vista"""
+        self.client.login(username="testuser", password="password")
+
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("api_customers"))
+
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(TENANT_CACHE_TTL=60)
+    def test_request_query_budget_with_cache(self):
+        self.client.login(username="testuser", password="password")
+        self.client.get(reverse("api_customers"))
+
+        with self.assertNumQueries(3):
+            self.client.get(reverse("api_customers"))
+
+    @override_settings(TENANT_CACHE_TTL=60)
+    def test_employee_change_invalidates_cache(self):
+        other_company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=self.document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        request = RequestFactory().get("/")
+        request.user = self.user
+        self.assertEqual(get_company(request), self.company)
+
+        self.employee.company = other_company
+        self.employee.save()
+
+        request = RequestFactory().get("/")
+        request.user = self.user
+        self.assertEqual(get_company(request), other_company)
+
+
+class BenchmarkAsyncAPITest(TransactionTestCase):
+
+    def setUp(self):
+        faker = Faker("es_CO")
+        document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        company = Company.objects.create(
+            name=faker.company(),
+            email=faker.company_email(),
+            phone=faker.phone_number(),
+            document_number=faker.legal_person_nit(),
+            document_type=document_type,
+            address=faker.address(),
+            city=faker.city(),
+            country=faker.country(),
+        )
+        user = User.objects.create_user(username="testuser", password="password")
+        Employee.objects.create(user=user, company=company)
+
+    def test_benchmark_command_compares_sync_and_async(self):
+        """El benchmark mide ambas versiones de cada endpoint sin errores"""
+        out = io.StringIO()
+        call_command(
+            "benchmark_async_api", "--requests", "4", "--concurrency", "2", stdout=out
+        )
+        lines = out.getvalue().splitlines()[1:]
+
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(all(line.endswith(" 0 errores") for line in lines))
+        self.assertEqual([line.split()[1] for line in lines], ["sync", "async"] * 2)
@@ -13,6 +13,7 @@ from django.views.generic.detail import DetailView
 from django.views.generic.list import ListView
 
 from .forms import LoginForm, EmployeeUpdateForm
+from .tenancy import get_company
 
 
 class EmployeeLoginView(LoginView):
@@ -25,36 +26,39 @@ class EmployeeLoginView(LoginView):
         return super().dispatch(request, *args, **kwargs)
 
 
-class EmployeeListView(LoginRequiredMixin, ListView):
+class CompanyEmployeesMixin:
+    def get_queryset(self) -> QuerySet[Any]:
+        return User.objects.filter(employee__company=get_company(self.request))
+
+
+class EmployeeListView(LoginRequiredMixin, CompanyEmployeesMixin, ListView):
     model = User
     template_name = "employees.html"
     context_object_name = "employees"
 
     def get_queryset(self) -> QuerySet[Any]:
-        return User.objects.filter(
-            employee__company=self.request.user.employee.company, is_active=True
-        )
+        return super().get_queryset().filter(is_active=True)
 
 
-class EmployeeUpdateView(LoginRequiredMixin, UpdateView):
+class EmployeeUpdateView(LoginRequiredMixin, CompanyEmployeesMixin, UpdateView):
     model = User
     form_class = EmployeeUpdateForm
     template_name = "update_employee.html"
     context_object_name = "employee"
 
     def get_object(self, queryset: QuerySet[Any] | None = ...) -> Model:
-        return User.objects.get(id=self.kwargs["id"])
+        return get_object_or_404(self.get_queryset(), id=self.kwargs["id"])
 
     def get_success_url(self) -> str:
         return reverse_lazy("detail_employee", kwargs={"id": self.object.id})
 
 
-class EmployeeDetailView(LoginRequiredMixin, DetailView):
+class EmployeeDetailView(LoginRequiredMixin, CompanyEmployeesMixin, DetailView):
     model = User
     template_name = "detail_employee.html"
     context_object_name = "employee"
 
     def get_object(self, queryset: QuerySet[Any] | None = ...) -> Model:
-        employee = get_object_or_404(User, id=self.kwargs["id"])
+        employee = get_object_or_404(self.get_queryset(), id=self.kwargs["id"])
 
         return employee
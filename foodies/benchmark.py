@@ -0,0 +1,265 @@
+import asyncio
+import http.client
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+# Latency differences below this are noise on a shared machine, whatever the
+# relative change.
+MIN_LATENCY_DELTA_MS = 2.0
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``samples`` (nearest rank)."""
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+
+    return ordered[rank - 1]
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int = 0) -> dict:
+    """Requests per second and latency percentiles, in milliseconds."""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def _asgi_request(application, path: str, headers: list) -> int:
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    status = 0
+    received = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal received
+
+        if not received:
+            received = True
+
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        await finished.wait()
+
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get(
+            "more_body"
+        ):
+            finished.set()
+
+    await application(scope, receive, send)
+
+    return status
+
+
+async def run_asgi_load(
+    application, path: str, cookie: str, requests: int, concurrency: int
+) -> dict:
+    """
+    Send ``requests`` GETs for ``path`` straight to an ASGI ``application``,
+    ``concurrency`` at a time, the way an ASGI server would hand them over
+    without the socket and HTTP parsing work.
+    """
+    headers = [(b"host", b"localhost"), (b"cookie", cookie.encode())]
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal errors, remaining
+
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            status = await _asgi_request(application, path, headers)
+            latencies.append(time.perf_counter() - started)
+
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def run_http_load(
+    base_url: str, path: str, cookie: str, requests: int, concurrency: int
+) -> dict:
+    """
+    Send ``requests`` GETs for ``path`` to a running server at ``base_url``
+    from ``concurrency`` threads, each over its own keep-alive connection.
+    """
+    url = urlsplit(base_url)
+    per_worker = [requests // concurrency] * concurrency
+
+    for i in range(requests % concurrency):
+        per_worker[i] += 1
+
+    def worker(count: int) -> tuple[list, int]:
+        connection = http.client.HTTPConnection(url.hostname, url.port or 80)
+        latencies, errors = [], 0
+
+        try:
+            for _ in range(count):
+                started = time.perf_counter()
+                connection.request("GET", path, headers={"Cookie": cookie})
+                response = connection.getresponse()
+                response.read()
+                latencies.append(time.perf_counter() - started)
+
+                if response.status >= 400:
+                    errors += 1
+        finally:
+            connection.close()
+
+        return latencies, errors
+
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(worker, per_worker))
+
+    elapsed = time.perf_counter() - started
+
+    return summarize(
+        [latency for latencies, _ in results for latency in latencies],
+        elapsed,
+        sum(errors for _, errors in results),
+    )
+
+
+def production_settings() -> override_settings:
+    """Settings to measure the production stack: no debug toolbar, no query log."""
+    return override_settings(
+        DEBUG=False,
+        ALLOWED_HOSTS=["localhost", "testserver"],
+        MIDDLEWARE=[
+            middleware
+            for middleware in settings.MIDDLEWARE
+            if not middleware.startswith("debug_toolbar.")
+        ],
+    )
+
+
+def _response_size(response) -> int:
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+
+    return len(response.content)
+
+
+def measure_requests(send: Callable[[int], object], runs: int, warmup: int = 2) -> dict:
+    """
+    Call ``send(run)`` ``warmup`` + ``runs`` times and summarize the measured
+    runs, adding the most queries and the largest body seen in one response.
+
+    ``send`` makes one request, usually through the test client, and returns
+    its response. Streaming bodies are read in full, inside the timing, as a
+    client would.
+    """
+    for run in range(warmup):
+        _response_size(send(run))
+
+    latencies, errors, queries, size, status = [], 0, 0, 0, None
+    started = time.perf_counter()
+
+    for run in range(warmup, warmup + runs):
+        with CaptureQueriesContext(connection) as captured:
+            request_started = time.perf_counter()
+            response = send(run)
+            body = _response_size(response)
+            latencies.append(time.perf_counter() - request_started)
+
+        status = response.status_code
+        queries = max(queries, len(captured))
+        size = max(size, body)
+
+        if status >= 400:
+            errors += 1
+
+    return {
+        **summarize(latencies, time.perf_counter() - started, errors),
+        "status": status,
+        "queries": queries,
+        "bytes": size,
+    }
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compare two ``{size: {"routes": {name: measurement}}}`` result sets and
+    describe every route that got worse than ``baseline``.
+
+    Query counts must not grow at all; p95 latency and response size may grow
+    by ``tolerance`` (0.25 is 25%). Routes or sizes missing from either side
+    are not compared.
+    """
+    regressions = []
+
+    for size, measured in results.items():
+        expected_routes = baseline.get(size, {}).get("routes", {})
+
+        for name, current in measured["routes"].items():
+            expected = expected_routes.get(name)
+
+            if expected is None:
+                continue
+
+            label = f"{name} ({size})"
+
+            if current["queries"] > expected["queries"]:
+                regressions.append(
+                    f"{label}: {current['queries']} queries, "
+                    f"was {expected['queries']}"
+                )
+
+            if (
+                current["p95_ms"] > expected["p95_ms"] * (1 + tolerance)
+                and current["p95_ms"] - expected["p95_ms"] > MIN_LATENCY_DELTA_MS
+            ):
+                regressions.append(
+                    f"{label}: p95 {current['p95_ms']:.1f} ms, "
+                    f"was {expected['p95_ms']:.1f} ms"
+                )
+
+            if current["bytes"] > expected["bytes"] * (1 + tolerance):
+                regressions.append(
+                    f"{label}: {current['bytes']} bytes, was {expected['bytes']}"
+                )
+
+    return regressions
@@ -0,0 +1,177 @@
+import csv
+import io
+import uuid
+from datetime import timedelta
+from typing import Callable
+
+from django.db.models import Max
+from django.urls import get_resolver, reverse
+from django.utils import timezone
+
+from customers.models import Customer
+from employees.models import Employee
+from orders.models import Order
+from orders.queue import enqueue_submission
+from products.models import Product
+
+# Named routes the endpoint benchmark leaves out, and why.
+SKIPPED_ROUTES = {
+    "logout": "ends the session the other routes use",
+    "order_events": "a Server-Sent Events stream never finishes",
+}
+# Named routes that write to the database: they create orders, take stock,
+# queue submissions or overwrite products and customers with the imported
+# rows. The benchmark only runs them against a seeded throwaway database.
+WRITE_ROUTES = {
+    "api_products_import",
+    "api_customers_import",
+    "create_order_api",
+    "order_submissions_api",
+    "order_submission_api",
+}
+IMPORT_ROWS = 10
+
+
+def named_routes() -> set[str]:
+    """Names of the project's own routes, without namespaced ones (admin...)."""
+    return {name for name in get_resolver().reverse_dict if isinstance(name, str)}
+
+
+def _get(path: str, **params) -> Callable:
+    return lambda client, run: client.get(path, params)
+
+
+def _post_json(path: str, data: dict) -> Callable:
+    return lambda client, run: client.post(
+        path, data, content_type="application/json"
+    )
+
+
+def _post_csv(path: str, rows: list[list]) -> Callable:
+    content = io.StringIO()
+    csv.writer(content).writerows(rows)
+    content = content.getvalue().encode()
+
+    def send(client, run):
+        upload = io.BytesIO(content)
+        upload.name = "benchmark.csv"
+
+        return client.post(path, {"file": upload})
+
+    return send
+
+
+def build_scenarios(employee: Employee, writes: bool = True) -> dict[str, Callable]:
+    """
+    Return a ``send(client, run)`` callable per named route, exercising it
+    with data of ``employee``'s company, which needs at least one product,
+    customer and order. Without ``writes`` the ``WRITE_ROUTES`` are left out
+    and nothing is written to set them up.
+
+    Routes taking an id get the company's most recent order, its best
+    stocked product and its most recent customer, so the same seeded dataset
+    always produces the same requests. Writes stay idempotent where the route
+    allows it: imports repeat rows that already exist and orders take one
+    unit of stock.
+    """
+    company = employee.company
+    user = employee.user
+    product = Product.objects.for_company(company).order_by("-stock", "id").first()
+    customer = Customer.objects.for_company(company).order_by("-id").first()
+    order = Order.objects.filter(company=company).order_by("-id").first()
+    products = Product.objects.for_company(company).order_by("id")
+    customers = Customer.objects.for_company(company).order_by("id")
+    last_day = (
+        Order.objects.filter(company=company).aggregate(last=Max("created_at"))["last"]
+        or timezone.now()
+    )
+    last_day = timezone.localdate(last_day)
+    payload = {
+        "customer": customer.id,
+        "items": [{"product": product.id, "quantity": 1}],
+    }
+    scenarios = {
+        "login": _get(reverse("login")),
+        "employees": _get(reverse("employees")),
+        "detail_employee": _get(reverse("detail_employee", args=[employee.id])),
+        "update_employee": _get(reverse("update_employee", args=[employee.id])),
+        "products": _get(reverse("products")),
+        "detail_product": _get(reverse("detail_product", args=[product.id])),
+        "add_product": _get(reverse("add_product")),
+        "update_product": _get(reverse("update_product", args=[product.id])),
+        "delete_product": _get(reverse("delete_product", args=[product.id])),
+        "api_products": _get(reverse("api_products")),
+        "api_products_async": _get(reverse("api_products_async")),
+        "api_get_product": _get(reverse("api_get_product", args=[product.id])),
+        "api_get_product_async": _get(
+            reverse("api_get_product_async", args=[product.id])
+        ),
+        "api_products_batch": _get(
+            reverse("api_products_batch"),
+            ids=",".join(str(pk) for pk in products.values_list("id", flat=True)[:20]),
+        ),
+        "api_products_search": _get(
+            reverse("api_products_search"), q=product.name.split()[0]
+        ),
+        "api_products_import": _post_csv(
+            reverse("api_products_import"),
+            [["nombre", "descripcion", "precio", "stock", "categoria"]]
+            + [
+                [row.name, row.description, row.price, row.stock, row.category.name]
+                for row in products.select_related("category")[:IMPORT_ROWS]
+            ],
+        ),
+        "customers": _get(reverse("customers")),
+        "detail_customer": _get(reverse("detail_customer", args=[customer.id])),
+        "add_customer": _get(reverse("add_customer")),
+        "update_customer": _get(reverse("update_customer", args=[customer.id])),
+        "delete_customer": _get(reverse("delete_customer", args=[customer.id])),
+        "api_customers": _get(reverse("api_customers")),
+        "api_customers_async": _get(reverse("api_customers_async")),
+        "api_customers_search": _get(
+            reverse("api_customers_search"), q=customer.name.split()[0]
+        ),
+        "api_customers_phone": _get(
+            reverse("api_customers_phone"), phone=customer.phone_number
+        ),
+        "api_customers_import": _post_csv(
+            reverse("api_customers_import"),
+            [["name", "phone_number", "address", "neighborhood"]]
+            + [
+                [row.name, row.phone_number, row.address, row.neighborhood]
+                for row in customers[:IMPORT_ROWS]
+            ],
+        ),
+        "export_customers": _get(reverse("export_customers")),
+        "orders": _get(reverse("orders")),
+        "api_orders": _get(reverse("api_orders")),
+        "kitchen": _get(reverse("kitchen")),
+        "detail_order": _get(reverse("detail_order", args=[order.id])),
+        "api_order_detail": _get(reverse("api_order_detail", args=[order.id])),
+        "export_orders": _get(
+            reverse("export_orders"),
+            start=(last_day - timedelta(days=6)).isoformat(),
+            end=last_day.isoformat(),
+        ),
+        "create_order": _get(reverse("create_order")),
+        "create_order_api": _post_json(reverse("create_order_api"), payload),
+        "order_submissions_api": lambda client, run: client.post(
+            reverse("order_submissions_api"),
+            payload,
+            content_type="application/json",
+            headers={"idempotency-key": f"benchmark-{uuid.uuid4().hex}"},
+        ),
+        "api_daily_sales": _get(reverse("api_daily_sales"), end=last_day.isoformat()),
+    }
+
+    if not writes:
+        return {
+            name: send for name, send in scenarios.items() if name not in WRITE_ROUTES
+        }
+
+    submission, _ = enqueue_submission(user, company, "benchmark-status", payload)
+    scenarios["order_submission_api"] = _get(
+        reverse("order_submission_api", args=[submission.idempotency_key])
+    )
+
+    return scenarios
@@ -0,0 +1,172 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DatabaseError, connections, transaction
+from django.db.backends.signals import connection_created
+
+from .queries import explain_sql, query_shape, repeat_threshold
+
+logger = logging.getLogger("foodies.queries")
+
+_MISSING = object()
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+
+class RequestMetrics:
+    """What one request spent, filled in as it runs."""
+
+    __slots__ = (
+        "started",
+        "queries",
+        "db_time",
+        "template_started",
+        "template_time",
+        "cache_hits",
+        "cache_misses",
+        "shapes",
+    )
+
+    def __init__(self, track_shapes: bool = False) -> None:
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_started = None
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.shapes = Counter() if track_shapes else None
+
+
+# A context variable rather than a thread local, so the queries an async view
+# runs through ``sync_to_async`` count for the request that awaited them.
+_current: ContextVar[RequestMetrics | None] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+def start_request() -> tuple[RequestMetrics, object]:
+    metrics = RequestMetrics(track_shapes=repeat_threshold() > 0)
+
+    return metrics, _current.set(metrics)
+
+
+def finish_request(token) -> None:
+    _current.reset(token)
+
+
+def current_metrics() -> RequestMetrics | None:
+    return _current.get()
+
+
+# Set while a slow query is explained, so the EXPLAIN is not timed itself.
+_explaining: ContextVar[bool] = ContextVar("explaining_slow_query", default=False)
+
+
+def _log_slow_query(connection, sql, params, elapsed_ms: float) -> None:
+    plan = None
+
+    if sql.lstrip().upper().startswith(_EXPLAINABLE):
+        token = _explaining.set(True)
+
+        try:
+            # A savepoint, so a failed EXPLAIN cannot break the transaction
+            # the slow query runs in.
+            with transaction.atomic(using=connection.alias):
+                plan = explain_sql(connection, sql, params)
+        except DatabaseError:
+            pass
+        finally:
+            _explaining.reset(token)
+
+    logger.warning(
+        "Slow query (%.1f ms): %s\n%s",
+        elapsed_ms,
+        sql,
+        plan or "(no plan)",
+        extra={"query_ms": round(elapsed_ms, 1), "sql": sql, "plan": plan},
+    )
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    slow_ms = getattr(settings, "SLOW_QUERY_MS", None)
+
+    if (metrics is None and not slow_ms) or _explaining.get():
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+
+    try:
+        result = execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+
+        if metrics is not None:
+            metrics.db_time += elapsed
+            metrics.queries += 1
+
+            if metrics.shapes is not None:
+                metrics.shapes[query_shape(sql)] += 1
+
+    if slow_ms and not many and elapsed * 1000 >= slow_ms:
+        _log_slow_query(context["connection"], sql, params, elapsed * 1000)
+
+    return result
+
+
+def instrument_connection(connection) -> None:
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def instrument_connections() -> None:
+    """Time the queries of the connections this thread already opened."""
+    for connection in connections.all(initialized_only=True):
+        instrument_connection(connection)
+
+
+def _on_connection_created(sender, connection, **kwargs) -> None:
+    instrument_connection(connection)
+
+
+connection_created.connect(_on_connection_created)
+
+
+def record_cache(hit: bool) -> None:
+    metrics = _current.get()
+
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+class InstrumentedCacheMixin:
+    """
+    Count the hits and misses of ``get`` for the current request.
+
+    Lookups of the base backend (``get_many``, ``get_or_set``, ``aget``...)
+    go through ``get``, so they are counted too. Mix it in before a backend
+    that implements them on its own and they are not.
+    """
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+
+        if value is _MISSING:
+            record_cache(hit=False)
+
+            return default
+
+        record_cache(hit=True)
+
+        return value
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
@@ -0,0 +1,126 @@
+import logging
+import time
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from employees.tenancy import resolved_company
+
+from .instrumentation import (
+    current_metrics,
+    finish_request,
+    instrument_connections,
+    start_request,
+)
+from .queries import report_repeated
+
+logger = logging.getLogger("foodies.requests")
+
+
+def _template_rendered(metrics, response) -> None:
+    metrics.template_time += time.perf_counter() - metrics.template_started
+
+
+class ServerTimingMiddleware:
+    """
+    Measure every request: total time, database time and query count,
+    template rendering time and cache hits and misses. Queries repeated
+    ``QUERY_REPEAT_THRESHOLD`` times are reported as a likely N+1, see
+    ``foodies.queries.report_repeated``.
+
+    The numbers go out in a ``Server-Timing`` header, which browsers show
+    next to the request in their developer tools, unless ``SERVER_TIMING``
+    is off, and in one ``foodies.requests`` log line per request tagged with
+    the view name and the company. Streaming bodies are sent after the
+    middleware returns, so their time is not included.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        instrument_connections()
+        metrics, token = start_request()
+
+        try:
+            response = self.get_response(request)
+        finally:
+            finish_request(token)
+
+        self._report(request, response, metrics)
+
+        return response
+
+    async def __acall__(self, request):
+        metrics, token = start_request()
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            finish_request(token)
+
+        self._report(request, response, metrics)
+
+        return response
+
+    def process_template_response(self, request, response):
+        metrics = current_metrics()
+
+        if metrics is not None:
+            # Django renders the response right after this hook.
+            metrics.template_started = time.perf_counter()
+            response.add_post_render_callback(partial(_template_rendered, metrics))
+
+        return response
+
+    def _report(self, request, response, metrics) -> None:
+        match = request.resolver_match
+
+        if metrics.shapes is not None:
+            report_repeated(
+                metrics.shapes, match.view_name if match else request.path
+            )
+
+        total_ms = (time.perf_counter() - metrics.started) * 1000
+        db_ms = metrics.db_time * 1000
+        template_ms = metrics.template_time * 1000
+
+        if getattr(settings, "SERVER_TIMING", True):
+            response["Server-Timing"] = (
+                f"total;dur={total_ms:.1f}, "
+                f'db;dur={db_ms:.1f};desc="{metrics.queries} queries", '
+                f"template;dur={template_ms:.1f}, "
+                f'cache;desc="hit={metrics.cache_hits} miss={metrics.cache_misses}"'
+            )
+
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
+        company = resolved_company(request)
+        fields = {
+            "view": match.view_name if match else None,
+            "company": company.id if company else None,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 1),
+            "db_ms": round(db_ms, 1),
+            "queries": metrics.queries,
+            "template_ms": round(template_ms, 1),
+            "cache_hits": metrics.cache_hits,
+            "cache_misses": metrics.cache_misses,
+        }
+        logger.info(
+            " ".join(f"{key}={value}" for key, value in fields.items()),
+            extra={"request_metrics": fields},
+        )
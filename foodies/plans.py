@@ -0,0 +1,120 @@
+from typing import Callable
+
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.db.models.sql import UpdateQuery
+
+from companies.models import Company
+from customers.models import Customer
+from orders.models import Order, OrderDetail
+from orders.pagination import encode_cursor, keyset_queryset
+from products.models import Product
+from products.stock import stock_reservation
+
+from .queries import explain_sql, plan_problems
+
+
+def _select(queryset: QuerySet) -> tuple[str, tuple]:
+    return queryset.query.get_compiler(queryset.db).as_sql()
+
+
+def _update(queryset: QuerySet, **values) -> tuple[str, tuple]:
+    query = queryset.query.chain(UpdateQuery)
+    query.add_update_values(values)
+
+    return query.get_compiler(queryset.db).as_sql()
+
+
+def _latest_order(company: Company) -> Order | None:
+    return Order.objects.for_company(company).order_by("-created_at", "-id").first()
+
+
+def _order_id(company: Company) -> int:
+    order = _latest_order(company)
+
+    return order.id if order else 0
+
+
+def _product_list(company: Company) -> tuple[str, tuple]:
+    return _select(Product.objects.for_company(company).order_by("name"))
+
+
+def _customer_list(company: Company) -> tuple[str, tuple]:
+    return _select(Customer.objects.for_company(company))
+
+
+def _order_list(company: Company) -> tuple[str, tuple]:
+    orders = Order.objects.for_company(company).select_related("customer")
+
+    return _select(keyset_queryset(orders, None))
+
+
+def _order_list_next_page(company: Company) -> tuple[str, tuple]:
+    order = _latest_order(company)
+    cursor = encode_cursor(order.created_at, order.id) if order else None
+    orders = Order.objects.for_company(company).select_related("customer")
+
+    return _select(keyset_queryset(orders, cursor))
+
+
+def _order_detail(company: Company) -> tuple[str, tuple]:
+    orders = Order.objects.for_company(company).select_related("customer")
+
+    return _select(orders.filter(id=_order_id(company)))
+
+
+def _order_lines(company: Company) -> tuple[str, tuple]:
+    lines = OrderDetail.objects.select_related("product").order_by("id")
+
+    return _select(lines.filter(order_id__in=[_order_id(company)]))
+
+
+def _stock_update(company: Company) -> tuple[str, tuple]:
+    ids = Product.objects.for_company(company).order_by("id")[:3]
+    products, new_stock = stock_reservation(
+        {product_id: 1 for product_id in ids.values_list("id", flat=True)} or {0: 1}
+    )
+
+    return _update(products, stock=new_stock)
+
+
+# The statements behind the busiest views, built the way those views build
+# them. Each takes a company and returns the SQL and parameters to explain.
+HOT_QUERIES: dict[str, Callable[[Company], tuple[str, tuple]]] = {
+    "product_list": _product_list,
+    "customer_list": _customer_list,
+    "order_list": _order_list,
+    "order_list_next_page": _order_list_next_page,
+    "order_detail": _order_detail,
+    "order_lines": _order_lines,
+    "stock_update": _stock_update,
+}
+
+
+def analyze_tables() -> None:
+    """Refresh the table statistics the query planner picks plans with."""
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def check_plans(company: Company, names=None) -> dict[str, dict]:
+    """
+    Explain the ``HOT_QUERIES`` in ``names`` (all of them by default) for
+    ``company`` and return, per name, the SQL, its plan and the problems
+    ``plan_problems`` finds in it.
+
+    Plans depend on the table statistics, so check a database the size of
+    production and analyzed (``analyze_tables``), not an empty one.
+    """
+    results = {}
+
+    for name in names or HOT_QUERIES:
+        sql, params = HOT_QUERIES[name](company)
+        plan = explain_sql(connection, sql, params)
+        results[name] = {
+            "sql": sql,
+            "plan": plan,
+            "problems": plan_problems(plan, connection.vendor),
+        }
+
+    return results
@@ -0,0 +1,188 @@
+import logging
+import re
+from collections import Counter
+from contextlib import ContextDecorator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger("foodies.queries")
+
+# Default number of times one query shape may run in a request before it is
+# reported as an N+1.
+REPEAT_THRESHOLD = 5
+
+_IN_LIST = re.compile(r"\bIN \((?:%s, )*%s\)")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+# Plan lines that read every row of a table or sort the result on the side,
+# as SQLite's ``EXPLAIN QUERY PLAN`` and PostgreSQL's ``EXPLAIN`` word them.
+_PLAN_PROBLEMS = {
+    "sqlite": [
+        (re.compile(r"\bSCAN (\w+)"), "full scan of {}"),
+        (re.compile(r"\bUSE TEMP B-TREE FOR ([A-Z ]+)"), "temporary B-tree for {}"),
+    ],
+    "postgresql": [
+        (re.compile(r"\bSeq Scan on (\w+)"), "full scan of {}"),
+        (re.compile(r"^\s*(?:->\s*)?((?:Incremental )?Sort)\s+\("), "{} step"),
+    ],
+}
+
+
+def query_shape(sql: str) -> str:
+    """
+    ``sql`` without the values that change between otherwise identical
+    queries: ``IN`` lists of any length, quoted strings and numbers.
+    """
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _STRING.sub("?", sql)
+
+    return _NUMBER.sub("?", sql)
+
+
+def explain_sql(connection, sql: str, params=None) -> str:
+    """
+    The plan ``connection``'s database picks for ``sql``, one step per line,
+    formatted like ``QuerySet.explain()``. The statement itself is not run,
+    so UPDATEs and DELETEs can be explained too.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+        rows = cursor.fetchall()
+
+    return "\n".join(
+        " ".join(str(value) for value in row) if len(row) > 1 else str(row[0])
+        for row in rows
+    )
+
+
+def plan_problems(plan: str, vendor: str) -> list[str]:
+    """
+    Full table scans and sorts outside an index in ``plan``, an
+    ``explain_sql`` output of a ``vendor`` database. Vendors this does not
+    know have none.
+    """
+    problems = []
+
+    for line in plan.splitlines():
+        for pattern, problem in _PLAN_PROBLEMS.get(vendor, []):
+            match = pattern.search(line)
+
+            if match:
+                problems.append(problem.format(match.group(1).strip()))
+
+    return problems
+
+
+class RepeatedQueriesError(AssertionError):
+    pass
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def repeat_threshold() -> int:
+    return getattr(settings, "QUERY_REPEAT_THRESHOLD", REPEAT_THRESHOLD)
+
+
+def repeated_shapes(shapes: Counter, threshold: int | None = None) -> list:
+    """The ``(shape, count)`` pairs of ``shapes`` run ``threshold`` times or more."""
+    threshold = repeat_threshold() if threshold is None else threshold
+
+    if threshold < 1:
+        return []
+
+    return [
+        (shape, count) for shape, count in shapes.most_common() if count >= threshold
+    ]
+
+
+def _describe(shapes) -> str:
+    return "\n".join(f"  {count} × {shape}" for shape, count in shapes)
+
+
+def report_repeated(shapes: Counter, where: str, threshold: int | None = None) -> None:
+    """
+    Raise ``RepeatedQueriesError`` (``QUERY_REPEAT_RAISE``, on in tests) or
+    log a warning when a shape in ``shapes`` looks like an N+1.
+    """
+    repeated = repeated_shapes(shapes, threshold)
+
+    if not repeated:
+        return
+
+    message = f"Repeated queries in {where}:\n{_describe(repeated)}"
+
+    if getattr(settings, "QUERY_REPEAT_RAISE", False):
+        raise RepeatedQueriesError(message)
+
+    logger.warning(message)
+
+
+class QueryTracker:
+    """An execute wrapper counting the queries it sees, by shape."""
+
+    def __init__(self) -> None:
+        self.shapes = Counter()
+
+    @property
+    def count(self) -> int:
+        return sum(self.shapes.values())
+
+    def __call__(self, execute, sql, params, many, context):
+        self.shapes[query_shape(sql)] += 1
+
+        return execute(sql, params, many, context)
+
+
+class query_budget(ContextDecorator):
+    """
+    Fail when the block or decorated function runs more than ``max_queries``
+    queries on ``using``, or repeats a query shape ``repeat_threshold`` times.
+
+        with query_budget(6):
+            self.client.get(reverse("orders"))
+
+    Unlike ``assertNumQueries`` it sets a ceiling, so a view may get cheaper
+    without touching its tests, and the failure lists the queries by shape.
+    """
+
+    def __init__(
+        self,
+        max_queries: int,
+        using: str = DEFAULT_DB_ALIAS,
+        repeat_threshold: int | None = None,
+    ) -> None:
+        self.max_queries = max_queries
+        self.using = using
+        self.repeat_threshold = repeat_threshold
+
+    def __enter__(self):
+        self.tracker = QueryTracker()
+        self.wrapper = connections[self.using].execute_wrapper(self.tracker)
+        self.wrapper.__enter__()
+
+        return self.tracker
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.wrapper.__exit__(exc_type, exc_value, traceback)
+
+        if exc_type is not None:
+            return False
+
+        tracker = self.tracker
+
+        if tracker.count > self.max_queries:
+            raise QueryBudgetExceeded(
+                f"{tracker.count} queries, budget {self.max_queries}:\n"
+                f"{_describe(tracker.shapes.most_common())}"
+            )
+
+        repeated = repeated_shapes(tracker.shapes, self.repeat_threshold)
+
+        if repeated:
+            raise RepeatedQueriesError(f"Repeated queries:\n{_describe(repeated)}")
+
+        return False
@@ -0,0 +1,388 @@
+import random
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from categories.models import Category
+from companies.models import Company
+from customers.models import Customer
+from document_types.models import DocumentType
+from employees.models import Employee
+from orders.models import Order, OrderDetail
+from products.catalog import bump_catalog_version
+from products.models import Product
+from products.search import rebuild_search_index
+from reports.rollups import rebuild_rollups
+
+BATCH_SIZE = 5000
+LOCALE = "es_CO"
+
+# Share of a day's orders placed in each hour: a lunch peak, a smaller
+# dinner peak and almost nothing overnight.
+HOUR_WEIGHTS = [
+    0, 0, 0, 0, 0, 0, 1, 2, 3, 4, 6, 14,
+    22, 18, 8, 4, 3, 5, 9, 11, 8, 4, 2, 1,
+]
+# Monday first; weekends are busier.
+WEEKDAY_WEIGHTS = [8, 8, 9, 10, 13, 15, 12]
+LINE_COUNTS, LINE_WEIGHTS = [1, 2, 3, 4, 5, 6], [35, 30, 18, 9, 5, 3]
+QUANTITIES, QUANTITY_WEIGHTS = [1, 2, 3, 4], [70, 20, 7, 3]
+ORDER_COLUMNS = [
+    "id",
+    "attended_by_id",
+    "customer_id",
+    "company_id",
+    "created_at",
+    "updated_at",
+    "subtotal",
+    "item_count",
+    "total",
+]
+LINE_COLUMNS = ["id", "order_id", "product_id", "quantity", "unit_price"]
+# Exponents of the Zipf-like rank distributions: a few products sell most of
+# the volume and a core of regulars places most of the orders.
+PRODUCT_SKEW = 1.1
+CUSTOMER_SKEW = 0.8
+
+DISHES = [
+    "Arepa", "Empanada", "Bandeja", "Sancocho", "Ajiaco", "Tamal", "Buñuelo",
+    "Hamburguesa", "Perro caliente", "Pizza", "Salchipapa", "Jugo", "Limonada",
+    "Mazorcada", "Patacón", "Changua", "Almojábana", "Pandebono",
+]
+STYLES = [
+    "de pollo", "de carne", "de cerdo", "mixta", "vegetariana", "con queso",
+    "especial", "de la casa", "sencilla", "doble", "paisa", "costeña",
+]
+CATEGORIES = [
+    "Platos fuertes", "Entradas", "Bebidas", "Postres", "Desayunos",
+    "Comidas rápidas", "Sopas", "Acompañamientos", "Combos", "Infantil",
+]
+
+
+def _cum_weights(count: int, skew: float) -> list[float]:
+    return list(accumulate(1 / rank**skew for rank in range(1, count + 1)))
+
+
+def _numbered(names: list[str], number: int) -> str:
+    """``names[number]``, with a round suffix once the list runs out."""
+    name = names[number % len(names)]
+    round_ = number // len(names)
+
+    return f"{name} {round_ + 1}" if round_ else name
+
+
+def _decimal_adapter(model, name: str):
+    field = model._meta.get_field(name)
+
+    return lambda value: connection.ops.adapt_decimalfield_value(
+        value, field.max_digits, field.decimal_places
+    )
+
+
+def _insert_rows(model, columns: list[str], rows: list[tuple]) -> None:
+    """
+    Insert already prepared ``rows`` with a single ``executemany``.
+
+    Order history is the bulk of a seeded database and most of the cost of
+    ``bulk_create`` is building model instances and compiling their values,
+    which these rows skip. It also keeps ``created_at`` as given, where
+    ``bulk_create`` would stamp every row with the current time.
+    """
+    quote = connection.ops.quote_name
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(column) for column in columns),
+        ", ".join(["%s"] * len(columns)),
+    )
+
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+class DataSeeder:
+    """
+    Generate companies with their catalog, customers, employees and order
+    history.
+
+    Everything is derived from ``seed`` and ``end``, so two runs with the same
+    arguments on an empty database produce the same rows. Rows are written
+    ``batch_size`` at a time; orders and lines get their ids up front so
+    lines never wait for the orders' ids to come back.
+    """
+
+    def __init__(
+        self,
+        companies: int = 1,
+        categories: int = 8,
+        products: int = 200,
+        customers: int = 2000,
+        employees: int = 5,
+        orders: int = 10000,
+        days: int = 90,
+        end: date | None = None,
+        seed: int = 0,
+        password: str = "foodies",
+        batch_size: int = BATCH_SIZE,
+        rollups: bool = True,
+        log=None,
+    ) -> None:
+        self.companies = companies
+        self.categories = categories
+        self.products = products
+        self.customers = customers
+        self.employees = employees
+        self.orders = orders
+        self.days = days
+        self.end = end or timezone.localdate()
+        self.seed = seed
+        self.password = make_password(password)
+        self.batch_size = batch_size
+        self.rollups = rollups
+        self.log = log or (lambda message: None)
+        self.counts = Counter()
+
+    def run(self) -> dict:
+        document_type, _ = DocumentType.objects.get_or_create(
+            code="NIT", defaults={"name": "Número de Identificación Tributaria"}
+        )
+
+        for index in range(self.companies):
+            self._seed_company(index, document_type)
+
+        return dict(self.counts)
+
+    def _seed_company(self, index: int, document_type) -> None:
+        rng = random.Random(f"{self.seed}:{index}")
+        faker = Faker(LOCALE)
+        faker.seed_instance(rng.getrandbits(32))
+
+        with transaction.atomic():
+            company = Company.objects.create(
+                name=faker.company(),
+                email=faker.company_email(),
+                phone=faker.phone_number()[:20],
+                document_number=faker.legal_person_nit(),
+                document_type=document_type,
+                address=faker.address(),
+                city=faker.city(),
+                country="Colombia",
+            )
+            users = self._seed_employees(company)
+            products = self._seed_catalog(company, rng)
+            customers = self._seed_customers(company, rng, faker)
+
+        self.counts["companies"] += 1
+        self.log(f"{company}: catálogo, clientes y empleados creados.")
+
+        if self.orders and products and customers and users:
+            self._seed_orders(company, rng, users, products, customers)
+
+            if self.rollups:
+                rebuild_rollups(
+                    self.end - timedelta(days=self.days - 1),
+                    self.end,
+                    company_id=company.id,
+                )
+
+        rebuild_search_index(company.id)
+        bump_catalog_version(company.id)
+
+    def _seed_employees(self, company) -> list[int]:
+        users = User.objects.bulk_create(
+            User(
+                username=f"empleado-{company.id}-{number}",
+                password=self.password,
+                first_name="Empleado",
+                last_name=str(number),
+            )
+            for number in range(1, self.employees + 1)
+        )
+        Employee.objects.bulk_create(
+            Employee(user=user, company=company) for user in users
+        )
+        self.counts["employees"] += len(users)
+
+        return [user.id for user in users]
+
+    def _seed_catalog(self, company, rng) -> list[tuple[int, Decimal]]:
+        categories = Category.objects.bulk_create(
+            Category(name=_numbered(CATEGORIES, number), company=company)
+            for number in range(self.categories)
+        )
+        products = []
+
+        for number in range(self.products):
+            dish = DISHES[number % len(DISHES)]
+            style = _numbered(STYLES, number // len(DISHES))
+            products.append(
+                Product(
+                    name=f"{dish} {style}",
+                    description=f"{dish} {style}, preparado al momento.",
+                    price=Decimal(rng.randrange(20, 600) * 100),
+                    stock=rng.randrange(50, 5000),
+                    category=categories[rng.randrange(len(categories))],
+                    company=company,
+                )
+            )
+
+        products = Product.objects.bulk_create(products, batch_size=self.batch_size)
+        self.counts["categories"] += len(categories)
+        self.counts["products"] += len(products)
+
+        # Popularity does not follow creation order.
+        rng.shuffle(products)
+
+        return [(product.id, product.price) for product in products]
+
+    def _seed_customers(self, company, rng, faker) -> list[int]:
+        first_names = [faker.first_name() for _ in range(200)]
+        last_names = [faker.last_name() for _ in range(200)]
+        streets = [faker.street_name() for _ in range(100)]
+        neighborhoods = [f"Barrio {faker.last_name()}" for _ in range(60)]
+        Membership = Customer.companies.through
+        ids = []
+
+        for start in range(0, self.customers, self.batch_size):
+            customers = []
+
+            for number in range(start, min(start + self.batch_size, self.customers)):
+                customer = Customer(
+                    name=f"{rng.choice(first_names)} {rng.choice(last_names)}",
+                    phone_number=f"+57 3{company.id % 100:02d}{number:07d}",
+                    address=(
+                        f"{rng.choice(streets)} # "
+                        f"{rng.randrange(1, 150)}-{rng.randrange(1, 99)}"
+                    ),
+                    neighborhood=rng.choice(neighborhoods),
+                )
+                customer.update_search_keys()
+                customers.append(customer)
+
+            customers = Customer.objects.bulk_create(customers)
+            Membership.objects.bulk_create(
+                Membership(customer_id=customer.id, company_id=company.id)
+                for customer in customers
+            )
+            ids.extend(customer.id for customer in customers)
+
+        self.counts["customers"] += len(ids)
+        rng.shuffle(ids)
+
+        return ids
+
+    def _day_counts(self, rng) -> list[tuple[date, int]]:
+        first_day = self.end - timedelta(days=self.days - 1)
+        days = [first_day + timedelta(days=offset) for offset in range(self.days)]
+        counts = Counter(
+            rng.choices(
+                range(self.days),
+                weights=[WEEKDAY_WEIGHTS[day.weekday()] for day in days],
+                k=self.orders,
+            )
+        )
+
+        return [(day, counts[offset]) for offset, day in enumerate(days)]
+
+    def _seed_orders(self, company, rng, users, products, customers) -> None:
+        product_weights = _cum_weights(len(products), PRODUCT_SKEW)
+        customer_weights = _cum_weights(len(customers), CUSTOMER_SKEW)
+        hour_weights = list(accumulate(HOUR_WEIGHTS))
+        tz = timezone.get_current_timezone()
+        adapt_datetime = connection.ops.adapt_datetimefield_value
+        adapt_total = _decimal_adapter(Order, "total")
+        # Lines copy the product price, so it is adapted once per product.
+        adapt_price = _decimal_adapter(OrderDetail, "unit_price")
+        prices = {product_id: adapt_price(price) for product_id, price in products}
+
+        with transaction.atomic():
+            next_order_id = (Order.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+            next_line_id = (
+                OrderDetail.objects.aggregate(last=Max("id"))["last"] or 0
+            ) + 1
+
+        orders, lines = [], []
+
+        for day, count in self._day_counts(rng):
+            midnight = datetime.combine(day, time.min, tzinfo=tz)
+            offsets = sorted(
+                timedelta(
+                    hours=hour, minutes=rng.randrange(60), seconds=rng.randrange(60)
+                )
+                for hour in rng.choices(range(24), cum_weights=hour_weights, k=count)
+            )
+
+            for offset in offsets:
+                created_at = adapt_datetime(midnight + offset)
+                order_lines = rng.choices(
+                    products,
+                    cum_weights=product_weights,
+                    k=rng.choices(LINE_COUNTS, LINE_WEIGHTS)[0],
+                )
+                subtotal = Decimal(0)
+                item_count = 0
+
+                for product_id, price in order_lines:
+                    quantity = rng.choices(QUANTITIES, QUANTITY_WEIGHTS)[0]
+                    subtotal += price * quantity
+                    item_count += quantity
+                    lines.append(
+                        (
+                            next_line_id,
+                            next_order_id,
+                            product_id,
+                            quantity,
+                            prices[product_id],
+                        )
+                    )
+                    next_line_id += 1
+
+                subtotal = adapt_total(subtotal)
+                orders.append(
+                    (
+                        next_order_id,
+                        rng.choice(users),
+                        rng.choices(customers, cum_weights=customer_weights)[0],
+                        company.id,
+                        created_at,
+                        created_at,
+                        subtotal,
+                        item_count,
+                        subtotal,
+                    )
+                )
+                next_order_id += 1
+
+                if len(lines) >= self.batch_size:
+                    self._write_orders(orders, lines)
+                    orders, lines = [], []
+
+        self._write_orders(orders, lines)
+
+        # Explicit ids leave sequence-backed databases behind the new rows.
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), [Order, OrderDetail]
+            ):
+                cursor.execute(sql)
+
+        self.log(f"{company}: {self.counts['orders']} pedidos en total.")
+
+    def _write_orders(self, orders: list[tuple], lines: list[tuple]) -> None:
+        if not orders:
+            return
+
+        with transaction.atomic():
+            _insert_rows(Order, ORDER_COLUMNS, orders)
+            _insert_rows(OrderDetail, LINE_COLUMNS, lines)
+
+        self.counts["orders"] += len(orders)
+        self.counts["order_lines"] += len(lines)
@@ -41,12 +41,14 @@ USER_APPS = [
     "employees",
     "orders",
     "products",
+    "reports",
 ]
 
 INSTALLED_APPS = BASE_APPS + THIRD_PARTY_APPS + USER_APPS
 
 if not TESTING:
     MIDDLEWARE = [
+        "foodies.middleware.ServerTimingMiddleware",
         "django.middleware.security.SecurityMiddleware",
         "django.contrib.sessions.middleware.SessionMiddleware",
         "django.middleware.common.CommonMiddleware",
@@ -58,6 +60,7 @@ if not TESTING:
     ]
 else:
     MIDDLEWARE = [
+        "foodies.middleware.ServerTimingMiddleware",
         "django.middleware.security.SecurityMiddleware",
         "django.contrib.sessions.middleware.SessionMiddleware",
         "django.middleware.common.CommonMiddleware",
@@ -132,6 +135,49 @@ INTERNAL_IP = [
     "localhost:8000",
 ]
 
+# Seconds a resolved employee/company is reused across requests of the same
+# user in one process. 0 resolves it once per request.
+TENANT_CACHE_TTL = 0
+
+CACHES = {
+    "default": {
+        "BACKEND": "foodies.instrumentation.InstrumentedLocMemCache",
+    }
+}
+
+# Send per-request timings to clients in a Server-Timing header. They are
+# always logged to "foodies.requests".
+SERVER_TIMING = True
+
+# A request running the same query shape this many times is reported as an
+# N+1: raised in tests, logged to "foodies.queries" otherwise. 0 turns it off.
+QUERY_REPEAT_THRESHOLD = 5
+QUERY_REPEAT_RAISE = TESTING
+
+# Queries slower than this many milliseconds are logged to "foodies.queries"
+# with their EXPLAIN plan. None turns it off.
+SLOW_QUERY_MS = None if TESTING else 200
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "foodies.requests": {
+            "handlers": ["console"],
+            "level": "WARNING" if TESTING else "INFO",
+            "propagate": False,
+        },
+        "foodies.queries": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
+
 LOGIN_REDIRECT_URL = "orders"
 LOGOUT_REDIRECT_URL = "login"
 LOGIN_URL = "login"
@@ -0,0 +1,87 @@
+import csv
+import io
+from pathlib import Path
+from typing import Iterator
+
+from django.core.exceptions import ValidationError
+
+DELIMITERS = {".csv": ",", ".tsv": "\t"}
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+class Echo:
+    """File-like object whose ``write`` returns the value, for streaming CSV."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def get_delimiter(filename: str) -> str:
+    delimiter = DELIMITERS.get(Path(filename).suffix.lower())
+
+    if delimiter is None:
+        raise ImportFormatError(
+            f"Formato no soportado, usa uno de: {', '.join(DELIMITERS)}"
+        )
+
+    return delimiter
+
+
+def read_rows(
+    file, delimiter: str = ",", aliases: dict[str, str] | None = None
+) -> Iterator[tuple[int, dict]]:
+    """
+    Yield ``(line_number, row)`` for every non-blank data row of a binary
+    file, keyed by the lowercased header (or its entry in ``aliases``).
+    """
+    aliases = aliases or {}
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text, delimiter=delimiter)
+    header = next(reader, None)
+
+    if header is None:
+        return
+
+    fields = [
+        aliases.get(column.strip().lower(), column.strip().lower())
+        for column in header
+    ]
+
+    for row in reader:
+        if any(value.strip() for value in row):
+            yield reader.line_num, dict(zip(fields, row))
+
+
+class RowValidator:
+    """
+    Apply the field and model-field validation of a ``ModelForm`` to plain
+    row dicts. Building a form per row deep-copies every field, which
+    dominates the cost of a large import.
+    """
+
+    def __init__(self, form_class, exclude: tuple[str, ...] = ()) -> None:
+        self.fields = form_class().fields
+        self.model_fields = {
+            field.name: field
+            for field in form_class._meta.model._meta.concrete_fields
+            if field.name in self.fields and field.name not in exclude
+        }
+
+    def clean(self, row: dict) -> tuple[dict, dict]:
+        cleaned, errors = {}, {}
+
+        for name, field in self.fields.items():
+            try:
+                value = field.clean(field.widget.value_from_datadict(row, {}, name))
+
+                if name in self.model_fields:
+                    self.model_fields[name].run_validators(value)
+
+                cleaned[name] = value
+            except ValidationError as e:
+                errors[name] = e.messages
+
+        return cleaned, errors
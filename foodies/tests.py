@@ -0,0 +1,203 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from faker import Faker
+from random import randint
+
+from companies.models import Company
+from document_types.models import DocumentType
+from employees.models import Employee
+from employees.tenancy import clear_tenant_cache
+
+from .instrumentation import instrument_connections
+from .middleware import ServerTimingMiddleware
+from .queries import (
+    QueryBudgetExceeded,
+    RepeatedQueriesError,
+    query_budget,
+    query_shape,
+)
+
+User = get_user_model()
+
+
+class ServerTimingMiddlewareTest(TestCase):
+
+    def setUp(self):
+        clear_tenant_cache()
+        cache.clear()
+        faker = Faker("es_CO")
+        faker.seed_instance(randint(0, 9999))
+        document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.company = Company.objects.create(
+            name=faker.company(),
+            email=faker.company_email(),
+            phone=faker.phone_number(),
+            document_number=faker.legal_person_nit(),
+            document_type=document_type,
+            address=faker.address(),
+            city=faker.city(),
+            country=faker.country(),
+        )
+        self.user = User.objects.create_user(username="testuser", password="password")
+        Employee.objects.create(user=self.user, company=self.company)
+        self.client.force_login(self.user)
+
+    def timings(self, response) -> dict:
+        timings = {}
+
+        for metric in response["Server-Timing"].split(", "):
+            name, *params = metric.split(";")
+            timings[name] = dict(param.split("=", 1) for param in params)
+
+        return timings
+
+    def test_server_timing_reports_queries_and_templates(self):
+        """La cabecera Server-Timing incluye tiempos, consultas y plantillas"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("employees"))
+
+        timings = self.timings(response)
+
+        self.assertEqual(set(timings), {"total", "db", "template", "cache"})
+        self.assertEqual(timings["db"]["desc"], f'"{len(queries)} queries"')
+        self.assertGreater(float(timings["template"]["dur"]), 0)
+        self.assertGreaterEqual(
+            float(timings["total"]["dur"]), float(timings["db"]["dur"])
+        )
+
+    def test_server_timing_counts_cache_hits_and_misses(self):
+        """Se cuentan los aciertos y fallos de caché de cada petición"""
+        first = self.timings(self.client.get(reverse("api_products")))
+        second = self.timings(self.client.get(reverse("api_products")))
+
+        # The catalog version is missed, created and read again.
+        self.assertEqual(first["cache"]["desc"], '"hit=1 miss=2"')
+        self.assertEqual(second["cache"]["desc"], '"hit=2 miss=0"')
+
+    async def test_server_timing_counts_async_view_queries(self):
+        """Las consultas de las vistas asíncronas también se cuentan"""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("api_customers_async"))
+
+        self.assertNotEqual(self.timings(response)["db"]["desc"], '"0 queries"')
+
+    def test_request_is_logged_with_view_and_company(self):
+        """Cada petición deja una línea de log con la vista y la empresa"""
+        with self.assertLogs("foodies.requests", "INFO") as logs:
+            self.client.get(reverse("employees"))
+
+        metrics = logs.records[-1].request_metrics
+
+        self.assertEqual(metrics["view"], "employees")
+        self.assertEqual(metrics["company"], self.company.id)
+        self.assertEqual(metrics["status"], 200)
+        self.assertIn("view=employees", logs.output[-1])
+
+    @override_settings(SERVER_TIMING=False)
+    def test_server_timing_header_can_be_disabled(self):
+        """SERVER_TIMING en False omite la cabecera"""
+        response = self.client.get(reverse("employees"))
+
+        self.assertFalse(response.has_header("Server-Timing"))
+
+
+class RepeatedQueriesTest(TestCase):
+
+    def setUp(self):
+        faker = Faker("es_CO")
+        faker.seed_instance(randint(0, 9999))
+        document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.companies = [
+            Company.objects.create(
+                name=faker.company(),
+                email=faker.company_email(),
+                phone=faker.phone_number(),
+                document_number=faker.legal_person_nit(),
+                document_type=document_type,
+                address=faker.address(),
+                city=faker.city(),
+                country=faker.country(),
+            )
+            for _ in range(6)
+        ]
+
+    def n_plus_one(self, request=None):
+        for company in self.companies:
+            Company.objects.get(id=company.id)
+
+        return HttpResponse()
+
+    def test_query_shape_ignores_values(self):
+        """Consultas iguales salvo por sus valores tienen la misma forma"""
+        self.assertEqual(
+            query_shape('SELECT "a" FROM "t" WHERE "id" IN (%s, %s) LIMIT 21'),
+            query_shape('SELECT "a" FROM "t" WHERE "id" IN (%s) LIMIT 1'),
+        )
+        self.assertNotEqual(
+            query_shape('SELECT "a" FROM "t"'), query_shape('SELECT "b" FROM "t"')
+        )
+
+    def test_middleware_raises_on_repeated_queries_in_tests(self):
+        """En las pruebas una vista con N+1 consultas falla"""
+        middleware = ServerTimingMiddleware(self.n_plus_one)
+
+        with self.assertRaises(RepeatedQueriesError):
+            middleware(RequestFactory().get("/"))
+
+    @override_settings(QUERY_REPEAT_RAISE=False)
+    def test_middleware_logs_repeated_queries_in_production(self):
+        """En producción las N+1 consultas se registran en el log"""
+        middleware = ServerTimingMiddleware(self.n_plus_one)
+
+        with self.assertLogs("foodies.queries", "WARNING") as logs:
+            response = middleware(RequestFactory().get("/"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("6 × SELECT", logs.output[0])
+
+    def test_query_budget_fails_above_the_budget(self):
+        """El presupuesto de consultas falla al superarse"""
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(5, repeat_threshold=0):
+                self.n_plus_one()
+
+        with query_budget(1):
+            Company.objects.count()
+
+    def test_query_budget_fails_on_repeated_queries(self):
+        """El presupuesto también detecta consultas repetidas"""
+        budget = query_budget(10)
+
+        with self.assertRaises(RepeatedQueriesError):
+            budget(self.n_plus_one)()
+
+
+class SlowQueryLogTest(TestCase):
+
+    def setUp(self):
+        instrument_connections()
+
+    @override_settings(SLOW_QUERY_MS=0.001)
+    def test_slow_queries_are_logged_with_their_plan(self):
+        """Las consultas lentas se registran en el log con su plan"""
+        with self.assertLogs("foodies.queries", "WARNING") as logs:
+            Company.objects.filter(city="Cali").count()
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("SCAN companies_company", logs.records[0].plan)
+        self.assertIn('"companies_company"."city"', logs.records[0].sql)
+
+    def test_fast_queries_are_not_logged(self):
+        """Sin umbral de consultas lentas no se registra nada"""
+        with self.assertNoLogs("foodies.queries", "WARNING"):
+            Company.objects.filter(city="Cali").count()
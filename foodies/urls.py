@@ -14,6 +14,7 @@ if not settings.TESTING:
         path("customers/", include("customers.urls")),
         path("employees/", include("employees.urls")),
         path("orders/", include("orders.urls")),
+        path("reports/", include("reports.urls")),
         path("__debug__/", include(debug_toolbar)),
     ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 else:
@@ -24,4 +25,5 @@ else:
         path("customers/", include("customers.urls")),
         path("employees/", include("employees.urls")),
         path("orders/", include("orders.urls")),
+        path("reports/", include("reports.urls")),
     ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
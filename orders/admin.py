@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Order, OrderDetail
+from .models import Order, OrderDetail, OrderSubmission
 
 
 class OrderDetailInline(admin.TabularInline):
@@ -14,3 +14,13 @@ class OrderAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Order, OrderAdmin)
+
+
+class OrderSubmissionAdmin(admin.ModelAdmin):
+    model = OrderSubmission
+    list_display = ["idempotency_key", "submitted_by", "status", "attempts", "order"]
+    list_filter = ["status"]
+    raw_id_fields = ["order"]
+
+
+admin.site.register(OrderSubmission, OrderSubmissionAdmin)
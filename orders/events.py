@@ -0,0 +1,285 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from .models import Order, OrderDetail
+from .pagination import decode_cursor, encode_cursor
+
+POLL_INTERVAL = 5
+HEARTBEAT_INTERVAL = 15
+# Orders are stamped when the row is written but only become visible when the
+# transaction commits, so each poll looks this far behind the newest change.
+COMMIT_LAG = timedelta(seconds=10)
+BACKLOG_LIMIT = 200
+QUEUE_SIZE = 500
+
+_feeds: dict[int, "OrderFeed"] = {}
+
+
+def load_order_events(
+    company_id: int,
+    since: datetime | None,
+    limit: int = BACKLOG_LIMIT,
+    after: tuple[datetime, int] | None = None,
+) -> list[dict]:
+    """
+    Return the orders of ``company_id`` changed at or after ``since`` as
+    events, oldest change first, each with its lines. With ``after``, only
+    the changes that sort after that ``(updated_at, id)`` position.
+    """
+    orders = Order.objects.filter(company_id=company_id)
+
+    if since is not None:
+        orders = orders.filter(updated_at__gte=since)
+
+    if after is not None:
+        updated_at, pk = after
+        orders = orders.filter(
+            Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk)
+        )
+
+    orders = list(
+        orders.order_by("updated_at", "id").values(
+            "id",
+            "customer__name",
+            "created_at",
+            "updated_at",
+            "item_count",
+            "total",
+        )[:limit]
+    )
+    lines = {}
+
+    for line in (
+        OrderDetail.objects.filter(order_id__in=[order["id"] for order in orders])
+        .order_by("id")
+        .values("order_id", "product__name", "quantity")
+    ):
+        lines.setdefault(line["order_id"], []).append(
+            {"product": line["product__name"], "quantity": line["quantity"]}
+        )
+
+    return [
+        {
+            "id": encode_cursor(order["updated_at"], order["id"]),
+            "key": (order["id"], order["updated_at"]),
+            "data": {
+                "id": order["id"],
+                "customer": order["customer__name"],
+                "created_at": order["created_at"],
+                "updated_at": order["updated_at"],
+                "item_count": order["item_count"],
+                "total": order["total"],
+                "items": lines.get(order["id"], []),
+            },
+        }
+        for order in orders
+    ]
+
+
+def load_order_backlog(
+    company_id: int, since: datetime | None, page_size: int = BACKLOG_LIMIT
+) -> list[dict]:
+    """
+    Return every change ``load_order_events`` finds since ``since``, read
+    ``page_size`` orders at a time, so a burst of changes larger than a page
+    is drained instead of re-reading its first page.
+    """
+    events = []
+    after = None
+
+    while True:
+        page = load_order_events(company_id, since, page_size, after)
+        events += page
+
+        if len(page) < page_size:
+            return events
+
+        last = page[-1]["data"]
+        after = (last["updated_at"], last["id"])
+
+
+def latest_change(company_id: int) -> datetime | None:
+    return (
+        Order.objects.filter(company_id=company_id)
+        .order_by("-updated_at")
+        .values_list("updated_at", flat=True)
+        .first()
+    )
+
+
+def format_event(event: dict) -> str:
+    data = json.dumps(event["data"], cls=DjangoJSONEncoder)
+
+    return f"id: {event['id']}\nevent: order\ndata: {data}\n\n"
+
+
+class Subscriber:
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.overflowed = False
+
+    def put(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A screen this far behind reconnects and resumes from its last id.
+            self.overflowed = True
+
+
+class OrderFeed:
+    """
+    The changes to one company's orders, shared by every stream of this
+    process.
+
+    A single task reads new changes and fans them out to the subscribers,
+    so the database cost depends on the number of companies with an open
+    screen, not on the number of screens. The task wakes up right away when
+    an order is saved in this process and polls every ``POLL_INTERVAL``
+    seconds to catch changes made by other processes.
+    """
+
+    def __init__(self, company_id: int) -> None:
+        self.company_id = company_id
+        self.loop = asyncio.get_running_loop()
+        self.subscribers: set[Subscriber] = set()
+        self.wakeup = asyncio.Event()
+        self.watermark: datetime | None = None
+        self.seen: dict[tuple, float] = {}
+        self.task: asyncio.Task | None = None
+        self.page_size = BACKLOG_LIMIT
+
+    def notify(self) -> None:
+        self.loop.call_soon_threadsafe(self.wakeup.set)
+
+    async def start(self) -> None:
+        self.watermark = await sync_to_async(latest_change)(self.company_id)
+
+        if self.watermark is not None:
+            # Changes already visible when the feed starts are not news.
+            for event in await sync_to_async(load_order_backlog)(
+                self.company_id, self.watermark - COMMIT_LAG, self.page_size
+            ):
+                self._remember(event["key"])
+
+        self.task = asyncio.create_task(self.run())
+
+    def _remember(self, key: tuple) -> bool:
+        """Return whether ``key`` is new, pruning keys outside the lag window."""
+        now = time.monotonic()
+
+        if len(self.seen) > QUEUE_SIZE:
+            horizon = now - COMMIT_LAG.total_seconds() * 2
+            self.seen = {k: seen for k, seen in self.seen.items() if seen > horizon}
+
+        if key in self.seen:
+            return False
+
+        self.seen[key] = now
+
+        return True
+
+    async def poll(self) -> None:
+        since = self.watermark - COMMIT_LAG if self.watermark else None
+        events = await sync_to_async(load_order_backlog)(
+            self.company_id, since, self.page_size
+        )
+
+        for event in events:
+            updated_at = event["data"]["updated_at"]
+
+            if self.watermark is None or updated_at > self.watermark:
+                self.watermark = updated_at
+
+            if self._remember(event["key"]):
+                for subscriber in self.subscribers:
+                    subscriber.put(event)
+
+    async def run(self) -> None:
+        while self.subscribers:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+            self.wakeup.clear()
+
+            if self.subscribers:
+                await self.poll()
+
+
+async def subscribe(company_id: int) -> Subscriber:
+    feed = _feeds.get(company_id)
+
+    if feed is None or feed.loop is not asyncio.get_running_loop():
+        feed = _feeds[company_id] = OrderFeed(company_id)
+        await feed.start()
+
+    subscriber = Subscriber()
+    feed.subscribers.add(subscriber)
+
+    return subscriber
+
+
+def unsubscribe(company_id: int, subscriber: Subscriber) -> None:
+    feed = _feeds.get(company_id)
+
+    if feed is None:
+        return
+
+    feed.subscribers.discard(subscriber)
+
+    if not feed.subscribers:
+        del _feeds[company_id]
+        feed.wakeup.set()
+
+
+def notify_order_change(company_id: int) -> None:
+    """Wake up this process's feed for ``company_id``, from any thread."""
+    feed = _feeds.get(company_id)
+
+    if feed is not None:
+        feed.notify()
+
+
+async def stream_order_events(company_id: int, last_event_id: str | None = None):
+    """
+    Yield the changes to ``company_id``'s orders as Server-Sent Events.
+
+    With ``last_event_id`` the stream first replays what changed since that
+    event; orders may then be sent twice, so clients update by order id.
+    """
+    subscriber = await subscribe(company_id)
+
+    try:
+        position = decode_cursor(last_event_id) if last_event_id else None
+        sent = set()
+
+        if position is not None:
+            since = position[0] - COMMIT_LAG
+
+            for event in await sync_to_async(load_order_backlog)(company_id, since):
+                sent.add(event["key"])
+                yield format_event(event)
+
+        yield f"retry: {POLL_INTERVAL * 1000}\n\n"
+
+        while not subscriber.overflowed:
+            try:
+                event = await asyncio.wait_for(
+                    subscriber.queue.get(), HEARTBEAT_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection.
+                yield ": keep-alive\n\n"
+                continue
+
+            if event["key"] not in sent:
+                yield format_event(event)
+    finally:
+        unsubscribe(company_id, subscriber)
@@ -0,0 +1,150 @@
+import csv
+import json
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from foodies.tabular import Echo
+
+from .models import Order, OrderDetail
+
+BATCH_SIZE = 1000
+
+CSV_HEADER = [
+    "order_id",
+    "created_at",
+    "customer",
+    "customer_phone",
+    "attended_by",
+    "order_item_count",
+    "order_total",
+    "product_id",
+    "product",
+    "quantity",
+    "unit_price",
+    "amount",
+]
+
+
+def iter_orders(
+    company_id: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[dict]:
+    """
+    Yield every matching order as a dict with its lines under ``"lines"``.
+
+    Orders are read in ``id`` ranges of ``batch_size`` and the lines of each
+    range come from one extra query, so memory use is bounded by the batch
+    size and no queryset result cache is ever kept around.
+    """
+    orders = Order.objects.order_by("id").values(
+        "id",
+        "created_at",
+        "customer__name",
+        "customer__phone_number",
+        "attended_by__username",
+        "item_count",
+        "total",
+    )
+
+    if company_id is not None:
+        orders = orders.for_company(company_id)
+    if start is not None:
+        orders = orders.filter(
+            created_at__gte=timezone.make_aware(datetime.combine(start, time.min))
+        )
+    if end is not None:
+        orders = orders.filter(
+            created_at__lt=timezone.make_aware(
+                datetime.combine(end + timedelta(days=1), time.min)
+            )
+        )
+
+    last_id = 0
+
+    while batch := list(orders.filter(id__gt=last_id)[:batch_size]):
+        lines = defaultdict(list)
+        details = (
+            OrderDetail.objects.filter(order_id__in=[order["id"] for order in batch])
+            .order_by("id")
+            .values("order_id", "product_id", "product__name", "quantity", "unit_price")
+        )
+
+        for detail in details:
+            lines[detail.pop("order_id")].append(detail)
+
+        for order in batch:
+            order["lines"] = lines.pop(order["id"], [])
+            yield order
+
+        last_id = batch[-1]["id"]
+
+
+def to_csv(orders: Iterable[dict]) -> Iterator[str]:
+    """Flatten orders into one CSV row per order line."""
+    writer = csv.writer(Echo())
+
+    yield writer.writerow(CSV_HEADER)
+
+    for order in orders:
+        head = [
+            order["id"],
+            order["created_at"].isoformat(),
+            order["customer__name"],
+            order["customer__phone_number"],
+            order["attended_by__username"],
+            order["item_count"],
+            order["total"],
+        ]
+
+        if not order["lines"]:
+            yield writer.writerow(head + [""] * 5)
+
+        for line in order["lines"]:
+            yield writer.writerow(
+                head
+                + [
+                    line["product_id"],
+                    line["product__name"],
+                    line["quantity"],
+                    line["unit_price"],
+                    line["unit_price"] * line["quantity"],
+                ]
+            )
+
+
+def to_ndjson(orders: Iterable[dict]) -> Iterator[str]:
+    """Serialize every order, with its lines, as one JSON document per line."""
+    for order in orders:
+        yield json.dumps(
+            {
+                "id": order["id"],
+                "created_at": order["created_at"],
+                "customer": order["customer__name"],
+                "customer_phone": order["customer__phone_number"],
+                "attended_by": order["attended_by__username"],
+                "item_count": order["item_count"],
+                "total": order["total"],
+                "lines": [
+                    {
+                        "product_id": line["product_id"],
+                        "product": line["product__name"],
+                        "quantity": line["quantity"],
+                        "unit_price": line["unit_price"],
+                    }
+                    for line in order["lines"]
+                ],
+            },
+            cls=DjangoJSONEncoder,
+        ) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv": (to_csv, "text/csv"),
+    "ndjson": (to_ndjson, "application/x-ndjson"),
+}
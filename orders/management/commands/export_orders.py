@@ -0,0 +1,51 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.export import BATCH_SIZE, EXPORT_FORMATS, iter_orders
+
+
+class Command(BaseCommand):
+    help = "Stream orders and their lines as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=sorted(EXPORT_FORMATS), default="csv", dest="export_format"
+        )
+        parser.add_argument("--company", type=int, help="Only export this company.")
+        parser.add_argument(
+            "--start", type=date.fromisoformat, help="First day (YYYY-MM-DD)."
+        )
+        parser.add_argument(
+            "--end", type=date.fromisoformat, help="Last day (YYYY-MM-DD)."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Orders read per query.",
+        )
+        parser.add_argument(
+            "--output", help="File to write to. Defaults to standard output."
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        serialize, _ = EXPORT_FORMATS[options["export_format"]]
+        chunks = serialize(
+            iter_orders(
+                company_id=options["company"],
+                start=options["start"],
+                end=options["end"],
+                batch_size=options["batch_size"],
+            )
+        )
+
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.queue import process_pending, release_stale_submissions
+
+
+class Command(BaseCommand):
+    help = "Create the orders queued through the submissions API."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of waiting for more.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Seconds to wait between polls of an empty queue.",
+        )
+        parser.add_argument(
+            "--max", type=int, help="Stop after processing this many submissions."
+        )
+
+    def handle(self, *args, **options):
+        if options["sleep"] < 0:
+            raise CommandError("--sleep must not be negative.")
+
+        if options["max"] is not None and options["max"] < 1:
+            raise CommandError("--max must be positive.")
+
+        processed = 0
+
+        while options["max"] is None or processed < options["max"]:
+            release_stale_submissions()
+
+            limit = None if options["max"] is None else options["max"] - processed
+            done = process_pending(limit=limit)
+            processed += done
+
+            if done == 0:
+                if options["once"]:
+                    break
+
+                time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"{processed} pedidos procesados."))
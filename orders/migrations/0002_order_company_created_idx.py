@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-18 01:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0002_alter_company_options'),
+        ('customers', '0001_initial'),
+        ('orders', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['company', 'created_at', 'id'], name='orders_company_created_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.1 on 2026-10-18 01:52
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum
+
+
+def backfill_totals(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderDetail = apps.get_model("orders", "OrderDetail")
+    Product = apps.get_model("products", "Product")
+
+    OrderDetail.objects.update(
+        unit_price=Subquery(
+            Product.objects.filter(id=OuterRef("product_id")).values("price")[:1]
+        )
+    )
+
+    lines = OrderDetail.objects.filter(order_id=OuterRef("id")).values("order_id")
+    subtotal = lines.annotate(value=Sum(F("unit_price") * F("quantity"))).values("value")
+    item_count = lines.annotate(value=Sum("quantity")).values("value")
+
+    Order.objects.filter(id__in=OrderDetail.objects.values("order_id")).update(
+        subtotal=Subquery(subtotal),
+        item_count=Subquery(item_count),
+        total=Subquery(subtotal),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_company_created_idx'),
+        ('products', '0005_alter_product_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Cantidad de productos'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Subtotal'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Total'),
+        ),
+        migrations.AddField(
+            model_name='orderdetail',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, verbose_name='Precio unitario'),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
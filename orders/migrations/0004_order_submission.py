@@ -0,0 +1,39 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0002_alter_company_options'),
+        ('orders', '0003_order_totals'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=64, verbose_name='Llave de idempotencia')),
+                ('payload', models.JSONField(verbose_name='Pedido recibido')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('processing', 'Procesando'), ('done', 'Creado'), ('failed', 'Fallido')], default='pending', max_length=20, verbose_name='Estado')),
+                ('error', models.JSONField(blank=True, null=True, verbose_name='Error')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha hora recepción')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha hora inicio proceso')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='companies.company', verbose_name='Empresa')),
+                ('order', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='orders.order', verbose_name='Pedido')),
+                ('submitted_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Enviado por')),
+            ],
+            options={
+                'verbose_name': 'Envío de pedido',
+                'verbose_name_plural': 'Envíos de pedidos',
+                'indexes': [models.Index(fields=['status', 'id'], name='orders_submission_queue_idx')],
+                'constraints': [models.UniqueConstraint(fields=('submitted_by', 'idempotency_key'), name='orders_submission_key_unique')],
+            },
+        ),
+    ]
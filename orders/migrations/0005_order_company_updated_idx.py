@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-18 03:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0002_alter_company_options'),
+        ('customers', '0003_customer_phone_key'),
+        ('orders', '0004_order_submission'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['company', 'updated_at'], name='orders_company_updated_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
+from decimal import Decimal
 from django.contrib.auth.models import User
 from django.db import models
 
+from companies.managers import TenantManager
 from companies.models import Company
 from customers.models import Customer
 from products.models import Product
@@ -16,10 +18,37 @@ class Order(models.Model):
     updated_at: models.DateTimeField = models.DateTimeField(
         auto_now=True, verbose_name="Fecha hora actualización"
     )
+    subtotal: models.DecimalField = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        verbose_name="Subtotal",
+    )
+    item_count: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0, verbose_name="Cantidad de productos"
+    )
+    total: models.DecimalField = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        verbose_name="Total",
+    )
+
+    objects = TenantManager()
 
     class Meta:
         verbose_name = "Pedido"
         verbose_name_plural = "Pedidos"
+        indexes = [
+            models.Index(
+                fields=["company", "created_at", "id"],
+                name="orders_company_created_idx",
+            ),
+            models.Index(
+                fields=["company", "updated_at"],
+                name="orders_company_updated_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Orden #{self.id}"
@@ -31,6 +60,12 @@ class OrderDetail(models.Model):
     quantity: models.PositiveIntegerField = models.PositiveIntegerField(
         verbose_name="Cantidad"
     )
+    unit_price: models.DecimalField = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        verbose_name="Precio unitario",
+    )
 
     class Meta:
         verbose_name = "Detalle del pedido"
@@ -38,3 +73,67 @@ class OrderDetail(models.Model):
 
     def __str__(self) -> str:
         return f"Detalle del pedido #{self.id}"
+
+    @property
+    def amount(self) -> Decimal:
+        return self.unit_price * self.quantity
+
+
+class OrderSubmission(models.Model):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pendiente"),
+        (PROCESSING, "Procesando"),
+        (DONE, "Creado"),
+        (FAILED, "Fallido"),
+    ]
+
+    idempotency_key: models.CharField = models.CharField(
+        max_length=64, verbose_name="Llave de idempotencia"
+    )
+    submitted_by: models.ForeignKey = models.ForeignKey(
+        User, on_delete=models.CASCADE, verbose_name="Enviado por"
+    )
+    company: models.ForeignKey = models.ForeignKey(
+        Company, on_delete=models.CASCADE, verbose_name="Empresa"
+    )
+    payload: models.JSONField = models.JSONField(verbose_name="Pedido recibido")
+    status: models.CharField = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=PENDING, verbose_name="Estado"
+    )
+    order: models.OneToOneField = models.OneToOneField(
+        Order, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Pedido"
+    )
+    error: models.JSONField = models.JSONField(
+        null=True, blank=True, verbose_name="Error"
+    )
+    attempts: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0, verbose_name="Intentos"
+    )
+    created_at: models.DateTimeField = models.DateTimeField(
+        auto_now_add=True, verbose_name="Fecha hora recepción"
+    )
+    locked_at: models.DateTimeField = models.DateTimeField(
+        null=True, blank=True, verbose_name="Fecha hora inicio proceso"
+    )
+
+    objects = TenantManager()
+
+    class Meta:
+        verbose_name = "Envío de pedido"
+        verbose_name_plural = "Envíos de pedidos"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["submitted_by", "idempotency_key"],
+                name="orders_submission_key_unique",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["status", "id"], name="orders_submission_queue_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Envío {self.idempotency_key}"
@@ -0,0 +1,67 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+from django.db.models.query import QuerySet
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, pk: int) -> str:
+    value = f"{created_at.isoformat()}|{pk}"
+
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int] | None:
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def get_page_size(value: str | None) -> int:
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return PAGE_SIZE
+
+
+def keyset_queryset(
+    queryset: QuerySet, cursor: str | None, page_size: int = PAGE_SIZE
+) -> QuerySet:
+    """The query ``paginate_by_keyset`` runs, one row longer than the page."""
+    queryset = queryset.order_by("-created_at", "-id")
+    position = decode_cursor(cursor) if cursor else None
+
+    if position is not None:
+        created_at, pk = position
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+
+    return queryset[: page_size + 1]
+
+
+def paginate_by_keyset(
+    queryset: QuerySet, cursor: str | None, page_size: int = PAGE_SIZE
+) -> tuple[list, str | None]:
+    """
+    Return the page of ``queryset`` that follows ``cursor``, newest first,
+    together with the cursor of the next page (``None`` on the last page).
+
+    Pages are selected with a ``(created_at, id)`` range condition instead of
+    an OFFSET, so every page costs the same no matter how deep it is.
+    """
+    page = list(keyset_queryset(queryset, cursor, page_size))
+    next_cursor = None
+
+    if len(page) > page_size:
+        page = page[:page_size]
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].id)
+
+    return page, next_cursor
@@ -0,0 +1,169 @@
+from datetime import timedelta
+
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from products.stock import InsufficientStockError
+
+from .models import OrderSubmission
+from .services import create_order
+
+MAX_ATTEMPTS = 3
+STALE_AFTER = timedelta(minutes=5)
+CLAIM_BATCH_SIZE = 10
+
+
+def enqueue_submission(user, company, key: str, payload: dict):
+    """
+    Store ``payload`` under ``user``'s idempotency ``key`` unless it is
+    already stored, and return ``(submission, created)``.
+
+    The unique constraint on the key makes a replayed request, even a
+    concurrent one, return the first submission instead of a new one.
+    """
+    return OrderSubmission.objects.get_or_create(
+        submitted_by=user,
+        idempotency_key=key,
+        defaults={"company": company, "payload": payload},
+    )
+
+
+def release_stale_submissions(stale_after: timedelta = STALE_AFTER) -> int:
+    """Put back submissions whose worker died while processing them."""
+    return OrderSubmission.objects.filter(
+        status=OrderSubmission.PROCESSING,
+        locked_at__lt=timezone.now() - stale_after,
+    ).update(status=OrderSubmission.PENDING, locked_at=None)
+
+
+def claim_next_submission():
+    """
+    Mark the oldest pending submission as processing and return it, or
+    ``None`` when the queue is empty.
+
+    The claim is a conditional UPDATE on the pending status, so when several
+    workers race for the same row only one of them gets it.
+    """
+    while True:
+        candidates = list(
+            OrderSubmission.objects.filter(status=OrderSubmission.PENDING)
+            .order_by("id")
+            .values_list("id", flat=True)[:CLAIM_BATCH_SIZE]
+        )
+
+        if not candidates:
+            return None
+
+        for submission_id in candidates:
+            claimed = OrderSubmission.objects.filter(
+                id=submission_id, status=OrderSubmission.PENDING
+            ).update(status=OrderSubmission.PROCESSING, locked_at=timezone.now())
+
+            if claimed:
+                return OrderSubmission.objects.select_related(
+                    "submitted_by", "company"
+                ).get(id=submission_id)
+
+
+def _claimed(submission):
+    """
+    ``submission``'s row while this worker still holds the claim it got from
+    ``claim_next_submission``. Once the claim goes stale and another worker
+    claims the row, ``locked_at`` no longer matches.
+    """
+    return OrderSubmission.objects.filter(
+        id=submission.id,
+        status=OrderSubmission.PROCESSING,
+        locked_at=submission.locked_at,
+    )
+
+
+def _finish(submission, **fields) -> bool:
+    """Store ``fields`` on ``submission`` unless another worker claimed it."""
+    if not _claimed(submission).update(**fields):
+        return False
+
+    for name, value in fields.items():
+        setattr(submission, name, value)
+
+    return True
+
+
+def _fail(submission, error: dict) -> None:
+    _finish(
+        submission,
+        status=OrderSubmission.FAILED,
+        error=error,
+        attempts=submission.attempts,
+    )
+
+
+def process_submission(submission) -> None:
+    """
+    Create the order held by a claimed ``submission`` and record the outcome.
+
+    Rejections (unknown customer or product, missing stock, invalid data)
+    are final. Unexpected errors put the submission back in the queue until
+    it has been tried ``MAX_ATTEMPTS`` times.
+
+    Nothing is done once the claim is lost, so a worker that was too slow
+    and saw its submission released as stale and claimed again never
+    creates the order a second time.
+    """
+    payload = submission.payload
+    submission.attempts += 1
+
+    try:
+        # The order and the done status commit together, so a crash in
+        # between can never leave an order that would be created again.
+        with atomic():
+            # Re-checking the claim with an UPDATE locks the row until the
+            # commit, so it cannot be released and claimed again meanwhile.
+            if not _claimed(submission).update(attempts=submission.attempts):
+                return
+
+            submission.order = create_order(
+                submission.submitted_by,
+                submission.company,
+                payload["customer"],
+                payload["items"],
+            )
+            submission.status = OrderSubmission.DONE
+            submission.error = None
+            submission.save(update_fields=["order", "status", "error", "attempts"])
+    except InsufficientStockError as e:
+        _fail(submission, {"message": e.message, "failed": e.product_ids})
+    except ObjectDoesNotExist as e:
+        _fail(submission, {"message": str(e)})
+    except ValidationError as e:
+        _fail(submission, {"message": e.messages[0]})
+    except Exception as e:
+        submission.order = None
+
+        if submission.attempts >= MAX_ATTEMPTS:
+            _fail(submission, {"message": str(e)})
+        else:
+            _finish(
+                submission,
+                status=OrderSubmission.PENDING,
+                locked_at=None,
+                error={"message": str(e)},
+                attempts=submission.attempts,
+            )
+
+
+def process_pending(limit: int | None = None) -> int:
+    """Process queued submissions until the queue is empty or ``limit`` is hit."""
+    processed = 0
+
+    while limit is None or processed < limit:
+        submission = claim_next_submission()
+
+        if submission is None:
+            break
+
+        process_submission(submission)
+        processed += 1
+
+    return processed
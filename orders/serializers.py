@@ -0,0 +1,70 @@
+from rest_framework.serializers import (
+    CharField,
+    DecimalField,
+    IntegerField,
+    ListField,
+    ModelSerializer,
+    Serializer,
+)
+
+from customers.models import Customer
+
+from .models import Order, OrderDetail, OrderSubmission
+
+
+class OrdersSerializer(ModelSerializer):
+    customer = CharField(source="customer.name")
+
+    class Meta:
+        model = Order
+        fields = ["id", "customer", "created_at", "item_count", "total"]
+
+
+class OrderCustomerSerializer(ModelSerializer):
+    class Meta:
+        model = Customer
+        fields = ["id", "name", "address", "phone_number"]
+
+
+class OrderLineSerializer(ModelSerializer):
+    name = CharField(source="product.name")
+    amount = DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        model = OrderDetail
+        fields = ["product", "name", "quantity", "unit_price", "amount"]
+
+
+class OrderDetailSerializer(ModelSerializer):
+    customer = OrderCustomerSerializer()
+    items = OrderLineSerializer(source="lines", many=True)
+
+    class Meta:
+        model = Order
+        fields = [
+            "id",
+            "customer",
+            "created_at",
+            "item_count",
+            "subtotal",
+            "total",
+            "items",
+        ]
+
+
+class OrderItemSerializer(Serializer):
+    product = IntegerField()
+    quantity = IntegerField(min_value=1)
+
+
+class OrderPayloadSerializer(Serializer):
+    customer = IntegerField()
+    items = ListField(child=OrderItemSerializer(), allow_empty=False)
+
+
+class OrderSubmissionSerializer(ModelSerializer):
+    key = CharField(source="idempotency_key")
+
+    class Meta:
+        model = OrderSubmission
+        fields = ["key", "status", "order", "error", "created_at"]
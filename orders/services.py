@@ -0,0 +1,60 @@
+from django.db.transaction import atomic
+
+from customers.models import Customer
+from products.models import Product
+from products.stock import reserve_stock
+from reports.rollups import record_order
+
+from .models import Order, OrderDetail
+
+
+def create_order(user, company, customer_id, items) -> Order:
+    """
+    Create an order with its lines for ``company``, reserving the stock and
+    updating the sales rollups in the same transaction.
+
+    ``items`` holds ``{"product": id, "quantity": n}`` dicts. Raises
+    ``Customer.DoesNotExist``/``Product.DoesNotExist`` for ids outside the
+    company and ``InsufficientStockError`` when the stock does not cover it.
+    """
+    with atomic():
+        customer = Customer.objects.for_company(company).get(id=customer_id)
+
+        lines = [(int(item["product"]), int(item["quantity"])) for item in items]
+        quantities = {}
+
+        for product_id, quantity in lines:
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+
+        products = Product.objects.for_company(company).in_bulk(quantities.keys())
+
+        if len(products) != len(quantities):
+            raise Product.DoesNotExist("Product matching query does not exist.")
+
+        subtotal = sum(
+            products[product_id].price * quantity for product_id, quantity in lines
+        )
+        order = Order.objects.create(
+            attended_by=user,
+            customer=customer,
+            company=company,
+            subtotal=subtotal,
+            item_count=sum(quantities.values()),
+            total=subtotal,
+        )
+
+        reserve_stock(quantities)
+
+        details = OrderDetail.objects.bulk_create(
+            OrderDetail(
+                order=order,
+                product=products[product_id],
+                quantity=quantity,
+                unit_price=products[product_id].price,
+            )
+            for product_id, quantity in lines
+        )
+
+        record_order(order, details)
+
+    return order
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save
+from django.db.transaction import on_commit
+from django.dispatch import receiver
+
+from .events import notify_order_change
+from .models import Order
+
+
+@receiver(post_save, sender=Order)
+def publish_order_change(sender, instance, **kwargs):
+    # Open streams only see the order once it is committed.
+    on_commit(lambda: notify_order_change(instance.company_id))
@@ -1,8 +0,0 @@
-from django import template
-
-register = template.Library()
-
-
-@register.filter(name="multiply")
-def multiply(value, arg):
-    return float(value * arg)
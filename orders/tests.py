@@ -1,13 +1,20 @@
-import io, os
+import asyncio, csv, io, json, os
 
+from django.db import connection
 from django.db.transaction import atomic
 from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from django.utils.http import urlencode
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from faker import Faker
 from pathlib import Path
 from PIL import Image
+from datetime import timedelta
 from random import randint
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -17,9 +24,25 @@ from companies.models import Company
 from customers.models import Customer
 from document_types.models import DocumentType
 from employees.models import Employee
+from foodies.queries import query_budget
 from products.models import Product
 
-from .models import Order, OrderDetail
+from .events import (
+    BACKLOG_LIMIT,
+    _feeds,
+    load_order_backlog,
+    notify_order_change,
+    stream_order_events,
+)
+from .export import iter_orders
+from .models import Order, OrderDetail, OrderSubmission
+from .pagination import encode_cursor
+from .queue import (
+    claim_next_submission,
+    process_pending,
+    process_submission,
+    release_stale_submissions,
+)
 
 
 class OrderModelTest(TestCase):
@@ -364,6 +387,85 @@ class OrderListViewTest(TestCase):
         response = self.client.get(reverse("orders"))
         self.assertIn("orders", response.context)
 
+    def test_orders_paginated_by_cursor(self):
+        """Probar que la lista se pagina por cursor, de la más reciente a la más antigua"""
+        orders = [
+            Order.objects.create(
+                attended_by=self.user1, customer=self.customer1, company=self.company1
+            )
+            for _ in range(4)
+        ]
+        self.client.login(username="user1", password="password")
+
+        response = self.client.get(reverse("orders"), {"limit": 3})
+        self.assertEqual(
+            list(response.context["orders"]), [orders[3], orders[2], orders[1]]
+        )
+        self.assertIsNotNone(response.context["next_cursor"])
+        self.assertContains(
+            response,
+            f'href="?{urlencode({"cursor": response.context["next_cursor"]})}'
+            '&amp;limit=3"',
+        )
+
+        response = self.client.get(
+            reverse("orders"), {"limit": 3, "cursor": response.context["next_cursor"]}
+        )
+        self.assertEqual(list(response.context["orders"]), [orders[0], self.order1])
+        self.assertIsNone(response.context["next_cursor"])
+
+    def test_orders_customer_loaded_in_same_query(self):
+        """Probar que mostrar el cliente de cada pedido no genera consultas adicionales"""
+        for _ in range(5):
+            Order.objects.create(
+                attended_by=self.user1, customer=self.customer1, company=self.company1
+            )
+        self.client.login(username="user1", password="password")
+        self.client.get(reverse("orders"))
+
+        with CaptureQueriesContext(connection) as few_orders:
+            self.client.get(reverse("orders"), {"limit": 1})
+        with CaptureQueriesContext(connection) as many_orders:
+            self.client.get(reverse("orders"))
+
+        self.assertEqual(len(few_orders), len(many_orders))
+
+    def test_orders_api_returns_next_cursor(self):
+        """Probar que el API de pedidos devuelve la página y el cursor siguiente"""
+        order = Order.objects.create(
+            attended_by=self.user1, customer=self.customer1, company=self.company1
+        )
+        client_api = APIClient()
+        client_api.force_authenticate(user=self.user1)
+
+        response = client_api.get(reverse("api_orders"), {"limit": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in response.data["results"]], [order.id])
+        self.assertEqual(response.data["results"][0]["customer"], self.customer1.name)
+
+        response = client_api.get(
+            reverse("api_orders"), {"limit": 1, "cursor": response.data["next"]}
+        )
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [self.order1.id]
+        )
+        self.assertIsNone(response.data["next"])
+
+    def test_views_stay_within_query_budget(self):
+        """Las listas de pedidos no hacen consultas adicionales por pedido"""
+        for _ in range(10):
+            Order.objects.create(
+                attended_by=self.user1, customer=self.customer1, company=self.company1
+            )
+
+        self.client.login(username="user1", password="password")
+
+        for name, budget in (("orders", 6), ("api_orders", 4), ("kitchen", 8)):
+            with self.subTest(name), query_budget(budget):
+                response = self.client.get(reverse(name))
+
+            self.assertEqual(response.status_code, 200)
+
 
 class OrderDetailViewTest(TestCase):
 
@@ -487,29 +589,120 @@ class OrderDetailViewTest(TestCase):
 
         # Verificar que solo los detalles del pedido con el ID especificado están presentes
         self.assertQuerySetEqual(
-            list(response.context["order_detail"]),
+            response.context["order"].lines,
             [self.order_detail1, self.order_detail2],  # Detalles del pedido esperado
             transform=lambda x: x,
         )
 
     def test_context_object_name(self):
-        """Probar que la clave de contexto 'order_detail' está presente en la vista"""
+        """Probar que la clave de contexto 'order' está presente con sus líneas"""
         self.client.login(username="testuser", password="password")
         response = self.client.get(
             reverse("detail_order", kwargs={"id": self.order.id})
         )
-        self.assertIn("order_detail", response.context)
+        self.assertIn("order", response.context)
+        self.assertNotIn("order_detail", response.context)
+        self.assertEqual(len(response.context["order"].lines), 2)
 
-    def test_no_order_details_for_invalid_order_id(self):
-        """Probar que no se muestran detalles si se proporciona un ID de pedido no válido"""
+    def test_invalid_order_id_returns_404(self):
+        """Probar que un ID de pedido no válido devuelve 404"""
         self.client.login(username="testuser", password="password")
         invalid_order_id = 999  # Un ID de pedido que no existe
         response = self.client.get(
             reverse("detail_order", kwargs={"id": invalid_order_id})
         )
 
-        # Verificar que no hay detalles de pedido para un ID no válido
-        self.assertQuerySetEqual(response.context["order_detail"], [])
+        self.assertEqual(response.status_code, 404)
+
+    def test_order_of_other_company_returns_404(self):
+        """Probar que no se puede ver el pedido de otra compañía"""
+        other_company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=self.company.document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        other_user = User.objects.create_user(username="otheruser", password="password")
+        Employee.objects.create(user=other_user, company=other_company)
+        self.client.login(username="otheruser", password="password")
+
+        response = self.client.get(reverse("detail_order", kwargs={"id": self.order.id}))
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(
+            reverse("api_order_detail", kwargs={"id": self.order.id})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_order_detail_query_count(self):
+        """Probar que el pedido, su cliente y sus líneas se cargan en dos consultas"""
+        for _ in range(5):
+            OrderDetail.objects.create(
+                order=self.order, product=self.product1, quantity=1
+            )
+
+        self.client.login(username="testuser", password="password")
+
+        # Sesión, usuario, empleado con su compañía, los permisos del menú y
+        # solo dos consultas para el pedido y sus líneas, sin importar cuántas sean
+        with self.assertNumQueries(7):
+            response = self.client.get(
+                reverse("detail_order", kwargs={"id": self.order.id})
+            )
+
+        self.assertEqual(len(response.context["order"].lines), 7)
+
+        with self.assertNumQueries(5):
+            self.client.get(reverse("api_order_detail", kwargs={"id": self.order.id}))
+
+    def test_empty_order(self):
+        """Probar que un pedido sin líneas muestra su encabezado"""
+        order = Order.objects.create(
+            attended_by=self.user, customer=self.customer, company=self.company
+        )
+        self.client.login(username="testuser", password="password")
+
+        response = self.client.get(reverse("detail_order", kwargs={"id": order.id}))
+
+        self.assertContains(response, f"Orden #{order.id}")
+        self.assertContains(response, self.customer.name)
+        self.assertContains(response, "Este pedido no tiene productos")
+
+    def test_order_detail_api(self):
+        """Probar que el endpoint JSON devuelve el pedido con cliente y líneas"""
+        self.client.login(username="testuser", password="password")
+
+        response = self.client.get(
+            reverse("api_order_detail", kwargs={"id": self.order.id})
+        )
+        data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data["id"], self.order.id)
+        self.assertEqual(data["customer"]["name"], self.customer.name)
+        self.assertEqual(
+            [(item["product"], item["quantity"]) for item in data["items"]],
+            [(self.product1.id, 2), (self.product2.id, 3)],
+        )
+
+    def test_views_stay_within_query_budget(self):
+        """El detalle no hace consultas adicionales por cada línea"""
+        for _ in range(10):
+            OrderDetail.objects.create(
+                order=self.order, product=self.product2, quantity=1
+            )
+
+        self.client.login(username="testuser", password="password")
+
+        for name, budget in (("detail_order", 7), ("api_order_detail", 5)):
+            with self.subTest(name), query_budget(budget):
+                response = self.client.get(reverse(name, kwargs={"id": self.order.id}))
+
+            self.assertEqual(response.status_code, 200)
 
 
 class OrderCreateViewTest(TestCase):
@@ -652,6 +845,30 @@ class OrderCreateAPIViewTest(TestCase):
         self.assertEqual(self.product1.stock, 8)
         self.assertEqual(self.product2.stock, 2)
 
+    def test_create_order_stores_prices_and_totals(self):
+        """Probar que el pedido guarda el precio de venta de cada línea y sus totales"""
+        self.client_api.force_authenticate(user=self.user)
+        data = {
+            "customer": self.customer.id,
+            "items": [
+                {"product": self.product1.id, "quantity": 2},
+                {"product": self.product2.id, "quantity": 3}
+            ]
+        }
+        self.client_api.post(reverse("create_order_api"), data, format="json")
+        expected_total = self.product1.price * 2 + self.product2.price * 3
+
+        # Cambiar el precio no debe modificar el pedido histórico
+        Product.objects.filter(id=self.product1.id).update(price=1)
+
+        order = Order.objects.get()
+        detail = OrderDetail.objects.get(product=self.product1)
+        self.assertEqual(order.subtotal, expected_total)
+        self.assertEqual(order.total, expected_total)
+        self.assertEqual(order.item_count, 5)
+        self.assertEqual(detail.unit_price, self.product1.price)
+        self.assertEqual(detail.amount, self.product1.price * 2)
+
     def test_create_order_insufficient_stock(self):
         """Probar que no se puede crear un pedido si el producto no tiene suficiente stock"""
         self.client_api.force_authenticate(user=self.user)
@@ -666,6 +883,7 @@ class OrderCreateAPIViewTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["status"], "error")
         self.assertEqual(response.data["message"], "Product out of stock")
+        self.assertEqual(response.data["failed"], [self.product1.id])
 
         # Asegurarse de que no se haya creado ninguna orden
         self.assertEqual(Order.objects.count(), 0)
@@ -708,3 +926,664 @@ class OrderCreateAPIViewTest(TestCase):
         # Verificar que no se haya creado ninguna orden ni detalle
         self.assertEqual(Order.objects.count(), 0)
         self.assertEqual(OrderDetail.objects.count(), 0)
+
+    def test_create_order_query_count_does_not_depend_on_lines(self):
+        """Probar que crear un pedido ejecuta la misma cantidad de consultas sin importar cuántas líneas tenga"""
+        self.client_api.force_authenticate(user=self.user)
+        products = Product.objects.bulk_create(
+            Product(
+                name=f"Bulk product {i}",
+                description=self.faker.paragraph(),
+                price=self.faker.random_int(min=100, max=10000),
+                stock=10,
+                category=self.category,
+                company=self.company,
+            )
+            for i in range(100)
+        )
+
+        query_counts = []
+
+        for size in (1, 10, 100):
+            data = {
+                "customer": self.customer.id,
+                "items": [
+                    {"product": product.id, "quantity": 1} for product in products[:size]
+                ],
+            }
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client_api.post(
+                    reverse("create_order_api"), data, format="json"
+                )
+
+            self.assertEqual(response.data["status"], "success")
+            query_counts.append(len(queries))
+
+        self.assertEqual(len(set(query_counts)), 1)
+        self.assertEqual(OrderDetail.objects.count(), 111)
+        self.assertEqual(Product.objects.get(id=products[0].id).stock, 7)
+        self.assertEqual(Product.objects.get(id=products[99].id).stock, 9)
+
+    def test_create_order_product_from_other_company(self):
+        """Probar que no se puede pedir un producto de otra compañía"""
+        self.client_api.force_authenticate(user=self.user)
+        other_company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=self.company.document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        other_product = Product.objects.create(
+            name="Other product",
+            description=self.faker.paragraph(),
+            price=1000,
+            stock=10,
+            category=Category.objects.create(name="Other", company=other_company),
+            company=other_company,
+        )
+        data = {
+            "customer": self.customer.id,
+            "items": [{"product": other_product.id, "quantity": 1}],
+        }
+        response = self.client_api.post(reverse("create_order_api"), data, format="json")
+
+        self.assertEqual(response.data["status"], "error")
+        self.assertEqual(Order.objects.count(), 0)
+        other_product.refresh_from_db()
+        self.assertEqual(other_product.stock, 10)
+
+
+class OrderExportTest(TestCase):
+
+    def setUp(self):
+        self.faker = Faker("es_CO")
+        self.faker.seed_instance(randint(0, 9999))
+        document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.other_company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.employee = Employee.objects.create(user=self.user, company=self.company)
+        self.customer = Customer.objects.create(
+            name=self.faker.name(),
+            phone_number=self.faker.phone_number(),
+            address=self.faker.address(),
+            neighborhood="Test neighborhood",
+        )
+        self.customer.companies.add(self.company, self.other_company)
+        category = Category.objects.create(name="Test Category", company=self.company)
+        self.product = Product.objects.create(
+            name="Test product",
+            description=self.faker.paragraph(),
+            price=1500,
+            stock=100,
+            category=category,
+            company=self.company,
+        )
+
+        self.orders = []
+
+        for quantity in range(1, 6):
+            order = Order.objects.create(
+                attended_by=self.user,
+                customer=self.customer,
+                company=self.company,
+                item_count=quantity,
+                total=1500 * quantity,
+            )
+            OrderDetail.objects.create(
+                order=order, product=self.product, quantity=quantity, unit_price=1500
+            )
+            self.orders.append(order)
+
+        self.other_order = Order.objects.create(
+            attended_by=self.user, customer=self.customer, company=self.other_company
+        )
+
+    def test_export_requires_login(self):
+        """Probar que la exportación requiere autenticación"""
+        response = self.client.get(reverse("export_orders"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_export_csv_streams_company_order_lines(self):
+        """Probar que el CSV contiene una fila por línea de los pedidos de la compañía"""
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(reverse("export_orders"), {"format": "csv"})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual([int(row["order_id"]) for row in rows], [o.id for o in self.orders])
+        self.assertEqual(rows[1]["quantity"], "2")
+        self.assertEqual(rows[1]["amount"], "3000.00")
+
+    def test_export_ndjson_nests_lines(self):
+        """Probar que el NDJSON incluye las líneas dentro de cada pedido"""
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(reverse("export_orders"), {"format": "ndjson"})
+
+        orders = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual(len(orders), 5)
+        self.assertEqual(orders[0]["lines"][0]["product_id"], self.product.id)
+        self.assertEqual(orders[0]["lines"][0]["unit_price"], "1500.00")
+
+    def test_export_invalid_format(self):
+        """Probar que un formato desconocido devuelve 400"""
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(reverse("export_orders"), {"format": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_iter_orders_reads_in_bounded_batches(self):
+        """Probar que los pedidos se leen por lotes de tamaño fijo"""
+        # Tres lotes de pedidos, cada uno con su consulta de líneas, y el lote vacío final
+        with self.assertNumQueries(7):
+            orders = list(iter_orders(company_id=self.company.id, batch_size=2))
+
+        self.assertEqual([order["id"] for order in orders], [o.id for o in self.orders])
+
+    def test_iter_orders_filters_by_date(self):
+        """Probar que el rango de fechas excluye pedidos fuera de él"""
+        yesterday = self.orders[0].created_at.date() - timedelta(days=1)
+        Order.objects.filter(id=self.orders[0].id).update(
+            created_at=self.orders[0].created_at - timedelta(days=1)
+        )
+
+        orders = list(iter_orders(company_id=self.company.id, end=yesterday))
+
+        self.assertEqual([order["id"] for order in orders], [self.orders[0].id])
+
+    def test_export_orders_command(self):
+        """Probar que el comando exporta todas las compañías si no se filtra"""
+        out = io.StringIO()
+        call_command("export_orders", "--format", "ndjson", stdout=out)
+
+        self.assertEqual(len(out.getvalue().splitlines()), 6)
+
+
+class OrderSubmissionTest(TestCase):
+
+    def setUp(self):
+        self.faker = Faker("es_CO")
+        self.faker.seed_instance(randint(0, 9999))
+        document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.user = User.objects.create_user(username="testuser", password="password")
+        Employee.objects.create(user=self.user, company=self.company)
+        self.other_user = User.objects.create_user(
+            username="otheruser", password="password"
+        )
+        Employee.objects.create(user=self.other_user, company=self.company)
+
+        self.customer = Customer.objects.create(
+            name=self.faker.name(),
+            phone_number=self.faker.phone_number(),
+            address=self.faker.address(),
+            neighborhood="Test neighborhood",
+        )
+        self.customer.companies.add(self.company)
+        category = Category.objects.create(name="Test Category", company=self.company)
+        self.product = Product.objects.create(
+            name="Test product",
+            description=self.faker.paragraph(),
+            price=1000,
+            stock=5,
+            category=category,
+            company=self.company,
+        )
+
+        self.client_api = APIClient()
+        self.client_api.force_authenticate(user=self.user)
+        self.payload = {
+            "customer": self.customer.id,
+            "items": [{"product": self.product.id, "quantity": 2}],
+        }
+
+    def submit(self, payload=None, key="llave-1"):
+        return self.client_api.post(
+            reverse("order_submissions_api"),
+            payload or self.payload,
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_submission_is_queued_without_creating_the_order(self):
+        """Probar que el envío responde 202 y deja el pedido en cola"""
+        response = self.submit()
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], OrderSubmission.PENDING)
+        self.assertEqual(
+            response.data["status_url"],
+            reverse("order_submission_api", args=["llave-1"]),
+        )
+        self.assertEqual(Order.objects.count(), 0)
+        self.assertEqual(OrderSubmission.objects.count(), 1)
+
+    def test_worker_creates_the_order(self):
+        """Probar que el worker crea el pedido y marca el envío como creado"""
+        self.submit()
+
+        self.assertEqual(process_pending(), 1)
+
+        submission = OrderSubmission.objects.get()
+        self.assertEqual(submission.status, OrderSubmission.DONE)
+        self.assertEqual(submission.attempts, 1)
+        self.assertEqual(submission.order.orderdetail_set.count(), 1)
+        self.assertEqual(submission.order.attended_by, self.user)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 3)
+
+    def test_replay_returns_the_original_result(self):
+        """Probar que repetir la llave no crea un segundo pedido"""
+        self.submit()
+        self.assertEqual(self.submit().status_code, status.HTTP_202_ACCEPTED)
+        process_pending()
+
+        response = self.submit()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], OrderSubmission.DONE)
+        self.assertEqual(response.data["order"], Order.objects.get().id)
+        self.assertEqual(OrderSubmission.objects.count(), 1)
+        self.assertEqual(process_pending(), 0)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_for_another_order_is_rejected(self):
+        """Probar que usar la misma llave con otro pedido devuelve 409"""
+        self.submit()
+        payload = {
+            "customer": self.customer.id,
+            "items": [{"product": self.product.id, "quantity": 1}],
+        }
+
+        response = self.submit(payload)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(OrderSubmission.objects.count(), 1)
+
+    def test_keys_are_scoped_to_the_user(self):
+        """Probar que la misma llave de otro usuario es un envío distinto"""
+        self.submit()
+        self.client_api.force_authenticate(user=self.other_user)
+
+        self.assertEqual(self.submit().status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(OrderSubmission.objects.count(), 2)
+
+        response = self.client_api.get(
+            reverse("order_submission_api", args=["llave-1"])
+        )
+        self.assertEqual(
+            response.data["key"],
+            OrderSubmission.objects.get(submitted_by=self.other_user).idempotency_key,
+        )
+
+    def test_missing_key_or_invalid_payload_is_rejected(self):
+        """Probar que faltar la llave o enviar datos inválidos devuelve 400"""
+        response = self.client_api.post(
+            reverse("order_submissions_api"), self.payload, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.submit({"customer": self.customer.id, "items": []})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.submit(
+            {
+                "customer": self.customer.id,
+                "items": [{"product": self.product.id, "quantity": 0}],
+            }
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(OrderSubmission.objects.count(), 0)
+
+    def test_key_with_unsafe_characters_is_rejected(self):
+        """Probar que una llave que no cabe en la URL de estado devuelve 400"""
+        for key in ("a/b", "a b", "x" * 65):
+            response = self.submit(self.payload, key=key)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(OrderSubmission.objects.count(), 0)
+
+    def test_insufficient_stock_fails_the_submission(self):
+        """Probar que un envío sin stock suficiente queda fallido con el detalle"""
+        payload = {
+            "customer": self.customer.id,
+            "items": [{"product": self.product.id, "quantity": 10}],
+        }
+        self.submit(payload)
+        process_pending()
+
+        response = self.client_api.get(
+            reverse("order_submission_api", args=["llave-1"])
+        )
+
+        self.assertEqual(response.data["status"], OrderSubmission.FAILED)
+        self.assertEqual(response.data["error"]["failed"], [self.product.id])
+        self.assertIsNone(response.data["order"])
+        self.assertEqual(Order.objects.count(), 0)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 5)
+
+    def test_unknown_product_fails_the_submission(self):
+        """Probar que un producto inexistente deja el envío fallido"""
+        payload = {
+            "customer": self.customer.id,
+            "items": [{"product": self.product.id + 100, "quantity": 1}],
+        }
+        self.submit(payload)
+        process_pending()
+
+        self.assertEqual(OrderSubmission.objects.get().status, OrderSubmission.FAILED)
+        self.assertEqual(Order.objects.count(), 0)
+
+    def test_status_of_unknown_key_is_404(self):
+        """Probar que consultar una llave inexistente devuelve 404"""
+        response = self.client_api.get(
+            reverse("order_submission_api", args=["no-existe"])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stale_submissions_are_released(self):
+        """Probar que un envío abandonado por un worker vuelve a la cola"""
+        self.submit()
+        OrderSubmission.objects.update(
+            status=OrderSubmission.PROCESSING,
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+
+        self.assertEqual(release_stale_submissions(), 1)
+        self.assertEqual(process_pending(), 1)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_worker_that_lost_its_claim_does_not_create_the_order(self):
+        """Probar que un worker lento no crea el pedido que otro ya reclamó"""
+        self.submit()
+        slow = claim_next_submission()
+        OrderSubmission.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        release_stale_submissions()
+        fast = claim_next_submission()
+
+        process_submission(slow)
+        self.assertEqual(Order.objects.count(), 0)
+
+        process_submission(fast)
+        process_submission(slow)
+
+        submission = OrderSubmission.objects.get()
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(submission.status, OrderSubmission.DONE)
+        self.assertEqual(submission.order_id, Order.objects.get().id)
+        self.assertEqual(submission.attempts, 1)
+
+    def test_process_order_submissions_command(self):
+        """Probar que el comando procesa la cola y termina con --once"""
+        self.submit()
+        self.submit(key="llave-2")
+        out = io.StringIO()
+
+        call_command("process_order_submissions", "--once", stdout=out)
+
+        self.assertIn("2 pedidos procesados", out.getvalue())
+        self.assertEqual(Order.objects.count(), 2)
+
+
+class OrderEventsTest(TestCase):
+
+    def setUp(self):
+        self.faker = Faker("es_CO")
+        self.faker.seed_instance(randint(0, 9999))
+        document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.other_company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.user = User.objects.create_user(username="testuser", password="password")
+        Employee.objects.create(user=self.user, company=self.company)
+        self.customer = Customer.objects.create(
+            name=self.faker.name(),
+            phone_number=self.faker.phone_number(),
+            address=self.faker.address(),
+            neighborhood="Test neighborhood",
+        )
+        self.customer.companies.add(self.company, self.other_company)
+        category = Category.objects.create(name="Test Category", company=self.company)
+        self.product = Product.objects.create(
+            name="Arepa",
+            description=self.faker.paragraph(),
+            price=1000,
+            stock=50,
+            category=category,
+            company=self.company,
+        )
+        self.first_order = self.create_order()
+
+    def create_order(self, company=None):
+        order = Order.objects.create(
+            attended_by=self.user,
+            customer=self.customer,
+            company=company or self.company,
+            subtotal=2000,
+            item_count=2,
+            total=2000,
+        )
+        OrderDetail.objects.create(
+            order=order, product=self.product, quantity=2, unit_price=1000
+        )
+
+        return order
+
+    async def open_stream(self, headers=None):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("order_events"), headers=headers)
+
+        return response, aiter(response.streaming_content)
+
+    async def next_event(self, stream):
+        # Salta el retry y los keep-alive hasta el siguiente evento
+        while True:
+            chunk = await asyncio.wait_for(anext(stream), 5)
+            chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+
+            if chunk.startswith("id: "):
+                return chunk
+
+    async def close_stream(self, stream):
+        await stream.aclose()
+        await asyncio.sleep(0)
+
+    def test_events_require_login(self):
+        """Probar que el stream redirige si el usuario no está autenticado"""
+        response = self.client.get(reverse("order_events"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_kitchen_view(self):
+        """Probar que la vista de cocina muestra los pedidos y el punto de reanudación"""
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(reverse("kitchen"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["orders"]), [self.first_order])
+        self.assertTrue(response.context["last_event_id"])
+        self.assertContains(response, "2 × Arepa")
+
+    async def test_stream_pushes_new_orders(self):
+        """Probar que un pedido nuevo se envía a la pantalla abierta"""
+        response, stream = await self.open_stream()
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(await anext(stream), b"retry: 5000\n\n")
+
+        order = await sync_to_async(self.create_order)()
+        await sync_to_async(self.create_order)(self.other_company)
+        notify_order_change(self.company.id)
+        event = await self.next_event(stream)
+
+        data = json.loads(event.split("data: ", 1)[1])
+        self.assertIn("event: order", event)
+        self.assertEqual(data["id"], order.id)
+        self.assertEqual(data["items"], [{"product": "Arepa", "quantity": 2}])
+
+        await self.close_stream(stream)
+
+    async def test_closed_stream_releases_the_feed(self):
+        """Probar que al cerrar la última pantalla se detiene la lectura compartida"""
+        stream = stream_order_events(self.company.id)
+        await anext(stream)
+        feed = _feeds[self.company.id]
+
+        await stream.aclose()
+        await asyncio.wait_for(feed.task, 5)
+
+        self.assertNotIn(self.company.id, _feeds)
+
+    async def test_stream_resumes_from_last_event_id(self):
+        """Probar que el stream reenvía los cambios desde Last-Event-ID"""
+        await Order.objects.filter(id=self.first_order.id).aupdate(
+            updated_at=self.first_order.updated_at - timedelta(hours=1)
+        )
+        order = await sync_to_async(self.create_order)()
+        _, stream = await self.open_stream(
+            {"Last-Event-ID": encode_cursor(order.updated_at, order.id)}
+        )
+
+        event = await self.next_event(stream)
+
+        self.assertEqual(json.loads(event.split("data: ", 1)[1])["id"], order.id)
+        await self.close_stream(stream)
+
+    async def test_stream_resumes_more_than_a_page_behind(self):
+        """Probar que al reanudar se reenvían todos los cambios, no solo una página"""
+        orders = await Order.objects.abulk_create(
+            Order(
+                attended_by=self.user,
+                customer=self.customer,
+                company=self.company,
+                subtotal=2000,
+                item_count=2,
+                total=2000,
+            )
+            for _ in range(BACKLOG_LIMIT + 5)
+        )
+        _, stream = await self.open_stream(
+            {
+                "Last-Event-ID": encode_cursor(
+                    self.first_order.updated_at, self.first_order.id
+                )
+            }
+        )
+        received = set()
+
+        for _ in range(len(orders) + 1):
+            event = await self.next_event(stream)
+            received.add(json.loads(event.split("data: ", 1)[1])["id"])
+
+        self.assertEqual(
+            received, {self.first_order.id} | {order.id for order in orders}
+        )
+        await self.close_stream(stream)
+
+    async def test_screens_share_one_feed(self):
+        """Probar que varias pantallas de la compañía comparten una sola lectura"""
+        _, first = await self.open_stream()
+        _, second = await self.open_stream()
+        await anext(first)
+        await anext(second)
+
+        self.assertEqual(len(_feeds[self.company.id].subscribers), 2)
+
+        order = await sync_to_async(self.create_order)()
+        notify_order_change(self.company.id)
+
+        for stream in (first, second):
+            event = await self.next_event(stream)
+            self.assertEqual(json.loads(event.split("data: ", 1)[1])["id"], order.id)
+
+        await self.close_stream(first)
+        await self.close_stream(second)
+
+    def test_backlog_is_read_page_by_page(self):
+        """Probar que el backlog se lee completo por páginas aunque coincidan las fechas"""
+        orders = [self.first_order] + [self.create_order() for _ in range(4)]
+        Order.objects.filter(company=self.company).update(
+            updated_at=self.first_order.updated_at
+        )
+
+        events = load_order_backlog(self.company.id, None, page_size=2)
+
+        self.assertEqual(
+            [event["data"]["id"] for event in events], [order.id for order in orders]
+        )
+
+    async def test_feed_drains_bursts_larger_than_a_page(self):
+        """Probar que una ráfaga mayor que una página no detiene el stream"""
+        _, stream = await self.open_stream()
+        await anext(stream)
+        _feeds[self.company.id].page_size = 2
+
+        orders = [await sync_to_async(self.create_order)() for _ in range(5)]
+        notify_order_change(self.company.id)
+        received = []
+
+        for _ in orders:
+            event = await self.next_event(stream)
+            received.append(json.loads(event.split("data: ", 1)[1])["id"])
+
+        self.assertEqual(received, [order.id for order in orders])
+        await self.close_stream(stream)
@@ -1,10 +1,37 @@
 from django.urls import path
 
-from .views import OrderListView, OrderCreateView, OrderCreateAPIView, OrderDetailView
+from .views import (
+    OrderListView,
+    OrderListAPIView,
+    OrderCreateView,
+    OrderCreateAPIView,
+    OrderDetailAPIView,
+    OrderDetailView,
+    OrderEventsView,
+    OrderExportView,
+    KitchenView,
+    OrderSubmissionAPIView,
+    OrderSubmissionStatusAPIView,
+)
 
 urlpatterns = [
     path("", OrderListView.as_view(), name="orders"),
+    path("api/", OrderListAPIView.as_view(), name="api_orders"),
+    path("kitchen/", KitchenView.as_view(), name="kitchen"),
+    path("events/", OrderEventsView.as_view(), name="order_events"),
+    path("export/", OrderExportView.as_view(), name="export_orders"),
     path("add-order/", OrderCreateView.as_view(), name="create_order"),
     path("api/add-order/", OrderCreateAPIView.as_view(), name="create_order_api"),
+    path(
+        "api/submissions/",
+        OrderSubmissionAPIView.as_view(),
+        name="order_submissions_api",
+    ),
+    path(
+        "api/submissions/<str:key>/",
+        OrderSubmissionStatusAPIView.as_view(),
+        name="order_submission_api",
+    ),
     path("order-details/<int:id>/", OrderDetailView.as_view(), name="detail_order"),
+    path("api/<int:id>/", OrderDetailAPIView.as_view(), name="api_order_detail"),
 ]
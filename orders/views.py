@@ -1,23 +1,42 @@
+import re
+from datetime import date
 from typing import Any
+from asgiref.sync import sync_to_async
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.views import redirect_to_login
 from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
 from django.db.models.base import Model as Model
-from django.db.transaction import atomic
-from django.db.models import F
 from django.db.models.query import QuerySet
-from django.shortcuts import render, redirect
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render, redirect
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.views import View
 from django.views.generic.base import TemplateView
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
 from django.views.generic.list import ListView
+from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from customers.models import Customer
-from products.models import Product
+from employees.tenancy import get_company
+from products.stock import InsufficientStockError
 
-from .models import Order, OrderDetail
+from .events import latest_change, stream_order_events
+from .export import EXPORT_FORMATS, iter_orders
+from .models import Order, OrderDetail, OrderSubmission
+from .pagination import encode_cursor, get_page_size, paginate_by_keyset
+from .queue import enqueue_submission
+from .serializers import (
+    OrderDetailSerializer,
+    OrderPayloadSerializer,
+    OrdersSerializer,
+    OrderSubmissionSerializer,
+)
+from .services import create_order
 
 
 class OrderListView(LoginRequiredMixin, ListView):
@@ -26,16 +45,170 @@ class OrderListView(LoginRequiredMixin, ListView):
     context_object_name = "orders"
 
     def get_queryset(self) -> QuerySet[Any]:
-        return Order.objects.filter(company=self.request.user.employee.company)
+        queryset = Order.objects.for_company(get_company(self.request)).select_related(
+            "customer"
+        )
+        orders, self.next_cursor = paginate_by_keyset(
+            queryset,
+            self.request.GET.get("cursor"),
+            get_page_size(self.request.GET.get("limit")),
+        )
 
+        return orders
 
-class OrderDetailView(LoginRequiredMixin, ListView):
-    model = OrderDetail
-    template_name = "detail_order.html"
-    context_object_name = "order_detail"
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context["next_cursor"] = self.next_cursor
+
+        if self.next_cursor:
+            # The following pages keep the page size the user picked.
+            query = {"cursor": self.next_cursor}
+
+            if "limit" in self.request.GET:
+                query["limit"] = get_page_size(self.request.GET["limit"])
+
+            context["next_page_query"] = urlencode(query)
+
+        return context
+
+
+class KitchenView(LoginRequiredMixin, ListView):
+    template_name = "kitchen.html"
+    context_object_name = "orders"
+    paginate_by = None
+    limit = 30
 
     def get_queryset(self) -> QuerySet[Any]:
-        return OrderDetail.objects.filter(order_id=self.kwargs["id"])
+        self.company = get_company(self.request)
+
+        return (
+            Order.objects.for_company(self.company)
+            .select_related("customer")
+            .prefetch_related("orderdetail_set__product")
+            .order_by("-created_at", "-id")[: self.limit]
+        )
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        changed_at = latest_change(self.company.id) if self.company else None
+        # The stream picks up right after the orders rendered here.
+        context["last_event_id"] = (
+            encode_cursor(changed_at, 0) if changed_at is not None else ""
+        )
+
+        return context
+
+
+class OrderEventsView(View):
+    """
+    Stream the changes to the company's orders as Server-Sent Events.
+
+    Meant to be served by ``foodies.asgi``, where every open screen is a
+    coroutine waiting on the shared feed of ``orders.events`` instead of a
+    worker thread or a database query of its own.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+
+        company = await sync_to_async(get_company)(request)
+
+        if company is None:
+            return HttpResponseBadRequest("No company for this user")
+
+        last_event_id = request.headers.get("Last-Event-ID") or request.GET.get(
+            "last_event_id"
+        )
+        response = StreamingHttpResponse(
+            stream_order_events(company.id, last_event_id),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+
+        return response
+
+
+class OrderListAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        queryset = Order.objects.for_company(get_company(request)).select_related(
+            "customer"
+        )
+        orders, next_cursor = paginate_by_keyset(
+            queryset,
+            request.query_params.get("cursor"),
+            get_page_size(request.query_params.get("limit")),
+        )
+        serializer = OrdersSerializer(orders, many=True)
+
+        return Response({"results": serializer.data, "next": next_cursor})
+
+
+def get_order_with_lines(company, pk: int) -> Order:
+    """
+    Return ``company``'s order ``pk`` with its customer and its lines with
+    their products, in two queries. Raises ``Http404`` for other companies.
+    """
+    lines = OrderDetail.objects.select_related("product").order_by("id")
+    queryset = (
+        Order.objects.for_company(company)
+        .select_related("customer")
+        .prefetch_related(Prefetch("orderdetail_set", queryset=lines, to_attr="lines"))
+    )
+
+    return get_object_or_404(queryset, id=pk)
+
+
+class OrderDetailView(LoginRequiredMixin, DetailView):
+    model = Order
+    template_name = "detail_order.html"
+    context_object_name = "order"
+
+    def get_object(self, queryset=None) -> Order:
+        return get_order_with_lines(get_company(self.request), self.kwargs["id"])
+
+
+class OrderDetailAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, id, format=None):
+        order = get_order_with_lines(get_company(request), id)
+
+        return Response(OrderDetailSerializer(order).data)
+
+
+class OrderExportView(LoginRequiredMixin, View):
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get("format", "csv")
+
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest("Formato de exportación no soportado")
+
+        try:
+            start = request.GET.get("start")
+            end = request.GET.get("end")
+            start = date.fromisoformat(start) if start else None
+            end = date.fromisoformat(end) if end else None
+        except ValueError:
+            return HttpResponseBadRequest("Fecha inválida")
+
+        serialize, content_type = EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(
+            serialize(
+                iter_orders(company_id=get_company(request).id, start=start, end=end)
+            ),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="pedidos.{export_format}"'
+        )
+
+        return response
 
 
 class OrderCreateView(LoginRequiredMixin, TemplateView):
@@ -50,35 +223,91 @@ class OrderCreateAPIView(APIView):
         customer_id = request.data["customer"]
 
         try:
-            with atomic():
-                customer = Customer.objects.get(id=customer_id)
+            create_order(request.user, get_company(request), customer_id, items)
 
-                order = Order.objects.create(
-                    attended_by=request.user,
-                    customer=customer,
-                    company=request.user.employee.company,
-                )
+            return Response(
+                {"status": "success", "message": "Order created successfully"}
+            )
+        except InsufficientStockError as e:
+            return Response(
+                {"status": "error", "message": e.message, "failed": e.product_ids}
+            )
+        except ValidationError as e:
+            return Response({"status": "error", "message": e.message})
+        except Exception as e:
+            return Response({"status": "error", "message": str(e)})
 
-                for item in items:
-                    product_id = item["product"]
-                    quantity = int(item["quantity"])
 
-                    product = Product.objects.get(id=product_id)
+class OrderSubmissionAPIView(APIView):
+    """
+    Queue an order for the ``process_order_submissions`` worker.
 
-                    if product.stock < quantity:
-                        raise ValidationError("Product out of stock")
+    The client sends an ``Idempotency-Key`` header it generated for the
+    order, so retrying or double submitting returns the first submission
+    instead of creating the order again.
+    """
 
-                    product.stock = F("stock") - quantity
-                    product.save()
+    permission_classes = [IsAuthenticated]
+    max_key_length = OrderSubmission._meta.get_field("idempotency_key").max_length
+    # Keys end up in the status URL, so they may only hold URL-safe characters.
+    key_pattern = re.compile(rf"[A-Za-z0-9_-]{{1,{max_key_length}}}")
 
-                    OrderDetail.objects.create(
-                        order=order, product=product, quantity=quantity
-                    )
+    def _response(self, submission, response_status):
+        data = OrderSubmissionSerializer(submission).data
+        data["status_url"] = reverse(
+            "order_submission_api", args=[submission.idempotency_key]
+        )
 
-                return Response(
-                    {"status": "success", "message": "Order created successfully"}
-                )
-        except ValidationError as e:
-            return Response({"status": "error", "message": e.message})
-        except Exception as e:
-            return Response({"status": "error", "message": str(e)})
+        return Response(data, status=response_status)
+
+    def post(self, request, *args, **kwargs):
+        key = request.headers.get("Idempotency-Key", "").strip()
+
+        if not self.key_pattern.fullmatch(key):
+            return Response(
+                {"status": "error", "message": "A valid Idempotency-Key is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = OrderPayloadSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(
+                {"status": "error", "message": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        submission, created = enqueue_submission(
+            request.user, get_company(request), key, serializer.validated_data
+        )
+
+        if not created and submission.payload != serializer.validated_data:
+            return Response(
+                {
+                    "status": "error",
+                    "message": "Idempotency-Key already used for another order",
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        if submission.status in (OrderSubmission.DONE, OrderSubmission.FAILED):
+            return self._response(submission, status.HTTP_200_OK)
+
+        return self._response(submission, status.HTTP_202_ACCEPTED)
+
+
+class OrderSubmissionStatusAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, key, format=None):
+        submission = OrderSubmission.objects.filter(
+            submitted_by=request.user, idempotency_key=key
+        ).first()
+
+        if submission is None:
+            return Response(
+                {"status": "error", "message": "Submission not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return Response(OrderSubmissionSerializer(submission).data)
@@ -1,12 +1,19 @@
 from django.contrib import admin
 
 from .models import Product
+from .search import filter_by_search
 
 
 class ProductAdmin(admin.ModelAdmin):
     model = Product
     list_display = ("name", "company", "category")
-    search_fields = ("name", "company", "category")
+    search_fields = ("name",)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+
+        return filter_by_search(queryset, search_term), False
 
 
 admin.site.register(Product, ProductAdmin)
@@ -0,0 +1,88 @@
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+
+from .models import Product
+from .serializers import ProductsSerializer
+
+CATALOG_TIMEOUT = 60 * 60
+
+
+def _version_key(company_id: int) -> str:
+    return f"products:catalog-version:{company_id}"
+
+
+def _new_version() -> int:
+    return time.time_ns() // 1000
+
+
+def get_catalog_version(company_id: int) -> int:
+    """
+    Return the current catalog version of a company, a microsecond timestamp
+    of its last product change (or of the first time it was asked for).
+    """
+    key = _version_key(company_id)
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+
+    return version
+
+
+async def aget_catalog_version(company_id: int) -> int:
+    key = _version_key(company_id)
+    version = await cache.aget(key)
+
+    if version is None:
+        await cache.aadd(key, _new_version(), None)
+        version = await cache.aget(key)
+
+    return version
+
+
+def bump_catalog_version(company_id: int) -> None:
+    cache.set(_version_key(company_id), _new_version(), None)
+
+
+def get_catalog_etag(company_id: int, version: int) -> str:
+    return f'"catalog-{company_id}-{version}"'
+
+
+def get_catalog_last_modified(version: int) -> datetime:
+    return datetime.fromtimestamp(version // 1_000_000, tz=timezone.utc)
+
+
+def _catalog_key(company_id: int, version: int) -> str:
+    return f"products:catalog:{company_id}:{version}"
+
+
+def _serialize_catalog(products) -> list[dict]:
+    return [dict(product) for product in ProductsSerializer(products, many=True).data]
+
+
+def get_catalog(company_id: int, version: int) -> list[dict]:
+    key = _catalog_key(company_id, version)
+    catalog = cache.get(key)
+
+    if catalog is None:
+        catalog = _serialize_catalog(Product.objects.for_company(company_id))
+        cache.set(key, catalog, CATALOG_TIMEOUT)
+
+    return catalog
+
+
+async def aget_catalog(company_id: int, version: int) -> list[dict]:
+    key = _catalog_key(company_id, version)
+    catalog = await cache.aget(key)
+
+    if catalog is None:
+        products = [
+            product async for product in Product.objects.for_company(company_id)
+        ]
+        catalog = _serialize_catalog(products)
+        await cache.aset(key, catalog, CATALOG_TIMEOUT)
+
+    return catalog
@@ -1,9 +1,27 @@
-from django.forms import ModelForm, TextInput, Textarea, NumberInput, FileInput, Select
+from django.forms import (
+    CharField,
+    ModelForm,
+    TextInput,
+    Textarea,
+    NumberInput,
+    FileInput,
+    Select,
+)
 
+from .images import generate_derivatives
 from .models import Product
 
 
 class ProductForm(ModelForm):
+    def save(self, commit=True):
+        product = super().save(commit=commit)
+
+        if commit and "picture" in self.changed_data and product.picture:
+            product.picture_variants = generate_derivatives(product.picture.name)
+            product.save(update_fields=["picture_variants"])
+
+        return product
+
     class Meta:
         model = Product
         exclude = ["company"]
@@ -43,3 +61,12 @@ class ProductForm(ModelForm):
                 }
             ),
         }
+
+
+class ProductImportForm(ProductForm):
+    """Validates one imported row; the category is given by name."""
+
+    category = CharField(max_length=200)
+
+    class Meta(ProductForm.Meta):
+        exclude = ["company", "picture", "category"]
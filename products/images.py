@@ -0,0 +1,75 @@
+import hashlib
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+WIDTHS = (320, 640, 1024)
+FORMATS = {
+    "webp": ("WEBP", "webp", "image/webp"),
+    "jpeg": ("JPEG", "jpg", "image/jpeg"),
+}
+QUALITY = 80
+DERIVATIVES_DIR = "derivatives"
+
+
+def _content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+def _encode(image: Image.Image, image_format: str) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, quality=QUALITY, optimize=True)
+
+    return buffer.getvalue()
+
+
+def generate_derivatives(name: str, storage=default_storage) -> dict:
+    """
+    Write resized WebP and JPEG copies of the stored picture ``name`` and
+    return their storage names as ``{format: {width: name}}``.
+
+    Names are derived from a hash of the source bytes, so re-running on an
+    unchanged picture reuses the existing files and a replaced picture never
+    collides with a URL cached by a browser.
+    """
+    with storage.open(name, "rb") as source:
+        content = source.read()
+
+    digest = _content_hash(content)
+
+    with Image.open(io.BytesIO(content)) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        widths = [width for width in WIDTHS if width < image.width]
+        widths.append(min(image.width, WIDTHS[-1]))
+
+        variants = {key: {} for key in FORMATS}
+
+        for width in sorted(set(widths)):
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+
+            for key, (image_format, extension, _) in FORMATS.items():
+                derivative = posixpath.join(
+                    DERIVATIVES_DIR, f"{digest}-{width}.{extension}"
+                )
+
+                if not storage.exists(derivative):
+                    storage.save(
+                        derivative, ContentFile(_encode(resized, image_format))
+                    )
+
+                variants[key][str(width)] = derivative
+
+    return variants
+
+
+def get_srcset(variants: dict, key: str, storage=default_storage) -> str:
+    return ", ".join(
+        f"{storage.url(name)} {width}w"
+        for width, name in sorted(
+            variants.get(key, {}).items(), key=lambda item: int(item[0])
+        )
+    )
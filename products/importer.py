@@ -0,0 +1,145 @@
+from itertools import islice
+
+from django.db.transaction import atomic, on_commit
+
+from categories.models import Category
+from foodies.tabular import RowValidator, read_rows
+
+from .catalog import bump_catalog_version
+from .forms import ProductImportForm
+from .models import Product
+from .search import index_products
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+HEADER_ALIASES = {
+    "nombre": "name",
+    "descripcion": "description",
+    "descripción": "description",
+    "precio": "price",
+    "categoria": "category",
+    "categoría": "category",
+}
+UPDATE_FIELDS = ["description", "price", "stock", "category"]
+
+
+def read_product_rows(file, delimiter: str = ","):
+    return read_rows(file, delimiter, HEADER_ALIASES)
+
+
+def _category_key(name: str) -> str:
+    return " ".join(name.split()).lower()
+
+
+class ProductImporter:
+    """
+    Create or update a company's products from tabular rows.
+
+    Rows are validated with the ``ProductForm`` rules and written in batches,
+    one transaction each, with a handful of queries per batch no matter how
+    many rows it holds. Products are matched by name, so importing the same
+    file twice updates instead of duplicating.
+    """
+
+    def __init__(self, company, batch_size: int = BATCH_SIZE) -> None:
+        self.company = company
+        self.batch_size = batch_size
+        self.categories = {}
+
+        for category in Category.objects.for_company(company).order_by("-id"):
+            self.categories[_category_key(category.name)] = category
+
+        self.validator = RowValidator(ProductImportForm, exclude=("category",))
+        self.created = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors = []
+
+    def _add_error(self, line: int, errors: dict) -> None:
+        self.error_count += 1
+
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": line, "errors": errors})
+
+    def _get_categories(self, names: list[str]) -> None:
+        missing = {}
+
+        for name in names:
+            key = _category_key(name)
+
+            if key not in self.categories and key not in missing:
+                missing[key] = Category(
+                    name=" ".join(name.split()), company=self.company
+                )
+
+        for category in Category.objects.bulk_create(missing.values()):
+            self.categories[_category_key(category.name)] = category
+
+    def _import_batch(self, rows: list) -> None:
+        valid = {}
+
+        for line, row in rows:
+            cleaned, errors = self.validator.clean(row)
+
+            if errors:
+                self._add_error(line, errors)
+                continue
+
+            # A later row for the same product replaces the earlier one.
+            valid[cleaned["name"]] = cleaned
+
+        if not valid:
+            return
+
+        with atomic():
+            self._get_categories([data["category"] for data in valid.values()])
+
+            existing = {
+                product.name: product
+                for product in Product.objects.for_company(self.company).filter(
+                    name__in=valid
+                )
+            }
+            created, updated = [], []
+
+            for name, data in valid.items():
+                product = existing.get(name) or Product(
+                    name=name, company=self.company
+                )
+                product.description = data["description"]
+                product.price = data["price"]
+                product.stock = data["stock"]
+                product.category = self.categories[_category_key(data["category"])]
+                (updated if product.pk else created).append(product)
+
+            # Existing rows go through INSERT ... ON CONFLICT (id) DO UPDATE:
+            # bulk_update builds a CASE per field and row, which is far slower.
+            products = Product.objects.bulk_create(
+                created + updated,
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=UPDATE_FIELDS,
+            )
+
+            # Bulk writes skip the model signals that keep the index in sync
+            # and invalidate the cached catalog, so each batch does both. A
+            # later batch failing then cannot leave committed products behind
+            # a stale catalog.
+            index_products([product.pk for product in products])
+            on_commit(lambda: bump_catalog_version(self.company.id))
+
+        self.created += len(created)
+        self.updated += len(updated)
+
+    def run(self, rows) -> dict:
+        rows = iter(rows)
+
+        while batch := list(islice(rows, self.batch_size)):
+            self._import_batch(batch)
+
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from products.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product full-text search index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, help="Only rebuild this company.")
+
+    def handle(self, *args, **options):
+        rebuild_search_index(company_id=options["company"])
+
+        self.stdout.write(self.style.SUCCESS("Índice de búsqueda reconstruido."))
@@ -0,0 +1,84 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from products.images import generate_derivatives
+from products.models import Product
+
+BATCH_SIZE = 500
+
+
+def _regenerate(item):
+    product_id, name = item
+
+    try:
+        return product_id, generate_derivatives(name), None
+    except Exception as e:
+        return product_id, None, str(e)
+
+
+class Command(BaseCommand):
+    help = "Regenerate the resized WebP/JPEG derivatives of product pictures."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, help="Only process this company.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes used to resize images.",
+        )
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Skip products that already have derivatives.",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("--workers must be positive.")
+
+        products = Product.objects.exclude(picture="").order_by("id")
+
+        if options["company"] is not None:
+            products = products.for_company(options["company"])
+
+        if options["missing"]:
+            products = products.filter(picture_variants={})
+
+        items = list(products.values_list("id", "picture"))
+
+        if options["workers"] == 1:
+            results = list(map(_regenerate, items))
+        else:
+            # Forked workers must not share the parent's database sockets.
+            connections.close_all()
+
+            with ProcessPoolExecutor(
+                max_workers=options["workers"], initializer=django.setup
+            ) as executor:
+                results = list(executor.map(_regenerate, items, chunksize=8))
+
+        updated = []
+        failed = 0
+
+        for product_id, variants, error in results:
+            if error is not None:
+                failed += 1
+                self.stderr.write(f"Producto {product_id}: {error}")
+                continue
+
+            updated.append(Product(id=product_id, picture_variants=variants))
+
+        Product.objects.bulk_update(
+            updated, ["picture_variants"], batch_size=BATCH_SIZE
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(updated)} productos procesados, {failed} con errores."
+            )
+        )
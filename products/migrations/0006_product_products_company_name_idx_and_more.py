@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0003_category_categories_company_name_idx'),
+        ('companies', '0002_alter_company_options'),
+        ('products', '0005_alter_product_price'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['company', 'name'], name='products_company_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['company', 'category'], name='products_company_category_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_products_company_name_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='picture_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Variantes de imagen'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+from django.db import migrations
+
+# The full-text index as it was created, frozen so later changes to
+# products.search do not change this migration.
+SEARCH_TABLE = "products_product_search"
+SOURCE = (
+    "FROM products_product p "
+    "INNER JOIN categories_category c ON c.id = p.category_id"
+)
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+    "name, description, category, "
+    "tokenize = 'unicode61 remove_diacritics 2')",
+]
+SQLITE_BACKFILL = (
+    f"INSERT INTO {SEARCH_TABLE} (rowid, name, description, category) "
+    f"SELECT p.id, p.name, p.description, c.name {SOURCE}"
+)
+POSTGRESQL_DDL = [
+    f"CREATE TABLE {SEARCH_TABLE} ("
+    "product_id bigint PRIMARY KEY "
+    "REFERENCES products_product (id) ON DELETE CASCADE "
+    "DEFERRABLE INITIALLY DEFERRED, "
+    "document tsvector NOT NULL)",
+    f"CREATE INDEX {SEARCH_TABLE}_document_idx "
+    f"ON {SEARCH_TABLE} USING gin (document)",
+]
+POSTGRESQL_BACKFILL = (
+    f"INSERT INTO {SEARCH_TABLE} (product_id, document) "
+    "SELECT p.id, "
+    "setweight(to_tsvector('simple', p.name), 'A') || "
+    "setweight(to_tsvector('simple', c.name), 'B') || "
+    "setweight(to_tsvector('simple', p.description), 'C') "
+    f"{SOURCE}"
+)
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "sqlite":
+        statements = SQLITE_DDL + [SQLITE_BACKFILL]
+    elif vendor == "postgresql":
+        statements = POSTGRESQL_DDL + [POSTGRESQL_BACKFILL]
+    else:
+        return
+
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ("sqlite", "postgresql"):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("categories", "0003_category_categories_company_name_idx"),
+        ("products", "0007_product_picture_variants"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -3,6 +3,7 @@ from django.core.validators import MinValueValidator
 from django.db import models
 
 from categories.models import Category
+from companies.managers import TenantManager
 from companies.models import Company
 
 
@@ -18,6 +19,9 @@ class Product(models.Model):
         validators=[MinValueValidator(Decimal("0.00"))],
     )
     picture: models.ImageField = models.ImageField(verbose_name="Imagen")
+    picture_variants: models.JSONField = models.JSONField(
+        default=dict, blank=True, editable=False, verbose_name="Variantes de imagen"
+    )
     stock: models.IntegerField = models.IntegerField(default=0, verbose_name="Stock")
     category: models.ForeignKey = models.ForeignKey(
         Category, on_delete=models.PROTECT, verbose_name="Categoría"
@@ -26,9 +30,17 @@ class Product(models.Model):
         Company, on_delete=models.CASCADE, verbose_name="Empresa"
     )
 
+    objects = TenantManager()
+
     class Meta:
         verbose_name = "Producto"
         verbose_name_plural = "Productos"
+        indexes = [
+            models.Index(fields=["company", "name"], name="products_company_name_idx"),
+            models.Index(
+                fields=["company", "category"], name="products_company_category_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -0,0 +1,217 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.query import QuerySet
+from django.db.transaction import atomic
+
+from .models import Product
+
+SEARCH_TABLE = "products_product_search"
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_TERMS = 8
+
+_SOURCE = (
+    "FROM products_product p "
+    "INNER JOIN categories_category c ON c.id = p.category_id "
+    "WHERE {where}"
+)
+
+_SQLITE_INDEX = (
+    f"INSERT INTO {SEARCH_TABLE} (rowid, name, description, category) "
+    f"SELECT p.id, p.name, p.description, c.name {_SOURCE}"
+)
+# Name matches weigh most, then the category, then the description.
+_POSTGRESQL_INDEX = (
+    f"INSERT INTO {SEARCH_TABLE} (product_id, document) "
+    "SELECT p.id, "
+    "setweight(to_tsvector('simple', p.name), 'A') || "
+    "setweight(to_tsvector('simple', c.name), 'B') || "
+    "setweight(to_tsvector('simple', p.description), 'C') "
+    f"{_SOURCE}"
+)
+
+
+def _vendor(using=None) -> str:
+    return (using or connection).vendor
+
+
+def _key_column(vendor: str) -> str:
+    return "rowid" if vendor == "sqlite" else "product_id"
+
+
+def _reindex(where: str, params: list, using=None) -> None:
+    using = using or connection
+    vendor = _vendor(using)
+
+    if vendor not in ("sqlite", "postgresql"):
+        return
+
+    index_sql = _SQLITE_INDEX if vendor == "sqlite" else _POSTGRESQL_INDEX
+
+    with atomic(using=using.alias), using.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE {_key_column(vendor)} IN "
+            f"(SELECT p.id FROM products_product p WHERE {where})",
+            params,
+        )
+        cursor.execute(index_sql.format(where=where), params)
+
+
+def index_products(product_ids: list[int]) -> None:
+    if product_ids:
+        placeholders = ", ".join(["%s"] * len(product_ids))
+        _reindex(f"p.id IN ({placeholders})", list(product_ids))
+
+
+def index_category(category_id: int) -> None:
+    _reindex("p.category_id = %s", [category_id])
+
+
+def remove_products(product_ids: list[int]) -> None:
+    vendor = _vendor()
+
+    if not product_ids or vendor not in ("sqlite", "postgresql"):
+        return
+
+    placeholders = ", ".join(["%s"] * len(product_ids))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} "
+            f"WHERE {_key_column(vendor)} IN ({placeholders})",
+            list(product_ids),
+        )
+
+
+def rebuild_search_index(company_id: int | None = None, using=None) -> None:
+    if company_id is None:
+        _reindex("1 = 1", [], using=using)
+    else:
+        _reindex("p.company_id = %s", [company_id], using=using)
+
+
+def parse_query(query: str) -> list[str]:
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+def _match_expression(terms: list[str], vendor: str) -> str:
+    # Every term must match, and the last one may still be half typed.
+    if vendor == "sqlite":
+        return " ".join(f'"{term}"*' for term in terms)
+
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def search_products(
+    query: str, company_id: int, limit: int = PAGE_SIZE, offset: int = 0
+) -> list[int]:
+    """
+    Return the ids of ``company_id``'s products matching ``query``, best
+    match first.
+
+    The match runs against the full-text index, so only the matching rows
+    are ranked and the cost does not grow with the size of the catalog.
+    """
+    terms = parse_query(query)
+    vendor = _vendor()
+
+    if not terms:
+        return []
+
+    if vendor == "sqlite":
+        sql = (
+            f"SELECT {SEARCH_TABLE}.rowid FROM {SEARCH_TABLE} "
+            f"INNER JOIN products_product p ON p.id = {SEARCH_TABLE}.rowid "
+            f"WHERE {SEARCH_TABLE} MATCH %s AND p.company_id = %s "
+            f"ORDER BY bm25({SEARCH_TABLE}, 10.0, 1.0, 4.0), p.id "
+            "LIMIT %s OFFSET %s"
+        )
+    elif vendor == "postgresql":
+        sql = (
+            f"SELECT s.product_id FROM {SEARCH_TABLE} s "
+            "INNER JOIN products_product p ON p.id = s.product_id "
+            "CROSS JOIN to_tsquery('simple', %s) query "
+            "WHERE s.document @@ query AND p.company_id = %s "
+            "ORDER BY ts_rank(s.document, query) DESC, p.id "
+            "LIMIT %s OFFSET %s"
+        )
+    else:
+        return list(
+            filter_by_search(Product.objects.for_company(company_id), query)
+            .order_by("name", "id")
+            .values_list("id", flat=True)[offset : offset + limit]
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql, [_match_expression(terms, vendor), company_id, limit, offset]
+        )
+
+        return [row[0] for row in cursor.fetchall()]
+
+
+def get_page_size(value: str | None) -> int:
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return PAGE_SIZE
+
+
+def get_page_number(value: str | None) -> int:
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return 1
+
+
+def search_page(
+    query: str, company_id: int, page: int = 1, page_size: int = PAGE_SIZE
+) -> tuple[list, int | None]:
+    """
+    Return the ranked products on ``page`` of the results for ``query``
+    together with the number of the next page (``None`` on the last page).
+    """
+    ids = search_products(
+        query, company_id, limit=page_size + 1, offset=(page - 1) * page_size
+    )
+    next_page = page + 1 if len(ids) > page_size else None
+    ids = ids[:page_size]
+    products = Product.objects.select_related("category").in_bulk(ids)
+
+    return [products[pk] for pk in ids if pk in products], next_page
+
+
+def filter_by_search(queryset: QuerySet, query: str) -> QuerySet:
+    terms = parse_query(query)
+    vendor = _vendor()
+
+    if not terms:
+        return queryset.none()
+
+    if vendor == "sqlite":
+        matches = RawSQL(
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s",
+            [_match_expression(terms, vendor)],
+        )
+    elif vendor == "postgresql":
+        matches = RawSQL(
+            f"SELECT product_id FROM {SEARCH_TABLE} "
+            "WHERE document @@ to_tsquery('simple', %s)",
+            [_match_expression(terms, vendor)],
+        )
+    else:
+        condition = Q()
+
+        for term in terms:
+            condition &= (
+                Q(name__icontains=term)
+                | Q(description__icontains=term)
+                | Q(category__name__icontains=term)
+            )
+
+        return queryset.filter(condition)
+
+    return queryset.filter(id__in=matches)
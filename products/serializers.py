@@ -1,4 +1,4 @@
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import CharField, ModelSerializer
 
 from .models import Product
 
@@ -6,10 +6,24 @@ from .models import Product
 class ProductsSerializer(ModelSerializer):
     class Meta:
         model = Product
-        fields = ["id", "name"]
+        fields = ["id", "name", "price"]
 
 
 class ProductSerializer(ModelSerializer):
     class Meta:
         model = Product
         fields = ["price"]
+
+
+class ProductBatchSerializer(ModelSerializer):
+    class Meta:
+        model = Product
+        fields = ["id", "name", "price", "stock"]
+
+
+class ProductSearchSerializer(ModelSerializer):
+    category = CharField(source="category.name")
+
+    class Meta:
+        model = Product
+        fields = ["id", "name", "price", "stock", "category"]
@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save
+from django.db.transaction import on_commit
+from django.dispatch import receiver
+
+from categories.models import Category
+
+from .catalog import bump_catalog_version
+from .models import Product
+from .search import index_category, index_products, remove_products
+
+SEARCH_FIELDS = {"name", "description", "category", "category_id"}
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_catalog(sender, instance, **kwargs):
+    # Bump after commit so no reader can cache pre-commit rows under the new version.
+    on_commit(lambda: bump_catalog_version(instance.company_id))
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or SEARCH_FIELDS.intersection(update_fields):
+        index_products([instance.id])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    remove_products([instance.id])
+
+
+@receiver(post_save, sender=Category)
+def index_category_products(sender, instance, created, **kwargs):
+    if not created:
+        index_category(instance.id)
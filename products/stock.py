@@ -0,0 +1,61 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Case, F, Q, When
+from django.db.models.query import QuerySet
+from django.db.transaction import atomic
+
+from .models import Product
+
+
+class InsufficientStockError(ValidationError):
+    def __init__(self, product_ids: list[int]) -> None:
+        super().__init__("Product out of stock")
+        self.product_ids = product_ids
+
+
+def stock_reservation(quantities: dict[int, int]) -> tuple[QuerySet, Case]:
+    """
+    The products of ``quantities`` that have enough stock and their stock
+    after the reservation, the two halves of the UPDATE ``reserve_stock``
+    runs.
+    """
+    available = Q()
+    new_stock = []
+
+    for product_id, quantity in quantities.items():
+        available |= Q(id=product_id, stock__gte=quantity)
+        new_stock.append(When(id=product_id, then=F("stock") - quantity))
+
+    return Product.objects.filter(available), Case(*new_stock, default=F("stock"))
+
+
+def reserve_stock(quantities: dict[int, int]) -> None:
+    """
+    Decrement the stock of every product in ``quantities`` or of none of them.
+
+    The availability check and the decrement run as a single conditional
+    UPDATE, so concurrent reservations can never drive stock below zero:
+    SQLite serializes writers and PostgreSQL re-evaluates the WHERE clause
+    against the latest row version after taking the row lock.
+    """
+    if not quantities:
+        return
+
+    products, new_stock = stock_reservation(quantities)
+
+    try:
+        with atomic():
+            updated = products.update(stock=new_stock)
+
+            if updated != len(quantities):
+                raise InsufficientStockError(list(quantities))
+    except InsufficientStockError as error:
+        stock = dict(
+            Product.objects.filter(id__in=quantities).values_list("id", "stock")
+        )
+        failed = [
+            product_id
+            for product_id, quantity in quantities.items()
+            if stock.get(product_id, 0) < quantity
+        ]
+
+        raise InsufficientStockError(failed or error.product_ids)
@@ -0,0 +1,37 @@
+from django import template
+from django.core.files.storage import default_storage
+
+from products.images import FORMATS, get_srcset
+
+register = template.Library()
+
+
+def _get(product, key):
+    # Product views hand templates either model instances or ``.values()`` dicts.
+    if isinstance(product, dict):
+        return product.get(key)
+
+    return getattr(product, key, None)
+
+
+@register.inclusion_tag("components/product_picture.html")
+def product_picture(product, css_class="", sizes="100vw"):
+    picture = str(_get(product, "picture") or "")
+    variants = _get(product, "picture_variants") or {}
+    jpeg = variants.get("jpeg", {})
+
+    if jpeg:
+        # Browsers without <picture> support still get a resized file.
+        picture = jpeg[max(jpeg, key=int)]
+
+    return {
+        "picture_url": default_storage.url(picture) if picture else "",
+        "sources": [
+            {"type": content_type, "srcset": get_srcset(variants, key)}
+            for key, (_, _, content_type) in FORMATS.items()
+            if variants.get(key)
+        ],
+        "sizes": sizes,
+        "css_class": css_class,
+        "alt": _get(product, "name"),
+    }
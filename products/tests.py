@@ -1,11 +1,17 @@
-import io, os
+import io, os, shutil, tempfile, threading
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, connection
 from django.db.models import ProtectedError
-from django.test import TestCase
+from django.db.transaction import atomic
+from django.template import Context, Template
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse, reverse_lazy
 from faker import Faker
-from pathlib import Path
 from PIL import Image
 from random import randint
 from rest_framework.test import APIClient
@@ -15,14 +21,29 @@ from categories.models import Category
 from companies.models import Company
 from document_types.models import DocumentType
 from employees.models import Employee
+from foodies.queries import query_budget
 
+from .catalog import get_catalog_version
 from .forms import ProductForm
+from .images import generate_derivatives
+from .importer import ProductImporter, read_product_rows
+from .search import filter_by_search, search_products
 from .models import Product
 from .serializers import ProductsSerializer, ProductSerializer
+from .stock import InsufficientStockError, reserve_stock
 
 User = get_user_model()
 
 
+def use_temporary_media_root(test_case) -> None:
+    """Write the uploads and image derivatives of ``test_case`` to a temp dir."""
+    media_root = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, media_root)
+    settings = override_settings(MEDIA_ROOT=media_root)
+    settings.enable()
+    test_case.addCleanup(settings.disable)
+
+
 class ProductTest(TestCase):
     def setUp(self) -> None:
         self.faker = Faker("es_CO")
@@ -91,6 +112,7 @@ class ProductTest(TestCase):
 class ProductsListViewTest(TestCase):
 
     def setUp(self):
+        use_temporary_media_root(self)
         self.faker = Faker("es_CO")
         self.faker.seed_instance(randint(0, 9999))
         document_type = DocumentType.objects.create(
@@ -162,14 +184,6 @@ class ProductsListViewTest(TestCase):
 
         self.url = reverse("products")
 
-    def tearDown(self) -> None:
-        try:
-            os.remove(
-                Path(__file__).resolve().parent.parent / "static/images/test_image.jpg"
-            )
-        except FileNotFoundError:
-            pass
-
     def generate_test_image(self):
         image = Image.new("RGB", (100, 100), color="red")
         byte_io = io.BytesIO()
@@ -212,10 +226,31 @@ class ProductsListViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("products", response.context)
 
+    def test_view_stays_within_query_budget(self):
+        """La lista no hace consultas adicionales por cada producto"""
+        Product.objects.bulk_create(
+            Product(
+                name=f"Extra {number}",
+                description="A test product description",
+                price=1000,
+                stock=10,
+                category=self.category,
+                company=self.company,
+            )
+            for number in range(10)
+        )
+        self.client.login(username="testuser", password="password")
+
+        with query_budget(6):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+
 
 class ProductDetailViewTest(TestCase):
 
     def setUp(self):
+        use_temporary_media_root(self)
         self.faker = Faker("es_CO")
         self.faker.seed_instance(randint(0, 9999))
         document_type = DocumentType.objects.create(
@@ -256,14 +291,6 @@ class ProductDetailViewTest(TestCase):
         # URL de la vista
         self.url = reverse("detail_product", kwargs={"id": self.product.id})
 
-    def tearDown(self) -> None:
-        try:
-            os.remove(
-                Path(__file__).resolve().parent.parent / "static/images/test_image.jpg"
-            )
-        except FileNotFoundError:
-            pass
-
     def generate_test_image(self):
         image = Image.new("RGB", (100, 100), color="red")
         byte_io = io.BytesIO()
@@ -313,10 +340,39 @@ class ProductDetailViewTest(TestCase):
         # Verificar que el producto no se encuentra y el código de estado es 404
         self.assertEqual(response.status_code, 404)
 
+    def test_other_company_product_returns_404(self):
+        """Un empleado de otra compañía no puede ver el producto"""
+        other_company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=self.company.document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        Employee.objects.filter(id=self.employee.id).update(company=other_company)
+        self.client.login(username="testuser", password="password")
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_view_stays_within_query_budget(self):
+        """El detalle se carga con un número fijo de consultas"""
+        self.client.login(username="testuser", password="password")
+
+        with query_budget(6):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+
 
 class CreateProductViewTest(TestCase):
 
     def setUp(self):
+        use_temporary_media_root(self)
         self.faker = Faker("es_CO")
         self.faker.seed_instance(randint(0, 9999))
         document_type = DocumentType.objects.create(
@@ -347,14 +403,6 @@ class CreateProductViewTest(TestCase):
         # URL de la vista
         self.url = reverse("add_product")
 
-    def tearDown(self) -> None:
-        try:
-            os.remove(
-                Path(__file__).resolve().parent.parent / "static/images/test_image.jpg"
-            )
-        except FileNotFoundError:
-            pass
-
     def generate_test_image(self):
         image = Image.new("RGB", (100, 100), color="red")
         byte_io = io.BytesIO()
@@ -439,6 +487,7 @@ class CreateProductViewTest(TestCase):
 class UpdateProductViewTest(TestCase):
 
     def setUp(self):
+        use_temporary_media_root(self)
         self.faker = Faker("es_CO")
         self.faker.seed_instance(randint(0, 9999))
         document_type = DocumentType.objects.create(
@@ -475,14 +524,6 @@ class UpdateProductViewTest(TestCase):
         # URL de la vista para actualizar
         self.url = reverse("update_product", kwargs={"id": self.product.id})
 
-    def tearDown(self) -> None:
-        try:
-            os.remove(
-                Path(__file__).resolve().parent.parent / "static/images/test_image.jpg"
-            )
-        except FileNotFoundError:
-            pass
-
     def generate_test_image(self):
         image = Image.new("RGB", (100, 100), color="red")
         byte_io = io.BytesIO()
@@ -576,6 +617,7 @@ class UpdateProductViewTest(TestCase):
 class DeleteProductViewTest(TestCase):
 
     def setUp(self):
+        use_temporary_media_root(self)
         self.faker = Faker("es_CO")
         self.faker.seed_instance(randint(0, 9999))
         document_type = DocumentType.objects.create(
@@ -615,14 +657,6 @@ class DeleteProductViewTest(TestCase):
         self.url = reverse("delete_product", kwargs={"id": self.product.id})
         self.success_url = reverse("products")
 
-    def tearDown(self) -> None:
-        try:
-            os.remove(
-                Path(__file__).resolve().parent.parent / "static/images/test_image.jpg"
-            )
-        except FileNotFoundError:
-            pass
-
     def generate_test_image(self):
         image = Image.new("RGB", (100, 100), color="red")
         byte_io = io.BytesIO()
@@ -677,6 +711,8 @@ class DeleteProductViewTest(TestCase):
 class ProductsAPITest(TestCase):
 
     def setUp(self):
+        use_temporary_media_root(self)
+        cache.clear()
         self.faker = Faker("es_CO")
         self.faker.seed_instance(randint(0, 9999))
         self.document_type = DocumentType.objects.create(
@@ -727,14 +763,6 @@ class ProductsAPITest(TestCase):
             description=self.faker.paragraph(),
         )
 
-    def tearDown(self) -> None:
-        try:
-            os.remove(
-                Path(__file__).resolve().parent.parent / "static/images/test_image.jpg"
-            )
-        except FileNotFoundError:
-            pass
-
     def generate_test_image(self):
         image = Image.new("RGB", (100, 100), color="red")
         byte_io = io.BytesIO()
@@ -806,10 +834,94 @@ class ProductsAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, [])
 
+    def test_get_products_served_from_cache(self):
+        """Verificar que el catálogo se sirve desde la caché mientras no cambie"""
+        self.client.login(username="testuser", password="password")
+        self.client.get(self.url)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data), 2)
+
+    def test_get_products_not_modified(self):
+        """Verificar que una petición condicional sin cambios responde 304"""
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(self.url)
+
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_product_changes_invalidate_catalog(self):
+        """Verificar que crear, editar o eliminar productos invalida el catálogo"""
+        self.client.login(username="testuser", password="password")
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product1.name = "Renamed product"
+            self.product1.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Renamed product", [product["name"] for product in response.data])
+        etag = response["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product2.delete()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    def test_async_endpoint_matches_sync(self):
+        """Verificar que la versión asíncrona devuelve el mismo catálogo y ETag"""
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(self.url)
+        async_response = self.client.get(reverse("api_products_async"))
+
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_response.json(), response.json())
+        self.assertEqual(async_response["ETag"], response["ETag"])
+
+        async_response = self.client.get(
+            reverse("api_products_async"), HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(async_response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_async_endpoint_requires_authentication(self):
+        """Verificar que la versión asíncrona también exige autenticación"""
+        response = self.client.get(reverse("api_products_async"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_get_products_stays_within_query_budget(self):
+        """El catálogo sin caché se arma con un número fijo de consultas"""
+        Product.objects.bulk_create(
+            Product(
+                name=f"Extra {number}",
+                description="A test product description",
+                price=1000,
+                stock=10,
+                category=self.category,
+                company=self.company,
+            )
+            for number in range(10)
+        )
+        cache.clear()
+        self.client.login(username="testuser", password="password")
+
+        with query_budget(4):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data), 12)
+
 
 class ProductAPITest(TestCase):
 
     def setUp(self):
+        use_temporary_media_root(self)
         self.faker = Faker("es_CO")
         self.faker.seed_instance(randint(0, 9999))
         self.document_type = DocumentType.objects.create(
@@ -851,14 +963,6 @@ class ProductAPITest(TestCase):
         # URL del endpoint
         self.url = reverse("api_get_product", kwargs={"id": self.product.id})
 
-    def tearDown(self) -> None:
-        try:
-            os.remove(
-                Path(__file__).resolve().parent.parent / "static/images/test_image.jpg"
-            )
-        except FileNotFoundError:
-            pass
-
     def generate_test_image(self):
         image = Image.new("RGB", (100, 100), color="red")
         byte_io = io.BytesIO()
@@ -901,3 +1005,698 @@ class ProductAPITest(TestCase):
 
         # Verificar que se devuelve 404 Not Found
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_product_from_other_company_not_found(self):
+        """Verificar que no se puede consultar un producto de otra compañía"""
+        other_company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=self.document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        other_user = User.objects.create_user(username="otheruser", password="password")
+        Employee.objects.create(user=other_user, company=other_company)
+        self.client.login(username="otheruser", password="password")
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(
+            reverse("api_get_product_async", kwargs={"id": self.product.id})
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_async_get_product(self):
+        """Verificar que la versión asíncrona devuelve el mismo producto"""
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(
+            reverse("api_get_product_async", kwargs={"id": self.product.id})
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), self.client.get(self.url).json())
+
+    def test_get_product_stays_within_query_budget(self):
+        """El producto se consulta con un número fijo de consultas"""
+        self.client.login(username="testuser", password="password")
+
+        with query_budget(4):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ProductBatchAPITest(TestCase):
+
+    def setUp(self):
+        self.faker = Faker("es_CO")
+        self.faker.seed_instance(randint(0, 9999))
+        self.document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=self.document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.other_company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=self.document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.category = Category.objects.create(
+            name="Test Category",
+            company=self.company,
+        )
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.employee = Employee.objects.create(user=self.user, company=self.company)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("api_products_batch")
+
+        self.products = Product.objects.bulk_create(
+            Product(
+                name=f"Product {i}",
+                category=self.category,
+                company=self.company if i < 20 else self.other_company,
+                price=1000 + i,
+                stock=i,
+                description=self.faker.paragraph(),
+            )
+            for i in range(25)
+        )
+
+    def test_authentication_required(self):
+        """Verificar que se requiere autenticación para acceder al endpoint"""
+        response = APIClient().get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_get_batch_returns_requested_products_in_one_query(self):
+        """Verificar que los productos solicitados se obtienen en una sola consulta"""
+        ids = [product.id for product in self.products[:20]]
+        client = APIClient()
+        client.login(username="testuser", password="password")
+
+        # Sesión, usuario, empleado y productos
+        with self.assertNumQueries(4):
+            response = client.get(self.url, {"ids": ",".join(map(str, ids))})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(product["id"] for product in response.data), ids)
+        self.assertEqual(
+            set(response.data[0].keys()), {"id", "name", "price", "stock"}
+        )
+
+    def test_get_batch_excludes_other_company_products(self):
+        """Verificar que no se devuelven productos de otra compañía"""
+        ids = [self.products[0].id, self.products[24].id]
+
+        response = self.client.get(self.url, {"ids": ",".join(map(str, ids))})
+
+        self.assertEqual([product["id"] for product in response.data], ids[:1])
+
+    def test_get_batch_invalid_ids(self):
+        """Verificar que los ids inválidos devuelven 400"""
+        response = self.client.get(self.url, {"ids": "1,abc"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProductImageTest(TestCase):
+    def setUp(self) -> None:
+        self.faker = Faker("es_CO")
+        self.faker.seed_instance(randint(0, 9999))
+        document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.category = Category.objects.create(
+            name="Test Category", company=self.company
+        )
+        use_temporary_media_root(self)
+
+    def generate_test_image(self, width=1200, height=800, color="red"):
+        image = Image.new("RGB", (width, height), color=color)
+        byte_io = io.BytesIO()
+        image.save(byte_io, format="JPEG")
+
+        return SimpleUploadedFile(
+            "test_image.jpg", byte_io.getvalue(), content_type="image/jpeg"
+        )
+
+    def create_product(self, **kwargs):
+        return Product.objects.create(
+            name=self.faker.word(),
+            category=self.category,
+            company=self.company,
+            price=self.faker.random_int(min=100, max=10000),
+            stock=10,
+            description=self.faker.paragraph(),
+            **kwargs,
+        )
+
+    def test_generate_derivatives_writes_every_width_and_format(self):
+        """Se generan copias WebP y JPEG en cada ancho configurado"""
+        name = default_storage.save("photo.jpg", self.generate_test_image())
+
+        variants = generate_derivatives(name)
+
+        self.assertEqual(set(variants), {"webp", "jpeg"})
+
+        for key, image_format in (("webp", "WEBP"), ("jpeg", "JPEG")):
+            self.assertEqual(list(variants[key]), ["320", "640", "1024"])
+
+            for width, derivative in variants[key].items():
+                with default_storage.open(derivative) as file:
+                    image = Image.open(file)
+                    self.assertEqual(image.format, image_format)
+                    self.assertEqual(image.width, int(width))
+
+    def test_generate_derivatives_names_follow_the_content(self):
+        """Los nombres dependen del contenido y no se duplican archivos"""
+        first = default_storage.save("first.jpg", self.generate_test_image())
+        copy = default_storage.save("copy.jpg", self.generate_test_image())
+        other = default_storage.save(
+            "other.jpg", self.generate_test_image(color="blue")
+        )
+
+        variants = generate_derivatives(first)
+
+        self.assertEqual(generate_derivatives(copy), variants)
+        self.assertNotEqual(generate_derivatives(other), variants)
+
+    def test_generate_derivatives_does_not_upscale(self):
+        """Las imágenes pequeñas no se amplían"""
+        name = default_storage.save("small.jpg", self.generate_test_image(500, 500))
+
+        variants = generate_derivatives(name)
+
+        self.assertEqual(list(variants["jpeg"]), ["320", "500"])
+
+    def test_form_generates_derivatives_on_upload(self):
+        """El formulario genera las variantes al subir una imagen"""
+        form = ProductForm(
+            data={
+                "name": "Producto",
+                "description": "Descripción",
+                "price": 1000,
+                "stock": 5,
+                "category": self.category.id,
+            },
+            files={"picture": self.generate_test_image()},
+        )
+        form.instance.company = self.company
+
+        self.assertTrue(form.is_valid(), form.errors)
+        product = form.save()
+        product.refresh_from_db()
+
+        self.assertEqual(set(product.picture_variants["webp"]), {"320", "640", "1024"})
+
+    def test_template_tag_renders_srcset_with_lazy_loading(self):
+        """La plantilla usa srcset y carga diferida"""
+        product = self.create_product(picture=self.generate_test_image())
+        product.picture_variants = generate_derivatives(product.picture.name)
+
+        html = Template(
+            "{% load product_images %}{% product_picture product 'card' '50vw' %}"
+        ).render(Context({"product": product}))
+
+        self.assertIn('type="image/webp"', html)
+        self.assertIn(f"/{product.picture_variants['webp']['320']} 320w", html)
+        self.assertIn(f'src="/{product.picture_variants["jpeg"]["1024"]}"', html)
+        self.assertIn('sizes="50vw"', html)
+        self.assertIn('loading="lazy"', html)
+
+    def test_template_tag_without_picture_uses_placeholder(self):
+        """Sin imagen se muestra la imagen por defecto"""
+        html = Template(
+            "{% load product_images %}{% product_picture product %}"
+        ).render(Context({"product": {"name": "Sin imagen", "picture": ""}}))
+
+        self.assertIn("images/no_image.jpg", html)
+        self.assertNotIn("<source", html)
+
+    def test_regenerate_command_updates_existing_products(self):
+        """El comando regenera las variantes de los productos existentes"""
+        products = [
+            self.create_product(picture=self.generate_test_image()) for _ in range(3)
+        ]
+        self.create_product()
+
+        for workers in ("1", "2"):
+            Product.objects.update(picture_variants={})
+
+            call_command(
+                "regenerate_product_images", "--workers", workers, stdout=io.StringIO()
+            )
+
+            for product in products:
+                product.refresh_from_db()
+                self.assertEqual(
+                    set(product.picture_variants["jpeg"]), {"320", "640", "1024"}
+                )
+
+
+class ProductSearchTest(TestCase):
+
+    def setUp(self):
+        self.faker = Faker("es_CO")
+        self.faker.seed_instance(randint(0, 9999))
+        self.document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=self.document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.other_company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=self.document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.drinks = Category.objects.create(name="Bebidas", company=self.company)
+        self.desserts = Category.objects.create(name="Postres", company=self.company)
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.employee = Employee.objects.create(user=self.user, company=self.company)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("api_products_search")
+
+        self.coffee = self.create_product("Café con leche", "Taza grande", self.drinks)
+        self.cake = self.create_product(
+            "Torta de chocolate", "Con cobertura de café", self.desserts
+        )
+        self.juice = self.create_product("Jugo de mora", "Natural", self.drinks)
+
+    def create_product(self, name, description, category, company=None):
+        return Product.objects.create(
+            name=name,
+            description=description,
+            category=category,
+            company=company or self.company,
+            price=1000,
+            stock=10,
+        )
+
+    def test_name_matches_rank_above_description_matches(self):
+        """Las coincidencias en el nombre aparecen primero"""
+        ids = search_products("café", self.company.id)
+
+        self.assertEqual(ids, [self.coffee.id, self.cake.id])
+
+    def test_search_ignores_accents_and_matches_prefixes(self):
+        """La búsqueda ignora tildes y acepta prefijos"""
+        self.assertEqual(search_products("CAFE", self.company.id)[0], self.coffee.id)
+        self.assertEqual(search_products("choco", self.company.id), [self.cake.id])
+        self.assertEqual(
+            search_products("leche caf", self.company.id), [self.coffee.id]
+        )
+
+    def test_search_matches_category_name(self):
+        """La búsqueda incluye el nombre de la categoría"""
+        ids = search_products("bebidas", self.company.id)
+
+        self.assertCountEqual(ids, [self.coffee.id, self.juice.id])
+
+    def test_search_is_scoped_to_the_company(self):
+        """No se devuelven productos de otras empresas"""
+        category = Category.objects.create(name="Bebidas", company=self.other_company)
+        self.create_product(
+            "Café americano", "Otra empresa", category, self.other_company
+        )
+
+        self.assertEqual(search_products("americano", self.company.id), [])
+
+    def test_search_handles_operators_and_empty_queries(self):
+        """Los caracteres especiales no rompen la búsqueda"""
+        self.assertEqual(search_products('"*) OR (', self.company.id), [])
+        self.assertEqual(search_products("NOT mora", self.company.id), [])
+
+    def test_index_follows_product_changes(self):
+        """El índice se actualiza al editar y eliminar productos"""
+        self.juice.name = "Limonada"
+        self.juice.save()
+
+        self.assertEqual(search_products("mora", self.company.id), [])
+        self.assertEqual(search_products("limonada", self.company.id), [self.juice.id])
+
+        self.juice.delete()
+
+        self.assertEqual(search_products("limonada", self.company.id), [])
+
+    def test_index_follows_category_renames(self):
+        """El índice se actualiza al renombrar una categoría"""
+        self.desserts.name = "Reposteria"
+        self.desserts.save()
+
+        self.assertEqual(search_products("reposteria", self.company.id), [self.cake.id])
+
+    def test_filter_by_search_returns_a_queryset(self):
+        """El filtro del administrador usa el índice"""
+        products = filter_by_search(Product.objects.all(), "jugo")
+
+        self.assertEqual(list(products), [self.juice])
+
+    def test_api_requires_authentication(self):
+        """La API requiere autenticación"""
+        response = APIClient().get(self.url, {"q": "cafe"})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_api_requires_a_query(self):
+        """La API requiere un término de búsqueda"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_api_paginates_ranked_results(self):
+        """La API pagina los resultados ordenados por relevancia"""
+        response = self.client.get(self.url, {"q": "cafe", "limit": 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["next"], 2)
+        self.assertEqual(response.data["results"][0]["id"], self.coffee.id)
+        self.assertEqual(response.data["results"][0]["category"], "Bebidas")
+
+        response = self.client.get(self.url, {"q": "cafe", "limit": 1, "page": 2})
+
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(response.data["results"][0]["id"], self.cake.id)
+
+    def test_api_query_count(self):
+        """La búsqueda consulta el índice y luego los productos"""
+        client = APIClient()
+        client.login(username="testuser", password="password")
+
+        # Sesión, usuario y empresa, más el índice y los productos.
+        with self.assertNumQueries(5):
+            client.get(self.url, {"q": "cafe"})
+
+    def test_list_view_filters_by_query(self):
+        """La lista de productos acepta el parámetro q"""
+        self.client.login(username="testuser", password="password")
+
+        response = self.client.get(reverse("products"), {"q": "mora"})
+
+        self.assertEqual(list(response.context["products"]), [self.juice])
+        self.assertEqual(response.context["query"], "mora")
+        self.assertIsNone(response.context["next_page"])
+
+
+class ProductImportTest(TestCase):
+
+    def setUp(self):
+        self.faker = Faker("es_CO")
+        self.faker.seed_instance(randint(0, 9999))
+        self.document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=self.document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.category = Category.objects.create(name="Bebidas", company=self.company)
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.employee = Employee.objects.create(user=self.user, company=self.company)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("api_products_import")
+
+    def make_file(self, rows, header="nombre,descripcion,precio,stock,categoria"):
+        lines = [header] + [",".join(map(str, row)) for row in rows]
+
+        return io.BytesIO("\n".join(lines).encode())
+
+    def run_import(self, rows, batch_size=1000):
+        return ProductImporter(self.company, batch_size).run(
+            read_product_rows(self.make_file(rows))
+        )
+
+    def test_import_creates_products_and_categories(self):
+        """Se crean los productos y las categorías que falten"""
+        result = self.run_import(
+            [
+                ("Jugo de mora", "Natural", 4500, 10, "bebidas"),
+                ("Torta", "Chocolate", 8000, 5, "Postres"),
+                ("Flan", "Caramelo", 6000, 3, "postres "),
+            ]
+        )
+
+        self.assertEqual(result["created"], 3)
+        self.assertEqual(result["error_count"], 0)
+        self.assertEqual(
+            Product.objects.get(name="Jugo de mora").category, self.category
+        )
+        categories = Category.objects.for_company(self.company)
+        self.assertEqual(categories.filter(name="Postres").count(), 1)
+        self.assertEqual(
+            search_products("torta", self.company.id),
+            [Product.objects.get(name="Torta").id],
+        )
+
+    def test_import_updates_products_with_the_same_name(self):
+        """Importar de nuevo actualiza en lugar de duplicar"""
+        self.run_import([("Jugo de mora", "Natural", 4500, 10, "Bebidas")])
+
+        result = self.run_import([("Jugo de mora", "En agua", 5000, 20, "Bebidas")])
+
+        self.assertEqual((result["created"], result["updated"]), (0, 1))
+        product = Product.objects.get(name="Jugo de mora")
+        self.assertEqual((product.price, product.stock), (5000, 20))
+        self.assertEqual(product.description, "En agua")
+
+    def test_failed_import_still_invalidates_the_committed_batches(self):
+        """Si un lote posterior falla, el catálogo refleja los lotes ya guardados"""
+        cache.clear()
+        version = get_catalog_version(self.company.id)
+        rows = [(f"Producto {n}", "Natural", 4500, 10, "Bebidas") for n in range(400)]
+        # Bytes inválidos después de los primeros lotes
+        file = io.BytesIO(self.make_file(rows).getvalue() + b"\n\xff,x,1,1,x")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(UnicodeDecodeError):
+                ProductImporter(self.company, 50).run(read_product_rows(file))
+
+        self.assertTrue(Product.objects.for_company(self.company).exists())
+        self.assertNotEqual(get_catalog_version(self.company.id), version)
+
+    def test_row_errors_are_reported_without_aborting_the_batch(self):
+        """Las filas inválidas se reportan y las demás se importan"""
+        result = self.run_import(
+            [
+                ("Jugo de mora", "Natural", 4500, 10, "Bebidas"),
+                ("Sin precio", "Natural", "abc", 10, "Bebidas"),
+                ("", "Sin nombre", 1000, 1, "Bebidas"),
+                ("Negativo", "Natural", -5, 1, "Bebidas"),
+            ]
+        )
+
+        self.assertEqual(result["created"], 1)
+        self.assertEqual(result["error_count"], 3)
+        self.assertEqual([error["row"] for error in result["errors"]], [3, 4, 5])
+        self.assertIn("price", result["errors"][0]["errors"])
+        self.assertIn("name", result["errors"][1]["errors"])
+
+    def test_queries_do_not_grow_with_the_rows(self):
+        """El número de consultas por lote no depende de las filas"""
+        counts = []
+
+        for size in (10, 100):
+            rows = [
+                (f"Producto {size}-{i}", "Descripción", 1000 + i, i, "Bebidas")
+                for i in range(size)
+            ]
+
+            with CaptureQueriesContext(connection) as queries:
+                self.run_import(rows)
+
+            counts.append(len(queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_batches_are_committed_separately(self):
+        """Cada lote se escribe por separado"""
+        rows = [
+            (f"Producto {i}", "Descripción", 1000, i, "Bebidas") for i in range(25)
+        ]
+
+        result = self.run_import(rows, batch_size=10)
+
+        self.assertEqual(result["created"], 25)
+        self.assertEqual(Product.objects.for_company(self.company).count(), 25)
+
+    def test_api_imports_an_uploaded_file(self):
+        """La API importa el archivo subido para la compañía del usuario"""
+        upload = SimpleUploadedFile(
+            "productos.csv",
+            self.make_file([("Jugo de mora", "Natural", 4500, 10, "Bebidas")]).read(),
+        )
+
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(Product.objects.get().company, self.company)
+
+    def test_api_rejects_unsupported_files(self):
+        """La API rechaza formatos no soportados o la falta de archivo"""
+        upload = SimpleUploadedFile("productos.pdf", b"%PDF")
+
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(self.url, {}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command_imports_a_file(self):
+        """El comando importa un archivo para la compañía indicada"""
+        with tempfile.NamedTemporaryFile(suffix=".tsv", delete=False) as file:
+            file.write(b"name\tdescription\tprice\tstock\tcategory\n")
+            file.write(b"Jugo de mora\tNatural\t4500\t10\tBebidas\n")
+
+        self.addCleanup(os.remove, file.name)
+
+        call_command(
+            "import_products",
+            file.name,
+            "--company",
+            str(self.company.id),
+            stdout=io.StringIO(),
+        )
+
+        self.assertTrue(Product.objects.filter(name="Jugo de mora").exists())
+
+
+class ReserveStockTest(TransactionTestCase):
+    def setUp(self):
+        self.faker = Faker("es_CO")
+        self.faker.seed_instance(randint(0, 9999))
+        document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.category = Category.objects.create(
+            name="Test Category",
+            company=self.company,
+        )
+        self.product1 = Product.objects.create(
+            name="Product 1",
+            category=self.category,
+            company=self.company,
+            price=1000,
+            stock=50,
+            description=self.faker.paragraph(),
+        )
+        self.product2 = Product.objects.create(
+            name="Product 2",
+            category=self.category,
+            company=self.company,
+            price=1000,
+            stock=3,
+            description=self.faker.paragraph(),
+        )
+
+    def test_reserve_stock_decrements_every_product(self):
+        reserve_stock({self.product1.id: 10, self.product2.id: 3})
+
+        self.product1.refresh_from_db()
+        self.product2.refresh_from_db()
+        self.assertEqual(self.product1.stock, 40)
+        self.assertEqual(self.product2.stock, 0)
+
+    def test_reserve_stock_insufficient_reports_failed_products(self):
+        with self.assertRaises(InsufficientStockError) as context:
+            reserve_stock({self.product1.id: 10, self.product2.id: 4})
+
+        self.assertEqual(context.exception.product_ids, [self.product2.id])
+        self.product1.refresh_from_db()
+        self.assertEqual(self.product1.stock, 50)
+
+    def test_reserve_stock_concurrent_orders_never_go_below_zero(self):
+        results = []
+        lock = threading.Lock()
+        start = threading.Barrier(20)
+
+        def place_orders():
+            start.wait()
+
+            for _ in range(10):
+                while True:
+                    try:
+                        with atomic():
+                            reserve_stock({self.product1.id: 1})
+                        outcome = "reserved"
+                    except InsufficientStockError:
+                        outcome = "rejected"
+                    except OperationalError:
+                        # SQLite reports lock contention instead of waiting.
+                        continue
+                    break
+
+                with lock:
+                    results.append(outcome)
+
+            connection.close()
+
+        threads = [threading.Thread(target=place_orders) for _ in range(20)]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.product1.refresh_from_db()
+        self.assertEqual(len(results), 200)
+        self.assertEqual(results.count("reserved"), 50)
+        self.assertEqual(self.product1.stock, 0)
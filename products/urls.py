@@ -6,13 +6,27 @@ from .views import (
     ProductDetailView,
     UpdateProductView,
     ProductAPIView,
-    ProductsAPIView
+    ProductAsyncAPIView,
+    ProductBatchAPIView,
+    ProductImportAPIView,
+    ProductSearchAPIView,
+    ProductsAPIView,
+    ProductsAsyncAPIView,
 )
 
 urlpatterns = [
     path("", ProductsListView.as_view(), name="products"),
     path("<int:id>", ProductDetailView.as_view(), name="detail_product"),
     path("api/", ProductsAPIView.as_view(), name="api_products"),
+    path("api/async/", ProductsAsyncAPIView.as_view(), name="api_products_async"),
+    path(
+        "api/async/<int:id>/",
+        ProductAsyncAPIView.as_view(),
+        name="api_get_product_async",
+    ),
+    path("api/batch/", ProductBatchAPIView.as_view(), name="api_products_batch"),
+    path("api/import/", ProductImportAPIView.as_view(), name="api_products_import"),
+    path("api/search/", ProductSearchAPIView.as_view(), name="api_products_search"),
     path("api/<int:id>/", ProductAPIView.as_view(), name="api_get_product"),
     path("add-product/", CreateProductView.as_view(), name="add_product"),
     path("edit-product/<int:id>", UpdateProductView.as_view(), name="update_product"),
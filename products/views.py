@@ -2,40 +2,82 @@ from typing import Any
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models.base import Model as Model
 from django.db.models.query import QuerySet
-from django.http import Http404
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.views.generic.edit import CreateView, DeleteView
 from django.views.generic.list import ListView
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import UpdateView
 
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from employees.mixins import AsyncTenantAPIView, TenantQuerysetMixin
+from employees.tenancy import get_company
+from foodies.tabular import ImportFormatError, get_delimiter
+
+from .catalog import (
+    aget_catalog,
+    aget_catalog_version,
+    get_catalog,
+    get_catalog_etag,
+    get_catalog_last_modified,
+    get_catalog_version,
+)
 from .forms import ProductForm
+from .importer import ProductImporter, read_product_rows
 from .models import Product
-from .serializers import ProductSerializer, ProductsSerializer
+from .search import get_page_number, get_page_size, search_page
+from .serializers import (
+    ProductBatchSerializer,
+    ProductSearchSerializer,
+    ProductSerializer,
+)
 
 
-class ProductsListView(LoginRequiredMixin, ListView):
+class ProductsListView(LoginRequiredMixin, TenantQuerysetMixin, ListView):
     model = Product
     template_name = "products.html"
     context_object_name = "products"
+    ordering = ["name"]
 
     def get_queryset(self) -> QuerySet[Any]:
-        return Product.objects.filter(company=self.request.user.employee.company)
+        self.query = self.request.GET.get("q", "").strip()
+        self.page = get_page_number(self.request.GET.get("page"))
+        self.next_page = None
 
+        if not self.query:
+            return super().get_queryset()
 
-class ProductDetailView(LoginRequiredMixin, DetailView):
+        products, self.next_page = search_page(
+            self.query, get_company(self.request).id, self.page
+        )
+
+        return products
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context["query"] = self.query
+        context["page"] = self.page
+        context["next_page"] = self.next_page
+
+        return context
+
+
+class ProductDetailView(LoginRequiredMixin, TenantQuerysetMixin, DetailView):
     model = Product
     template_name = "detail_product.html"
     context_object_name = "product"
 
     def get_object(self, queryset: QuerySet[Any] | None = ...) -> Model:
         product = (
-            Product.objects.filter(id=self.kwargs["id"])
+            self.get_queryset()
+            .filter(id=self.kwargs["id"])
             .values(
                 "id",
                 "name",
@@ -43,6 +85,7 @@ class ProductDetailView(LoginRequiredMixin, DetailView):
                 "price",
                 "stock",
                 "picture",
+                "picture_variants",
                 "category__name",
             )
             .first()
@@ -61,19 +104,18 @@ class CreateProductView(LoginRequiredMixin, CreateView):
     form_class = ProductForm
 
     def form_valid(self, form):
-        form.instance.company = self.request.user.employee.company
-        form.save()
+        form.instance.company = get_company(self.request)
         return super().form_valid(form)
 
 
-class UpdateProductView(LoginRequiredMixin, UpdateView):
+class UpdateProductView(LoginRequiredMixin, TenantQuerysetMixin, UpdateView):
     model = Product
     form_class = ProductForm
     template_name = "update_product.html"
     context_object_name = "product"
 
     def get_object(self, queryset: QuerySet[Any] | None = ...) -> Model:
-        product = get_object_or_404(Product, id=self.kwargs["id"])
+        product = get_object_or_404(self.get_queryset(), id=self.kwargs["id"])
 
         return product
 
@@ -81,14 +123,14 @@ class UpdateProductView(LoginRequiredMixin, UpdateView):
         return reverse_lazy("detail_product", kwargs={"id": self.object.id})
 
 
-class DeleteProductView(LoginRequiredMixin, DeleteView):
+class DeleteProductView(LoginRequiredMixin, TenantQuerysetMixin, DeleteView):
     model = Product
     template_name = "delete_product.html"
     success_url = reverse_lazy("products")
     context_object_name = "product"
 
     def get_object(self, queryset: QuerySet[Any] | None = ...) -> Model:
-        product = get_object_or_404(Product, id=self.kwargs["id"])
+        product = get_object_or_404(self.get_queryset(), id=self.kwargs["id"])
 
         return product
 
@@ -97,22 +139,150 @@ class ProductsAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, format=None):
-        products = Product.objects.filter(company=request.user.employee.company)
-        serializer = ProductsSerializer(products, many=True)
+        company_id = get_company(request).id
+        version = get_catalog_version(company_id)
+        etag = get_catalog_etag(company_id, version)
+        last_modified = get_catalog_last_modified(version)
 
-        return Response(serializer.data)
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=int(last_modified.timestamp())
+        )
+
+        if not_modified is not None:
+            return not_modified
+
+        response = Response(get_catalog(company_id, version))
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+        response["Cache-Control"] = "private, no-cache"
+
+        return response
 
 
 class ProductAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get_object(self, pk):
-        product = get_object_or_404(Product, id=pk)
+    def get_object(self, pk, company):
+        product = get_object_or_404(Product.objects.for_company(company), id=pk)
 
         return product
 
     def get(self, request, id, format=None):
-        product = self.get_object(id)
+        product = self.get_object(id, get_company(request))
         serializer = ProductSerializer(product)
 
         return Response(serializer.data)
+
+
+class ProductsAsyncAPIView(AsyncTenantAPIView):
+    async def get(self, request, *args, **kwargs):
+        version = await aget_catalog_version(self.company.id)
+        etag = get_catalog_etag(self.company.id, version)
+        last_modified = get_catalog_last_modified(version)
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=int(last_modified.timestamp())
+        )
+
+        if not_modified is not None:
+            return not_modified
+
+        catalog = await aget_catalog(self.company.id, version)
+        response = JsonResponse(catalog, safe=False)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+        response["Cache-Control"] = "private, no-cache"
+
+        return response
+
+
+class ProductAsyncAPIView(AsyncTenantAPIView):
+    async def get(self, request, id, *args, **kwargs):
+        product = (
+            await Product.objects.for_company(self.company).filter(id=id).afirst()
+        )
+
+        if product is None:
+            return JsonResponse(
+                {"detail": "No Product matches the given query."}, status=404
+            )
+
+        return JsonResponse(ProductSerializer(product).data)
+
+
+class ProductBatchAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    max_ids = 500
+
+    def get(self, request, format=None):
+        try:
+            ids = {int(pk) for pk in request.query_params.get("ids", "").split(",") if pk}
+        except ValueError:
+            return Response(
+                {"status": "error", "message": "Invalid product ids"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(ids) > self.max_ids:
+            return Response(
+                {"status": "error", "message": f"At most {self.max_ids} ids allowed"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        products = (
+            Product.objects.for_company(get_company(request))
+            .filter(id__in=ids)
+            .only("id", "name", "price", "stock")
+        )
+        serializer = ProductBatchSerializer(products, many=True)
+
+        return Response(serializer.data)
+
+
+class ProductSearchAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        query = request.query_params.get("q", "").strip()
+
+        if not query:
+            return Response(
+                {"status": "error", "message": "Search query is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        products, next_page = search_page(
+            query,
+            get_company(request).id,
+            get_page_number(request.query_params.get("page")),
+            get_page_size(request.query_params.get("limit")),
+        )
+        serializer = ProductSearchSerializer(products, many=True)
+
+        return Response({"results": serializer.data, "next": next_page})
+
+
+class ProductImportAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, format=None):
+        upload = request.FILES.get("file")
+
+        if upload is None:
+            return Response(
+                {"status": "error", "message": "A file is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            delimiter = get_delimiter(upload.name)
+            result = ProductImporter(get_company(request)).run(
+                read_product_rows(upload.file, delimiter)
+            )
+        except (ImportFormatError, UnicodeDecodeError) as e:
+            return Response(
+                {"status": "error", "message": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response({"status": "success", **result})
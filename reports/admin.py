@@ -0,0 +1,19 @@
+from django.contrib import admin
+
+from .models import DailyProductSales, DailySales
+
+
+class DailySalesAdmin(admin.ModelAdmin):
+    model = DailySales
+    list_display = ("date", "company", "order_count", "units", "revenue")
+    list_filter = ("company",)
+
+
+class DailyProductSalesAdmin(admin.ModelAdmin):
+    model = DailyProductSales
+    list_display = ("date", "company", "product", "order_count", "units", "revenue")
+    list_filter = ("company",)
+
+
+admin.site.register(DailySales, DailySalesAdmin)
+admin.site.register(DailyProductSales, DailyProductSalesAdmin)
@@ -0,0 +1,64 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from orders.models import Order
+from reports.rollups import BATCH_SIZE, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Backfill or rebuild the daily sales rollups for a range of dates."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start", type=date.fromisoformat, help="First day (YYYY-MM-DD)."
+        )
+        parser.add_argument(
+            "--end", type=date.fromisoformat, help="Last day (YYYY-MM-DD)."
+        )
+        parser.add_argument("--company", type=int, help="Only rebuild this company.")
+        parser.add_argument(
+            "--chunk-days",
+            type=int,
+            default=7,
+            help="Days rebuilt per transaction.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Rows inserted per query.",
+        )
+
+    def handle(self, *args, **options):
+        start = options["start"]
+        end = options["end"] or timezone.localdate()
+
+        if start is None:
+            first_order = Order.objects.aggregate(first=Min("created_at"))["first"]
+
+            if first_order is None:
+                self.stdout.write("No hay pedidos para procesar.")
+                return
+
+            start = timezone.localdate(first_order)
+
+        if start > end:
+            raise CommandError("--start must not be after --end.")
+
+        if options["chunk_days"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--chunk-days and --batch-size must be positive.")
+
+        written = rebuild_rollups(
+            start,
+            end,
+            company_id=options["company"],
+            chunk_days=options["chunk_days"],
+            batch_size=options["batch_size"],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{written} filas reconstruidas entre {start} y {end}.")
+        )
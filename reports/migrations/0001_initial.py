@@ -0,0 +1,51 @@
+# Generated by Django 5.1.1 on 2026-10-18 01:55
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('companies', '0002_alter_company_options'),
+        ('products', '0005_alter_product_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('order_count', models.PositiveIntegerField(default=0, verbose_name='Pedidos')),
+                ('units', models.PositiveIntegerField(default=0, verbose_name='Unidades')),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Ventas')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='companies.company', verbose_name='Empresa')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='products.product', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Ventas diarias por producto',
+                'verbose_name_plural': 'Ventas diarias por producto',
+                'constraints': [models.UniqueConstraint(fields=('company', 'date', 'product'), name='reports_daily_product_sales_unique_day')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('order_count', models.PositiveIntegerField(default=0, verbose_name='Pedidos')),
+                ('units', models.PositiveIntegerField(default=0, verbose_name='Unidades')),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Ventas')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='companies.company', verbose_name='Empresa')),
+            ],
+            options={
+                'verbose_name': 'Ventas diarias',
+                'verbose_name_plural': 'Ventas diarias',
+                'constraints': [models.UniqueConstraint(fields=('company', 'date'), name='reports_daily_sales_unique_day')],
+            },
+        ),
+    ]
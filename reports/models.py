@@ -0,0 +1,71 @@
+from decimal import Decimal
+from django.db import models
+
+from companies.models import Company
+from products.models import Product
+
+
+class DailySales(models.Model):
+    company: models.ForeignKey = models.ForeignKey(
+        Company, on_delete=models.CASCADE, verbose_name="Empresa"
+    )
+    date: models.DateField = models.DateField(verbose_name="Fecha")
+    order_count: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0, verbose_name="Pedidos"
+    )
+    units: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0, verbose_name="Unidades"
+    )
+    revenue: models.DecimalField = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        verbose_name="Ventas",
+    )
+
+    class Meta:
+        verbose_name = "Ventas diarias"
+        verbose_name_plural = "Ventas diarias"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company", "date"], name="reports_daily_sales_unique_day"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.company} - {self.date}"
+
+
+class DailyProductSales(models.Model):
+    company: models.ForeignKey = models.ForeignKey(
+        Company, on_delete=models.CASCADE, verbose_name="Empresa"
+    )
+    date: models.DateField = models.DateField(verbose_name="Fecha")
+    product: models.ForeignKey = models.ForeignKey(
+        Product, on_delete=models.CASCADE, verbose_name="Producto"
+    )
+    order_count: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0, verbose_name="Pedidos"
+    )
+    units: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0, verbose_name="Unidades"
+    )
+    revenue: models.DecimalField = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        verbose_name="Ventas",
+    )
+
+    class Meta:
+        verbose_name = "Ventas diarias por producto"
+        verbose_name_plural = "Ventas diarias por producto"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company", "date", "product"],
+                name="reports_daily_product_sales_unique_day",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product} - {self.date}"
@@ -0,0 +1,178 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import islice
+from typing import Iterable
+
+from django.db import connection
+from django.db.models import Count, F, Model, Sum
+from django.db.models.functions import TruncDate
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from orders.models import Order, OrderDetail
+
+from .models import DailyProductSales, DailySales
+
+BATCH_SIZE = 1000
+COUNTERS = ["order_count", "units", "revenue"]
+
+
+def _add_to_rollup(model: type[Model], keys: list[str], rows: list[tuple]) -> None:
+    """
+    Insert ``rows`` into the rollup table of ``model``, adding their counters
+    to the stored ones when the row for that key already exists.
+    """
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = ", ".join(quote(column) for column in [*keys, *COUNTERS])
+    row_placeholder = "(" + ", ".join(["%s"] * (len(keys) + len(COUNTERS))) + ")"
+    updates = ", ".join(
+        f"{quote(column)} = {table}.{quote(column)} + excluded.{quote(column)}"
+        for column in COUNTERS
+    )
+    sql = (
+        f"INSERT INTO {table} ({columns}) "
+        f"VALUES {', '.join([row_placeholder] * len(rows))} "
+        f"ON CONFLICT ({', '.join(quote(key) for key in keys)}) DO UPDATE SET {updates}"
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [value for row in rows for value in row])
+
+
+def record_order(order: Order, details: Iterable[OrderDetail]) -> None:
+    """Add a newly created order and its lines to the daily rollups."""
+    day = connection.ops.adapt_datefield_value(timezone.localdate(order.created_at))
+    products: dict[int, tuple[int, Decimal]] = {}
+
+    for detail in details:
+        units, revenue = products.get(detail.product_id, (0, Decimal("0.00")))
+        products[detail.product_id] = (units + detail.quantity, revenue + detail.amount)
+
+    _add_to_rollup(
+        DailySales,
+        ["company_id", "date"],
+        [(order.company_id, day, 1, order.item_count, _adapt_revenue(order.total))],
+    )
+
+    if products:
+        _add_to_rollup(
+            DailyProductSales,
+            ["company_id", "date", "product_id"],
+            [
+                (order.company_id, day, product_id, 1, units, _adapt_revenue(revenue))
+                for product_id, (units, revenue) in products.items()
+            ],
+        )
+
+
+def _adapt_revenue(value: Decimal):
+    return connection.ops.adapt_decimalfield_value(value, 14, 2)
+
+
+def rebuild_rollups(
+    start: date,
+    end: date,
+    company_id: int | None = None,
+    chunk_days: int = 7,
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Recompute the rollups of every day between ``start`` and ``end`` from the
+    orders table and return the number of rows written.
+
+    Work is split into transactions of ``chunk_days`` days and aggregated rows
+    are streamed into the rollup tables ``batch_size`` at a time, so memory use
+    does not depend on the size of the range.
+    """
+    written = 0
+    day = start
+
+    while day <= end:
+        chunk_end = min(day + timedelta(days=chunk_days - 1), end)
+        written += _rebuild_chunk(day, chunk_end, company_id, batch_size)
+        day = chunk_end + timedelta(days=1)
+
+    return written
+
+
+def _rebuild_chunk(start: date, end: date, company_id: int | None, batch_size: int) -> int:
+    since = timezone.make_aware(datetime.combine(start, time.min))
+    until = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+
+    orders = Order.objects.filter(created_at__gte=since, created_at__lt=until)
+    details = OrderDetail.objects.filter(
+        order__created_at__gte=since, order__created_at__lt=until
+    )
+    daily_sales = DailySales.objects.filter(date__range=(start, end))
+    daily_product_sales = DailyProductSales.objects.filter(date__range=(start, end))
+
+    if company_id is not None:
+        orders = orders.filter(company_id=company_id)
+        details = details.filter(order__company_id=company_id)
+        daily_sales = daily_sales.filter(company_id=company_id)
+        daily_product_sales = daily_product_sales.filter(company_id=company_id)
+
+    daily_rows = (
+        orders.annotate(day=TruncDate("created_at"))
+        .values("company_id", "day")
+        .annotate(order_count=Count("id"), units=Sum("item_count"), revenue=Sum("total"))
+        .order_by()
+    )
+    product_rows = (
+        details.annotate(day=TruncDate("order__created_at"))
+        .values("order__company_id", "day", "product_id")
+        .annotate(
+            order_count=Count("order_id", distinct=True),
+            units=Sum("quantity"),
+            revenue=Sum(F("unit_price") * F("quantity")),
+        )
+        .order_by()
+    )
+
+    with atomic():
+        daily_sales.delete()
+        daily_product_sales.delete()
+
+        written = _bulk_insert(
+            DailySales,
+            (
+                DailySales(
+                    company_id=row["company_id"],
+                    date=row["day"],
+                    order_count=row["order_count"],
+                    units=row["units"] or 0,
+                    revenue=row["revenue"] or Decimal("0.00"),
+                )
+                for row in daily_rows.iterator(chunk_size=batch_size)
+            ),
+            batch_size,
+        )
+        written += _bulk_insert(
+            DailyProductSales,
+            (
+                DailyProductSales(
+                    company_id=row["order__company_id"],
+                    date=row["day"],
+                    product_id=row["product_id"],
+                    order_count=row["order_count"],
+                    units=row["units"],
+                    revenue=row["revenue"],
+                )
+                for row in product_rows.iterator(chunk_size=batch_size)
+            ),
+            batch_size,
+        )
+
+    return written
+
+
+def _bulk_insert(model: type[Model], objects: Iterable[Model], batch_size: int) -> int:
+    written = 0
+    objects = iter(objects)
+
+    while batch := list(islice(objects, batch_size)):
+        model.objects.bulk_create(batch)
+        written += len(batch)
+
+    return written
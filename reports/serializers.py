@@ -0,0 +1,8 @@
+from rest_framework.serializers import DateField, DecimalField, IntegerField, Serializer
+
+
+class DailySalesSerializer(Serializer):
+    date = DateField()
+    order_count = IntegerField()
+    units = IntegerField()
+    revenue = DecimalField(max_digits=14, decimal_places=2)
@@ -0,0 +1,185 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from random import randint
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from faker import Faker
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from categories.models import Category
+from companies.models import Company
+from customers.models import Customer
+from document_types.models import DocumentType
+from employees.models import Employee
+from orders.models import Order, OrderDetail
+from products.models import Product
+
+from .models import DailyProductSales, DailySales
+
+
+class SalesRollupTest(TestCase):
+    def setUp(self):
+        self.faker = Faker("es_CO")
+        self.faker.seed_instance(randint(0, 9999))
+        document_type = DocumentType.objects.create(
+            name="Número de Identificación Tributaria", code="NIT"
+        )
+        self.company = Company.objects.create(
+            name=self.faker.company(),
+            email=self.faker.company_email(),
+            phone=self.faker.phone_number(),
+            document_number=self.faker.legal_person_nit(),
+            document_type=document_type,
+            address=self.faker.address(),
+            city=self.faker.city(),
+            country=self.faker.country(),
+        )
+        self.user = User.objects.create_user(username="testuser", password="password")
+        Employee.objects.create(user=self.user, company=self.company)
+        self.customer = Customer.objects.create(
+            name=self.faker.name(),
+            phone_number=self.faker.phone_number(),
+            address=self.faker.address(),
+            neighborhood="Test neighborhood",
+        )
+        self.customer.companies.add(self.company)
+        category = Category.objects.create(name="Test Category", company=self.company)
+        self.product1 = Product.objects.create(
+            name="Product 1",
+            description=self.faker.paragraph(),
+            price=Decimal("1000.00"),
+            stock=100,
+            category=category,
+            company=self.company,
+        )
+        self.product2 = Product.objects.create(
+            name="Product 2",
+            description=self.faker.paragraph(),
+            price=Decimal("2500.50"),
+            stock=100,
+            category=category,
+            company=self.company,
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_order(self, items):
+        return self.client.post(
+            reverse("create_order_api"),
+            {
+                "customer": self.customer.id,
+                "items": [
+                    {"product": product.id, "quantity": quantity}
+                    for product, quantity in items
+                ],
+            },
+            format="json",
+        )
+
+    def test_create_order_updates_daily_rollups(self):
+        self.create_order([(self.product1, 2), (self.product2, 1), (self.product1, 1)])
+        self.create_order([(self.product1, 1)])
+
+        daily = DailySales.objects.get(company=self.company)
+        self.assertEqual(daily.date, timezone.localdate())
+        self.assertEqual(daily.order_count, 2)
+        self.assertEqual(daily.units, 5)
+        self.assertEqual(daily.revenue, Decimal("6500.50"))
+
+        product_daily = DailyProductSales.objects.get(product=self.product1)
+        self.assertEqual(product_daily.order_count, 2)
+        self.assertEqual(product_daily.units, 4)
+        self.assertEqual(product_daily.revenue, Decimal("4000.00"))
+
+    def test_failed_order_does_not_update_rollups(self):
+        self.create_order([(self.product1, 1000)])
+
+        self.assertFalse(DailySales.objects.exists())
+        self.assertFalse(DailyProductSales.objects.exists())
+
+    def test_rebuild_command_matches_incremental_rollups(self):
+        self.create_order([(self.product1, 2), (self.product2, 1)])
+        self.create_order([(self.product2, 3)])
+        incremental = list(
+            DailyProductSales.objects.order_by("product_id").values_list(
+                "product_id", "order_count", "units", "revenue"
+            )
+        )
+
+        DailySales.objects.update(order_count=0)
+        DailyProductSales.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_sales_rollups", "--chunk-days", "1", stdout=out)
+
+        rebuilt = list(
+            DailyProductSales.objects.order_by("product_id").values_list(
+                "product_id", "order_count", "units", "revenue"
+            )
+        )
+        self.assertEqual(rebuilt, incremental)
+        self.assertEqual(DailySales.objects.get().order_count, 2)
+        self.assertIn("3 filas", out.getvalue())
+
+    def test_rebuild_command_only_touches_requested_range(self):
+        order = Order.objects.create(
+            attended_by=self.user,
+            customer=self.customer,
+            company=self.company,
+            item_count=1,
+            total=Decimal("1000.00"),
+        )
+        OrderDetail.objects.create(
+            order=order, product=self.product1, quantity=1, unit_price=Decimal("1000.00")
+        )
+        yesterday = timezone.localdate() - timedelta(days=1)
+        DailySales.objects.create(company=self.company, date=yesterday, order_count=9)
+
+        call_command(
+            "rebuild_sales_rollups",
+            "--start",
+            timezone.localdate().isoformat(),
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(DailySales.objects.get(date=yesterday).order_count, 9)
+        self.assertEqual(DailySales.objects.get(date=timezone.localdate()).units, 1)
+
+    def test_daily_sales_api_returns_a_year_of_days(self):
+        self.create_order([(self.product1, 2)])
+
+        response = self.client.get(reverse("api_daily_sales"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 365)
+        self.assertEqual(response.data[-1]["date"], timezone.localdate().isoformat())
+        self.assertEqual(response.data[-1]["order_count"], 1)
+        self.assertEqual(response.data[-1]["revenue"], "2000.00")
+        self.assertEqual(response.data[0]["order_count"], 0)
+
+    def test_daily_sales_api_filters_by_product(self):
+        self.create_order([(self.product1, 2), (self.product2, 1)])
+
+        response = self.client.get(
+            reverse("api_daily_sales"), {"product": self.product2.id, "start": timezone.localdate().isoformat()}
+        )
+
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["units"], 1)
+
+    def test_daily_sales_api_invalid_range(self):
+        response = self.client.get(reverse("api_daily_sales"), {"start": "2024-13-01"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_daily_sales_api_invalid_product(self):
+        for product in ("abc", "0", "-1"):
+            response = self.client.get(reverse("api_daily_sales"), {"product": product})
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import DailySalesAPIView
+
+urlpatterns = [
+    path("api/daily-sales/", DailySalesAPIView.as_view(), name="api_daily_sales"),
+]
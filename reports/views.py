@@ -0,0 +1,71 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from employees.tenancy import get_company
+
+from .models import DailyProductSales, DailySales
+from .serializers import DailySalesSerializer
+
+DEFAULT_DAYS = 365
+MAX_DAYS = 3660
+
+
+class DailySalesAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        try:
+            end = date.fromisoformat(
+                request.query_params.get("end") or timezone.localdate().isoformat()
+            )
+            start = date.fromisoformat(
+                request.query_params.get("start")
+                or (end - timedelta(days=DEFAULT_DAYS - 1)).isoformat()
+            )
+        except ValueError:
+            return Response(
+                {"status": "error", "message": "Invalid date"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if start > end or (end - start).days >= MAX_DAYS:
+            return Response(
+                {"status": "error", "message": "Invalid date range"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        product_id = request.query_params.get("product")
+
+        if product_id and not (product_id.isdecimal() and int(product_id) > 0):
+            return Response(
+                {"status": "error", "message": "Invalid product"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if product_id:
+            rollups = DailyProductSales.objects.filter(product_id=product_id)
+        else:
+            rollups = DailySales.objects.all()
+
+        rows = {
+            row["date"]: row
+            for row in rollups.filter(
+                company=get_company(request), date__range=(start, end)
+            ).values("date", "order_count", "units", "revenue")
+        }
+        days = [
+            rows.get(
+                day,
+                {"date": day, "order_count": 0, "units": 0, "revenue": Decimal("0.00")},
+            )
+            for day in (start + timedelta(days=n) for n in range((end - start).days + 1))
+        ]
+        serializer = DailySalesSerializer(days, many=True)
+
+        return Response(serializer.data)
@@ -1,6 +1,9 @@
 const PRODUCTS_API_URL = '/products/api/';
-const CUSTOMERS_API_URL = '/customers/api/';
-const ORDERS_API_URL = '/orders/api/add-order/';
+const CUSTOMERS_SEARCH_API_URL = '/customers/api/search/';
+const CUSTOMER_SEARCH_DELAY = 250;
+const ORDER_SUBMISSIONS_API_URL = '/orders/api/submissions/';
+const ORDER_STATUS_POLL_DELAY = 1000;
+const ORDER_STATUS_MAX_POLLS = 60;
 
 let totalItems = 1;
 
@@ -116,36 +119,170 @@ const getCookie = (name) => {
     return cookieValue;
 }
 
-const getCustomers = async () => {
-	try {
-		const response = await fetch(CUSTOMERS_API_URL);
+let customerSearchController = null;
 
-		if (!response.ok) {
-			throw new Error(response.statusText);
-		}
+const searchCustomers = async (query) => {
+	// Only the latest keystroke matters; drop the request still in flight.
+	if (customerSearchController) {
+		customerSearchController.abort();
+	}
 
-		return await response.json();
+	customerSearchController = new AbortController();
 
-	} catch (error) {
-		throw new Error(error);
+	const url = new URL(CUSTOMERS_SEARCH_API_URL, window.location.origin);
+	url.searchParams.set('q', query);
+
+	const response = await fetch(url, { signal: customerSearchController.signal });
+
+	if (!response.ok) {
+		throw new Error(response.statusText);
 	}
+
+	return await response.json();
 }
 
+const renderCustomerOptions = (customerSelect, customers) => {
+	const emptyOption = document.createElement('option');
+	emptyOption.textContent = customers.length ? 'Seleccionar' : 'Sin resultados';
+	emptyOption.value = '';
+
+	customerSelect.replaceChildren(emptyOption);
+
+	for (let i = 0; i < customers.length; i++) {
+		const option = document.createElement('option');
+		option.value = customers[i].id;
+		option.textContent = `${customers[i].name} · ${customers[i].phone_number} · ${customers[i].neighborhood}`;
+		customerSelect.appendChild(option);
+	}
+
+	if (customers.length) {
+		customerSelect.value = customers[0].id;
+	}
+}
+
+const productPrices = new Map();
+
 const getProductPrice = (elem) => {
 	const value = elem.value;
 	const splittedId = elem.id.split('_');
 	const id = splittedId[1];
 	const productPrice = document.querySelector(`#product-price-${id}`);
     const quantityElem = document.querySelector(`#quantity_${id}`);
+	const price = productPrices.get(value);
+
+	if (price === undefined) {
+		productPrice.textContent = '-';
+		quantityElem.removeAttribute('base-price');
+		return;
+	}
+
+	productPrice.textContent = Number(price);
+    quantityElem.value = 1;
+    quantityElem.setAttribute('base-price', price);
+};
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+const showOrderError = (element, message) => {
+	element.textContent = message;
+	element.classList.remove('hidden');
+};
+
+const hideOrderError = (element) => {
+	element.textContent = '';
+	element.classList.add('hidden');
+};
+
+const pollOrderStatus = async (statusUrl) => {
+	for (let i = 0; i < ORDER_STATUS_MAX_POLLS; i++) {
+		await sleep(ORDER_STATUS_POLL_DELAY);
+
+		const response = await fetch(statusUrl);
+
+		if (!response.ok) {
+			throw new Error(response.statusText);
+		}
+
+		const submission = await response.json();
+
+		if (submission.status === 'done' || submission.status === 'failed') {
+			return submission;
+		}
+	}
+
+	throw new Error('Order submission timed out');
+};
+
+// crypto.randomUUID only exists in secure contexts (HTTPS or localhost), so
+// over plain HTTP the key is built from random bytes instead.
+const newOrderKey = () => {
+	if (typeof crypto.randomUUID === 'function') {
+		return crypto.randomUUID();
+	}
+
+	const bytes = crypto.getRandomValues(new Uint8Array(16));
 
-	fetch(`${PRODUCTS_API_URL}${value}/`)
-		.then((response) => response.json())
-		.then((data) => {
-			productPrice.textContent = Number(data['price']);
-            quantityElem.value = 1;
-            quantityElem.setAttribute('base-price', data['price']);
-		})
-		.catch((error) => console.error(error));
+	return Array.from(bytes, byte => byte.toString(16).padStart(2, '0')).join('');
+};
+
+const submitOrder = async (requestData, key) => {
+	const response = await fetch(ORDER_SUBMISSIONS_API_URL, {
+		method: 'POST',
+		headers: {
+			'Content-Type': 'application/json',
+			'X-CSRFToken': getCookie('csrftoken'),
+			'Idempotency-Key': key,
+		},
+		mode: 'same-origin',
+		body: JSON.stringify(requestData),
+	});
+	const data = await response.json();
+
+	if (response.status === 400 || response.status === 409) {
+		const message = typeof data.message === 'string' ? data.message : JSON.stringify(data.message);
+
+		return { status: 'failed', error: { message } };
+	}
+
+	if (!response.ok) {
+		throw new Error(response.statusText);
+	}
+
+	if (data.status === 'done' || data.status === 'failed') {
+		return data;
+	}
+
+	return pollOrderStatus(data.status_url);
+};
+
+const renderKitchenOrder = (container, order) => {
+	const card = document.createElement('li');
+	card.className = 'p-4 rounded border border-gray-200';
+	card.dataset.orderId = order.id;
+
+	const title = document.createElement('p');
+	title.className = 'font-semibold';
+	title.textContent = `Orden #${order.id} · ${order.customer}`;
+
+	const items = document.createElement('ul');
+	items.className = 'mt-2 text-sm';
+
+	for (const item of order.items) {
+		const line = document.createElement('li');
+		line.textContent = `${item.quantity} × ${item.product}`;
+		items.append(line);
+	}
+
+	card.append(title, items);
+
+	// Events can repeat after a reconnection, so orders are replaced by id.
+	const current = container.querySelector(`[data-order-id="${order.id}"]`);
+
+	if (current) {
+		current.replaceWith(card);
+	} else {
+		container.prepend(card);
+	}
 };
 
 const getProducts = async () => {
@@ -167,23 +304,69 @@ document.addEventListener('DOMContentLoaded', async () => {
 	const url = new URL(window.location.href);
 	const pathname = url.pathname;
 
+	if (pathname.endsWith('kitchen/')) {
+		const container = document.querySelector('#kitchen-orders');
+		const kitchenStatus = document.querySelector('#kitchen-status');
+		const eventsUrl = new URL(container.dataset.eventsUrl, window.location.origin);
+
+		if (container.dataset.lastEventId) {
+			eventsUrl.searchParams.set('last_event_id', container.dataset.lastEventId);
+		}
+
+		// EventSource reconnects on its own and sends Last-Event-ID to resume.
+		const events = new EventSource(eventsUrl);
+
+		events.addEventListener('open', () => {
+			kitchenStatus.textContent = 'En vivo';
+		});
+		events.addEventListener('error', () => {
+			kitchenStatus.textContent = 'Reconectando…';
+		});
+		events.addEventListener('order', (event) => {
+			renderKitchenOrder(container, JSON.parse(event.data));
+		});
+	}
+
 	if (pathname.endsWith('add-order/')) {
 
 		const customerSelect = document.querySelector('#customer');
+		const customerSearch = document.querySelector('#customer-search');
 		const form = document.querySelector('#create-order-form');
 
-		const customers = await getCustomers();
-		const products = await getProducts();
+		let customerSearchTimeout = null;
 
-		const loadingIndicator = document.querySelector('#loading-indicator');
+		customerSearch.addEventListener('input', () => {
+			clearTimeout(customerSearchTimeout);
 
-		for (let i = 0; i < customers.length; i++) {
-			const option = document.createElement('option');
-			option.value = customers[i].id;
-			option.textContent = customers[i].name;
-			customerSelect.appendChild(option);
+			customerSearchTimeout = setTimeout(async () => {
+				const query = customerSearch.value.trim();
+
+				if (!query) {
+					renderCustomerOptions(customerSelect, []);
+					return;
+				}
+
+				try {
+					renderCustomerOptions(customerSelect, await searchCustomers(query));
+				} catch (error) {
+					if (error.name !== 'AbortError') {
+						console.error(error);
+					}
+				}
+			}, CUSTOMER_SEARCH_DELAY);
+		});
+
+		const products = await getProducts();
+
+		for (let i = 0; i < products.length; i++) {
+			productPrices.set(String(products[i].id), products[i].price);
 		}
 
+		const loadingIndicator = document.querySelector('#loading-indicator');
+		const submitButton = document.querySelector('#submit-order');
+		const orderError = document.querySelector('#order-error');
+		let orderKey = null;
+
 		const formContainer = document.querySelector('#form-container tbody');
 		const addRowButton = document.querySelector('#add-row');
 
@@ -230,28 +413,34 @@ document.addEventListener('DOMContentLoaded', async () => {
 			requestData['customer'] = formData.get('customer');
 			requestData.items = itemsArray;
 
-			const requestOptions = {
-				method: 'POST',
-				headers: {
-					'Content-Type': 'application/json',
-					'X-CSRFToken': getCookie('csrftoken'),
-				},
-				mode: 'same-origin',
-				body: JSON.stringify(requestData),
-			}
+			// One key per order: retries and double clicks replay the same
+			// submission instead of creating the order twice.
+			orderKey ??= newOrderKey();
+			submitButton.disabled = true;
+			hideOrderError(orderError);
 
-			fetch(ORDERS_API_URL, requestOptions)
-				.then(response => response.json())
-				.then(data => {
-					if (data.status === 'success') {
+			submitOrder(requestData, orderKey)
+				.then(submission => {
+					if (submission.status === 'done') {
 						window.location.href = '/orders/';
-					} else {
-						alert(data.message);
+						return;
 					}
-					
+
+					if (submission.status === 'failed') {
+						// The server rejected this order, so the next attempt is a new one.
+						orderKey = null;
+					}
+
+					showOrderError(orderError, submission.error?.message ?? 'No se pudo crear el pedido.');
+					submitButton.disabled = false;
 					loadingIndicator.classList.replace('grid', 'hidden');
 				})
-				.catch((error) => console.error(error));
+				.catch((error) => {
+					console.error(error);
+					showOrderError(orderError, 'No se pudo enviar el pedido, intenta de nuevo.');
+					submitButton.disabled = false;
+					loadingIndicator.classList.replace('grid', 'hidden');
+				});
 		});
 	}
 });